@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Mesure du temps de démarrage à froid de l'Agent Jarvis, par sous-commande.
+
+Chaque mesure lance un interpréteur Python neuf qui importe la CLI puis
+initialise exactement les sous-systèmes dont la sous-commande a besoin,
+sans appeler le LLM.
+
+Exemples :
+    python3 bench_startup.py
+    python3 bench_startup.py ask build --runs 10
+    python3 bench_startup.py ask --imports
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+
+ROOT = Path(__file__).parent
+
+# Code exécuté au démarrage de chaque sous-commande (avant le premier appel LLM)
+SUBCOMMANDS: Dict[str, str] = {
+    "info": "import jarvis_agent_cli",
+    "ask": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.llm; a.kb",
+    "learn": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.kb",
+    "build": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.builder",
+    "fix": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.fixer",
+    "analyze": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.fixer",
+    "refactor": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.fixer",
+    "deploy": "import jarvis_agent_cli; a = jarvis_agent_cli.JarvisAgent(); a.deployer",
+}
+
+
+def _environment() -> Dict[str, str]:
+    """Environnement des interpréteurs mesurés."""
+    env = dict(os.environ)
+    # Le client OpenAI exige une clé, même si aucune requête n'est envoyée
+    env.setdefault("OPENAI_API_KEY", "bench-startup")
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def measure(code: str, runs: int) -> List[float]:
+    """
+    Mesure le temps d'exécution d'un code dans des interpréteurs neufs.
+    
+    Args:
+        code: Code Python à exécuter
+        runs: Nombre d'exécutions
+        
+    Returns:
+        Durées en secondes, dans l'ordre d'exécution
+    """
+    env = _environment()
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=ROOT, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        timings.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr else "échec")
+    return timings
+
+
+def slowest_imports(code: str, limit: int = 15) -> List[Dict[str, object]]:
+    """
+    Liste les imports les plus coûteux d'un code (python -X importtime).
+    
+    Args:
+        code: Code Python à exécuter
+        limit: Nombre d'imports à retourner
+        
+    Returns:
+        Imports triés par durée cumulée décroissante
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=_environment(),
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000
+        })
+    
+    imports.sort(key=lambda item: item["cumulative_ms"], reverse=True)
+    return imports[:limit]
+
+
+def main():
+    """Point d'entrée principal."""
+    parser = argparse.ArgumentParser(description="Temps de démarrage à froid de l'Agent Jarvis par sous-commande")
+    parser.add_argument("subcommands", nargs="*", metavar="SOUS-COMMANDE",
+                        help=f"Sous-commandes à mesurer (défaut: toutes) : {', '.join(SUBCOMMANDS)}")
+    parser.add_argument("--runs", type=int, default=5, help="Nombre d'exécutions par sous-commande (défaut: 5)")
+    parser.add_argument("--imports", action="store_true", help="Afficher les imports les plus coûteux")
+    parser.add_argument("--json", action="store_true", help="Résultats au format JSON (suivi dans le temps)")
+    args = parser.parse_args()
+    
+    names = args.subcommands or list(SUBCOMMANDS)
+    unknown = [name for name in names if name not in SUBCOMMANDS]
+    if unknown:
+        parser.error(f"sous-commande(s) inconnue(s) : {', '.join(unknown)}")
+    results = {}
+    
+    for name in names:
+        timings = measure(SUBCOMMANDS[name], max(1, args.runs))
+        # La première exécution inclut le chargement depuis le disque (cache système froid)
+        results[name] = {
+            "first_s": round(timings[0], 3),
+            "median_s": round(statistics.median(timings), 3),
+            "min_s": round(min(timings), 3),
+            "runs": len(timings)
+        }
+        if args.imports:
+            results[name]["slowest_imports"] = slowest_imports(SUBCOMMANDS[name])
+        
+        if not args.json:
+            stats = results[name]
+            print(f"{name:<10} premier {stats['first_s']:>6.3f}s   médiane {stats['median_s']:>6.3f}s   "
+                  f"min {stats['min_s']:>6.3f}s   ({stats['runs']} exécutions)")
+            for item in stats.get("slowest_imports", []):
+                print(f"    {item['cumulative_ms']:>8.1f} ms  {item['module']}")
+    
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""
+Configuration pytest commune.
+
+test_agent.py est un script manuel qui appelle le vrai LLM : il se lance avec
+`python3 test_agent.py` et n'est pas collecté par pytest.
+"""
+
+collect_ignore = ["test_agent.py"]
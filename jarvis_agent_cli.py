@@ -4,20 +4,50 @@ Interface CLI pour l'Agent Jarvis.
 """
 
 import click
+import threading
 from pathlib import Path
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
 
 from src.core.agent import JarvisAgent
+from src.core.config import get_config
+from src.core.daemon import JarvisDaemon, DaemonClient, DaemonUnavailable, run_request
 
 
 console = Console()
 
 
+def run_command(method, on_chunk=None, **params):
+    """
+    Exécute une commande de l'agent via le démon s'il est lancé, sinon dans ce processus.
+    
+    Args:
+        method: Nom de la commande (ask, build, fix, analyze, refactor, deploy, learn)
+        on_chunk: Fonction appelée avec (nom de fichier ou None, fragment) pendant la génération
+        **params: Paramètres de la commande
+        
+    Returns:
+        Résultat de la commande
+    """
+    ctx = click.get_current_context()
+    if ctx.obj.get("use_daemon", True):
+        client = DaemonClient(get_config().get_daemon_socket_path())
+        try:
+            return client.call(method, params, on_chunk)
+        except DaemonUnavailable:
+            pass
+    
+    return run_request(JarvisAgent(), method, params, on_chunk)
+
+
 @click.group()
 @click.version_option(version="1.0.0")
-def cli():
+@click.option('--no-daemon', is_flag=True, envvar='JARVIS_NO_DAEMON',
+              help='Exécuter dans ce processus même si le démon est lancé')
+@click.pass_context
+def cli(ctx, no_daemon):
     """
     Agent Jarvis - Assistant intelligent pour la construction et la maintenance d'outils informatiques.
     
@@ -26,8 +56,12 @@ def cli():
     - Réparer et maintenir du code existant
     - Apprendre de nouvelles compétences
     - Répondre à vos questions techniques
+    
+    Si le démon est lancé (jarvis-agent daemon start), les commandes lui
+    sont transmises et profitent d'un agent déjà initialisé.
     """
-    pass
+    ctx.ensure_object(dict)
+    ctx.obj["use_daemon"] = not no_daemon
 
 
 @cli.command()
@@ -50,8 +84,31 @@ def build(request, output):
     ))
     
     try:
-        agent = JarvisAgent()
-        result = agent.build(request, output_dir=output)
+        # Suivi des fichiers écrits au fil de la génération. on_chunk est appelé depuis
+        # les threads du Builder pendant que Live rafraîchit l'affichage dans le sien
+        received = {}
+        received_lock = threading.Lock()
+        
+        def render_progress():
+            progress = Table(show_header=True, header_style="bold magenta")
+            progress.add_column("Fichier", style="cyan")
+            progress.add_column("Caractères générés", style="white", justify="right")
+            with received_lock:
+                snapshot = list(received.items())
+            for file_name, count in snapshot:
+                progress.add_row(file_name, str(count))
+            return progress
+        
+        with Live(render_progress(), console=console, refresh_per_second=8, transient=True) as live:
+            def on_chunk(file_name, chunk):
+                with received_lock:
+                    received[file_name] = received.get(file_name, 0) + len(chunk)
+                live.update(render_progress())
+            
+            result = run_command(
+                "build", on_chunk=on_chunk,
+                request=request, output_dir=str(Path(output).resolve()) if output else None
+            )
         
         if result.get("success"):
             console.print("\n[bold green]✓ Construction réussie ![/bold green]\n")
@@ -95,8 +152,9 @@ def fix(project_path, issue):
     ))
     
     try:
-        agent = JarvisAgent()
-        result = agent.fix(project_path, issue)
+        result = run_command(
+            "fix", project_path=str(Path(project_path).resolve()), issue_description=issue
+        )
         
         if result.get("success"):
             console.print("\n[bold green]✓ Réparation réussie ![/bold green]\n")
@@ -108,8 +166,12 @@ def fix(project_path, issue):
             console.print(f"  Confiance : {diagnostic.get('confidence', 'N/A')}")
             
             console.print(f"\n[bold]Fichiers modifiés :[/bold]")
+            timings = result.get("timings", {})
             for file in result.get("fixed_files", []):
-                console.print(f"  ✓ {file}")
+                if file in timings:
+                    console.print(f"  ✓ {file} ({timings[file]:.1f}s)")
+                else:
+                    console.print(f"  ✓ {file}")
             
             if result.get("backup_path"):
                 console.print(f"\n[bold]Sauvegarde créée :[/bold] {result.get('backup_path')}\n")
@@ -137,8 +199,7 @@ def analyze(project_path):
     ))
     
     try:
-        agent = JarvisAgent()
-        result = agent.analyze(project_path)
+        result = run_command("analyze", project_path=str(Path(project_path).resolve()))
         
         if result.get("success"):
             console.print("\n[bold green]✓ Analyse terminée ![/bold green]\n")
@@ -191,8 +252,9 @@ def refactor(file_path, objective):
     ))
     
     try:
-        agent = JarvisAgent()
-        result = agent.refactor(file_path, objective)
+        result = run_command(
+            "refactor", file_path=str(Path(file_path).resolve()), objective=objective
+        )
         
         if result.get("success"):
             console.print("\n[bold green]✓ Refactoring réussi ![/bold green]\n")
@@ -225,11 +287,18 @@ def ask(question):
     ))
     
     try:
-        agent = JarvisAgent()
-        answer = agent.ask(question)
-        
         console.print("\n[bold green]Réponse :[/bold green]\n")
-        console.print(Panel(answer, border_style="green"))
+        
+        # Afficher la réponse au fur et à mesure de sa génération
+        parts = []
+        with Live(Panel("", border_style="green"), console=console,
+                  refresh_per_second=12, vertical_overflow="visible") as live:
+            def on_chunk(_, chunk):
+                parts.append(chunk)
+                live.update(Panel("".join(parts), border_style="green"))
+            
+            answer = run_command("ask", on_chunk=on_chunk, question=question)
+            live.update(Panel(answer, border_style="green"))
     
     except Exception as e:
         console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
@@ -260,8 +329,6 @@ def deploy(project_path, method, config):
     try:
         import json
         
-        agent = JarvisAgent()
-        
         # Parser la configuration
         deploy_config = {}
         if config:
@@ -271,7 +338,9 @@ def deploy(project_path, method, config):
                 console.print("[bold red]✗ Erreur :[/bold red] Configuration JSON invalide\n")
                 return
         
-        result = agent.deploy(project_path, method, deploy_config)
+        result = run_command(
+            "deploy", project_path=str(Path(project_path).resolve()), method=method, config=deploy_config
+        )
         
         if result.get("success"):
             console.print("\n[bold green]✓ Déploiement réussi ![/bold green]\n")
@@ -319,8 +388,9 @@ def learn(content, type, tags):
     ))
     
     try:
-        agent = JarvisAgent()
-        knowledge_id = agent.learn(content, content_type=type, tags=list(tags) if tags else None)
+        knowledge_id = run_command(
+            "learn", content=content, content_type=type, tags=list(tags) if tags else None
+        )
         
         console.print(f"\n[bold green]✓ Connaissance sauvegardée ![/bold green]")
         console.print(f"ID : {knowledge_id}\n")
@@ -366,5 +436,391 @@ def info():
     ))
 
 
+@cli.group()
+def kb():
+    """
+    Gère la base de connaissances (import en masse, compactage, migration, stockage).
+    """
+    pass
+
+
+@kb.command('import')
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--type', '-t', 'record_type', type=click.Choice(['solution', 'template']),
+              default='solution', help='Type des enregistrements importés')
+@click.option('--chunk-size', type=int, default=None,
+              help='Nombre d\'enregistrements par lot (défaut: knowledge_base.bulk_chunk_size)')
+def kb_import(source, record_type, chunk_size):
+    """
+    Importe des solutions ou des templates depuis un fichier JSONL (un objet par ligne, - pour stdin).
+    
+    Exemples :
+    
+    \b
+    jarvis-agent kb import historique.jsonl
+    jarvis-agent kb import templates.jsonl --type template --chunk-size 1000
+    cat export.jsonl | jarvis-agent kb import -
+    """
+    import json
+    
+    required = ("problem", "solution") if record_type == "solution" else ("name", "language")
+    skipped = []
+    
+    def records():
+        # Lecture au fil de l'eau : le fichier n'est jamais chargé en entier
+        for line_number, line in enumerate(source, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped.append(line_number)
+                continue
+            if not isinstance(record, dict) or any(key not in record for key in required):
+                skipped.append(line_number)
+                continue
+            yield record
+    
+    try:
+        agent = JarvisAgent()
+        
+        with console.status("Import en cours...") as status:
+            def on_progress(count):
+                status.update(f"Import en cours... {count} enregistrement(s)")
+            
+            if record_type == "solution":
+                ids = agent.kb.save_solutions_bulk(records(), chunk_size=chunk_size, on_progress=on_progress)
+            else:
+                ids = agent.kb.save_templates_bulk(records(), chunk_size=chunk_size, on_progress=on_progress)
+        
+        console.print(f"\n[bold green]✓ {len(ids)} {record_type}(s) importé(s)[/bold green]")
+        stats = agent.kb.embedding_stats()
+        if stats.get("embedded"):
+            console.print(f"[dim]Embeddings : {stats['embedded']} texte(s) encodé(s) en {stats['embed_seconds']}s "
+                          f"({stats['throughput']} textes/s), {stats['cache_hits']} servi(s) par le cache[/dim]")
+        if skipped:
+            preview = ", ".join(str(number) for number in skipped[:10])
+            console.print(f"[yellow]{len(skipped)} ligne(s) ignorée(s) (JSON invalide ou champs {', '.join(required)} manquants) : "
+                          f"{preview}{'...' if len(skipped) > 10 else ''}[/yellow]\n")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@kb.command('compact')
+@click.option('--threshold', type=float, default=None,
+              help='Similarité minimale entre deux doublons (défaut: knowledge_base.dedupe_threshold)')
+@click.option('--dry-run', is_flag=True, help='Afficher les doublons sans rien modifier')
+def kb_compact(threshold, dry_run):
+    """
+    Fusionne les solutions quasi identiques déjà enregistrées.
+    
+    Exemples :
+    
+    \b
+    jarvis-agent kb compact --dry-run
+    jarvis-agent kb compact --threshold 0.9
+    """
+    try:
+        agent = JarvisAgent()
+        
+        with console.status("Recherche des doublons..."):
+            report = agent.kb.compact_solutions(threshold=threshold, dry_run=dry_run)
+        
+        if dry_run:
+            for keeper_id, duplicate_ids in list(report["duplicates"].items())[:20]:
+                console.print(f"  {keeper_id} ← {', '.join(duplicate_ids)}")
+            if len(report["duplicates"]) > 20:
+                console.print(f"  ... et {len(report['duplicates']) - 20} autre(s) groupe(s)")
+        
+        verb = "à fusionner" if dry_run else "fusionnée(s)"
+        console.print(f"\n[bold green]✓ {report['merged']} solution(s) {verb} dans {report['groups']} groupe(s) : "
+                      f"{report['solutions']} → {report['remaining']} solution(s)[/bold green]\n")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@kb.command('migrate')
+@click.option('--dry-run', is_flag=True, help='Afficher les nouveaux IDs sans rien modifier')
+def kb_migrate(dry_run):
+    """
+    Migre les solutions à l'ancien format d'ID vers des IDs ULID rangés par préfixe.
+    
+    Exemples :
+    
+    \b
+    jarvis-agent kb migrate --dry-run
+    jarvis-agent kb migrate
+    """
+    try:
+        agent = JarvisAgent()
+        
+        with console.status("Migration en cours...") as status:
+            def on_progress(count):
+                status.update(f"Migration en cours... {count} solution(s)")
+            
+            mapping = agent.kb.migrate_solutions(dry_run=dry_run, on_progress=on_progress)
+        
+        if dry_run:
+            for old_id, new_id in list(mapping.items())[:20]:
+                console.print(f"  {old_id} → {new_id}")
+            if len(mapping) > 20:
+                console.print(f"  ... et {len(mapping) - 20} autre(s)")
+        
+        verb = "à migrer" if dry_run else "migrée(s)"
+        console.print(f"\n[bold green]✓ {len(mapping)} solution(s) {verb}[/bold green]\n")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@kb.group('store')
+def kb_store():
+    """
+    Convertit la base entre le format fichiers JSON et le stockage SQLite (knowledge_base.storage).
+    """
+    pass
+
+
+@kb_store.command('import-json')
+@click.option('--source', type=click.Path(exists=True, file_okay=False, path_type=Path), default=None,
+              help='Racine de la base au format fichiers (défaut: knowledge_base.path)')
+def kb_store_import_json(source):
+    """
+    Importe les templates, solutions et historiques JSON dans le stockage SQLite.
+    
+    Exemples :
+    
+    \b
+    jarvis-agent kb store import-json
+    jarvis-agent kb store import-json --source ~/ancienne_base
+    """
+    try:
+        agent = JarvisAgent()
+        
+        with console.status("Import en cours...") as status:
+            def on_progress(kind, count):
+                status.update(f"Import en cours... {count} {kind}(s)")
+            
+            counts = agent.kb.import_json_layout(source, on_progress=on_progress)
+        
+        console.print(f"\n[bold green]✓ {counts['template']} template(s), {counts['solution']} solution(s) et "
+                      f"{counts['history']} historique(s) importé(s)[/bold green]")
+        console.print("[dim]Les fichiers JSON sont conservés : supprimez-les une fois l'import vérifié.[/dim]\n")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@kb_store.command('export-json')
+@click.option('--dest', type=click.Path(file_okay=False, path_type=Path), default=None,
+              help='Racine de la base au format fichiers (défaut: knowledge_base.path)')
+def kb_store_export_json(dest):
+    """
+    Exporte le stockage SQLite au format fichiers JSON.
+    
+    Exemples :
+    
+    \b
+    jarvis-agent kb store export-json --dest ~/sauvegarde_base
+    """
+    try:
+        agent = JarvisAgent()
+        
+        with console.status("Export en cours..."):
+            counts = agent.kb.export_json_layout(dest)
+        
+        console.print(f"\n[bold green]✓ {counts['template']} template(s), {counts['solution']} solution(s) et "
+                      f"{counts['history']} historique(s) exporté(s)[/bold green]\n")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@cli.group()
+def history():
+    """
+    Consulte et restaure l'historique des projets construits.
+    
+    Exemples :
+    
+    \b
+    jarvis-agent history list --project mon_site
+    jarvis-agent history diff project_mon_site_20250101_120000_000000
+    jarvis-agent history restore project_mon_site_20250101_120000_000000 ./mon_site
+    """
+    pass
+
+
+@history.command('list')
+@click.option('--project', '-p', type=str, default=None, help='Filtrer par projet')
+@click.option('--limit', '-n', type=int, default=20, help='Nombre maximum d\'historiques affichés')
+def history_list(project, limit):
+    """
+    Liste les historiques de projets, du plus récent au plus ancien.
+    """
+    try:
+        agent = JarvisAgent()
+        summaries = agent.kb.list_project_history(project)
+        
+        if not summaries:
+            console.print("[yellow]Aucun historique[/yellow]")
+            return
+        
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("ID", style="cyan")
+        table.add_column("Date", style="white")
+        table.add_column("Fichiers", justify="right")
+        table.add_column("Modifiés", justify="right")
+        table.add_column("Taille", justify="right")
+        
+        for summary in summaries[:limit]:
+            table.add_row(summary["id"], summary["created_at"][:19].replace("T", " "),
+                          str(summary["files"]), str(summary["changed"]), f"{summary['size'] / 1024:.1f} Ko")
+        
+        console.print(table)
+        if len(summaries) > limit:
+            console.print(f"[dim]... et {len(summaries) - limit} autre(s)[/dim]")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@history.command('diff')
+@click.argument('old_id', type=str)
+@click.argument('new_id', type=str, required=False)
+@click.option('--patch', is_flag=True, help='Afficher le détail des modifications')
+def history_diff(old_id, new_id, patch):
+    """
+    Compare deux historiques (un seul ID : compare avec l'historique précédent du projet).
+    """
+    import difflib
+    
+    try:
+        agent = JarvisAgent()
+        
+        if new_id is None:
+            new_id = old_id
+            old_id = (agent.kb.get_project_history(new_id) or {}).get("parent")
+            if old_id is None:
+                console.print("[yellow]Aucun historique précédent pour ce projet[/yellow]")
+                return
+        
+        diff = agent.kb.diff_project_history(old_id, new_id)
+        console.print(f"\n[bold]{old_id}[/bold] → [bold]{new_id}[/bold]\n")
+        for path in diff["added"]:
+            console.print(f"[green]+ {path}[/green]")
+        for path in diff["removed"]:
+            console.print(f"[red]- {path}[/red]")
+        for path in diff["modified"]:
+            console.print(f"[yellow]~ {path}[/yellow]")
+            if patch:
+                lines = difflib.unified_diff(
+                    (agent.kb.read_project_history_file(old_id, path) or "").splitlines(keepends=True),
+                    (agent.kb.read_project_history_file(new_id, path) or "").splitlines(keepends=True),
+                    fromfile=f"{old_id}/{path}", tofile=f"{new_id}/{path}"
+                )
+                console.print("".join(lines), markup=False, highlight=False)
+        
+        console.print(f"\n{len(diff['added'])} ajouté(s), {len(diff['removed'])} supprimé(s), "
+                      f"{len(diff['modified'])} modifié(s), {diff['unchanged']} inchangé(s)\n")
+    
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@history.command('restore')
+@click.argument('history_id', type=str)
+@click.argument('dest', type=click.Path(file_okay=False, path_type=Path))
+@click.option('--overwrite', is_flag=True, help='Remplacer les fichiers existants modifiés')
+def history_restore(history_id, dest, overwrite):
+    """
+    Restaure les fichiers d'un historique dans un répertoire.
+    """
+    try:
+        agent = JarvisAgent()
+        restored = agent.kb.restore_project_history(history_id, dest, overwrite=overwrite)
+        console.print(f"\n[bold green]✓ {len(restored)} fichier(s) restauré(s) dans {dest}[/bold green]\n")
+    
+    except ValueError as e:
+        console.print(f"\n[bold red]✗ Erreur :[/bold red] {e}\n")
+    except Exception as e:
+        console.print(f"\n[bold red]✗ Erreur inattendue :[/bold red] {e}\n")
+
+
+@cli.group()
+def daemon():
+    """
+    Gère le démon de l'agent (agent gardé en mémoire, servi sur un socket Unix).
+    
+    Exemples :
+    
+    \b
+    jarvis-agent daemon start
+    jarvis-agent daemon status
+    jarvis-agent daemon stop
+    """
+    pass
+
+
+@daemon.command('start')
+def daemon_start():
+    """
+    Lance le démon au premier plan (utiliser nohup, screen ou systemd pour l'arrière-plan).
+    """
+    import signal
+    
+    agent = JarvisAgent()
+    jarvis_daemon = JarvisDaemon(agent, agent.config.get_daemon_socket_path())
+    signal.signal(signal.SIGTERM, lambda signum, frame: jarvis_daemon.stop())
+    
+    try:
+        jarvis_daemon.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n⏹️  Arrêt du démon...")
+    except RuntimeError as e:
+        console.print(f"\n[bold red]✗ Erreur :[/bold red] {e}\n")
+
+
+@daemon.command('stop')
+def daemon_stop():
+    """
+    Arrête le démon.
+    """
+    client = DaemonClient(get_config().get_daemon_socket_path())
+    try:
+        client.call("shutdown")
+        console.print("[bold green]✓ Démon arrêté[/bold green]")
+    except DaemonUnavailable:
+        console.print("[yellow]Aucun démon lancé[/yellow]")
+
+
+@daemon.command('status')
+def daemon_status():
+    """
+    Affiche l'état du démon.
+    """
+    client = DaemonClient(get_config().get_daemon_socket_path())
+    try:
+        status = client.call("ping")
+    except DaemonUnavailable:
+        console.print("[yellow]Aucun démon lancé[/yellow] : les commandes s'exécutent dans leur propre processus")
+        return
+    
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("Propriété", style="cyan")
+    table.add_column("Valeur", style="white")
+    
+    table.add_row("PID", str(status.get("pid")))
+    table.add_row("Socket", status.get("socket", "N/A"))
+    table.add_row("En service depuis", f"{status.get('uptime', 0):.0f}s")
+    table.add_row("Commandes servies", str(status.get("requests", 0)))
+    table.add_row("Commandes en cours", str(status.get("active", 0)))
+    
+    console.print(table)
+
+
 if __name__ == '__main__':
     cli()
@@ -8,8 +8,14 @@ import os
 import sys
 import time
 import json
+import random
+import signal
+import threading
 import requests
-from typing import Dict, Any, List
+from collections import deque, OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 # Ajouter le répertoire parent au path pour importer l'agent
@@ -20,6 +26,157 @@ from src.core.logger import init_logger_from_config
 from src.core.config import get_config
 
 
+# Commandes rapides : servies par des workers dédiés pour ne jamais attendre un build
+FAST_COMMAND_TYPES = {"ask", "learn", "analyze"}
+
+# Statuts qui terminent une commande
+FINAL_STATUSES = {"completed", "failed"}
+
+# Nombre de commandes exécutées mémorisées en mode séquentiel pour ne pas les relancer
+RECENT_COMMANDS_LIMIT = 1024
+
+
+class CommandQueue:
+    """File de commandes à deux voies (rapide / lente) partagée par les workers."""
+    
+    def __init__(self):
+        """Initialise une file vide."""
+        self._fast = deque()
+        self._slow = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+    
+    def put(self, command: Dict[str, Any]):
+        """
+        Ajoute une commande dans la voie correspondant à son type.
+        
+        Args:
+            command: Commande à exécuter
+        """
+        with self._condition:
+            if command.get("commandType") in FAST_COMMAND_TYPES:
+                self._fast.append(command)
+            else:
+                self._slow.append(command)
+            self._condition.notify_all()
+    
+    def get(self, allow_slow: bool) -> Optional[Dict[str, Any]]:
+        """
+        Attend la prochaine commande, en priorité dans la voie rapide.
+        
+        Args:
+            allow_slow: Le worker accepte aussi les commandes lentes
+            
+        Returns:
+            Commande à exécuter, ou None si la file est fermée
+        """
+        with self._condition:
+            while True:
+                if self._closed:
+                    return None
+                if self._fast:
+                    return self._fast.popleft()
+                if allow_slow and self._slow:
+                    return self._slow.popleft()
+                self._condition.wait()
+    
+    def close(self) -> int:
+        """
+        Ferme la file et abandonne les commandes non démarrées.
+        
+        Returns:
+            Nombre de commandes abandonnées (toujours en attente côté API)
+        """
+        with self._condition:
+            self._closed = True
+            dropped = len(self._fast) + len(self._slow)
+            self._fast.clear()
+            self._slow.clear()
+            self._condition.notify_all()
+            return dropped
+    
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._fast) + len(self._slow)
+
+
+class PollScheduler:
+    """Calcule le délai avant le prochain polling et tient les compteurs de polling."""
+    
+    def __init__(self, min_interval: float, max_interval: float,
+                 backoff_factor: float = 2.0, jitter: float = 0.2):
+        """
+        Initialise le planificateur.
+        
+        Args:
+            min_interval: Délai après le premier polling vide, en secondes
+            max_interval: Délai maximal atteint en période d'inactivité, en secondes
+            backoff_factor: Facteur multiplicatif appliqué à chaque polling vide
+            jitter: Variation aléatoire relative du délai (0.2 = ±20 %)
+        """
+        self.min_interval = max(0.0, min_interval)
+        self.max_interval = max(self.min_interval, max_interval)
+        self.backoff_factor = max(1.0, backoff_factor)
+        self.jitter = max(0.0, min(jitter, 1.0))
+        
+        self._idle_streak = 0
+        self._last_delay = 0.0
+        self._stats = {
+            "polls": 0,
+            "empty_polls": 0,
+            "commands": 0,
+            "errors": 0
+        }
+    
+    def record_poll(self, commands: int, new_work: bool, error: bool = False) -> float:
+        """
+        Enregistre le résultat d'un polling et calcule le délai suivant.
+        
+        Args:
+            commands: Nombre de commandes retournées par l'API
+            new_work: Le polling a apporté des commandes non encore prises en charge
+            error: Le polling a échoué
+            
+        Returns:
+            Délai avant le prochain polling, en secondes (0 = immédiatement)
+        """
+        self._stats["polls"] += 1
+        self._stats["commands"] += commands
+        if error:
+            self._stats["errors"] += 1
+        if not commands:
+            self._stats["empty_polls"] += 1
+        
+        if new_work:
+            # Du travail vient d'arriver : il y en a sans doute d'autres derrière
+            self._idle_streak = 0
+            self._last_delay = 0.0
+            return 0.0
+        
+        delay = min(
+            self.min_interval * self.backoff_factor ** self._idle_streak,
+            self.max_interval
+        )
+        self._idle_streak += 1
+        
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._last_delay = delay
+        return delay
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs de polling.
+        
+        Returns:
+            Dictionnaire des compteurs et du ratio de pollings vides
+        """
+        stats = dict(self._stats)
+        stats["empty_ratio"] = stats["empty_polls"] / stats["polls"] if stats["polls"] else 0.0
+        stats["current_delay"] = round(self._last_delay, 2)
+        return stats
+
+
 class JarvisWebhook:
     """Webhook pour récupérer et exécuter les commandes depuis l'API."""
     
@@ -27,7 +184,16 @@ class JarvisWebhook:
         self,
         api_url: str,
         session_cookie: str,
-        poll_interval: int = 5
+        poll_interval: int = 5,
+        workers: int = 0,
+        fast_workers: int = 1,
+        max_in_flight: Optional[int] = None,
+        drain_timeout: Optional[float] = None,
+        batch_status: bool = False,
+        batch_interval: float = 0.5,
+        max_interval: Optional[float] = None,
+        long_poll: float = 0,
+        metrics_interval: float = 300
     ):
         """
         Initialise le webhook.
@@ -36,10 +202,52 @@ class JarvisWebhook:
             api_url: URL de l'API Remote Control
             session_cookie: Cookie de session pour l'authentification
             poll_interval: Intervalle de polling en secondes (défaut: 5)
+            workers: Nombre de workers d'exécution (0 = exécution séquentielle)
+            fast_workers: Workers réservés aux commandes rapides (ask, learn, analyze)
+            max_in_flight: Nombre maximum de commandes en file ou en cours (défaut: 2 × workers)
+            drain_timeout: Attente maximale des commandes en cours à l'arrêt (None = illimitée)
+            batch_status: Regrouper les mises à jour de statut en requêtes tRPC batch
+            batch_interval: Délai maximal avant l'envoi d'un lot de statuts, en secondes
+            max_interval: Intervalle maximal de polling en période d'inactivité (défaut: 12 × poll_interval)
+            long_poll: Attente demandée au serveur quand aucune commande n'est disponible (0 = désactivé)
+            metrics_interval: Intervalle de journalisation des compteurs de polling, en secondes
         """
         self.api_url = api_url.rstrip('/')
         self.session_cookie = session_cookie
         self.poll_interval = poll_interval
+        self.workers = max(0, workers)
+        self.fast_workers = min(max(0, fast_workers), self.workers - 1) if self.workers > 1 else 0
+        self.max_in_flight = max_in_flight or max(1, 2 * self.workers)
+        self.drain_timeout = drain_timeout
+        
+        # État du pool de workers
+        self._queue = CommandQueue()
+        self._threads: List[threading.Thread] = []
+        self._tracked_ids = set()
+        self._tracked_lock = threading.Lock()
+        self._executed_ids: "OrderedDict[int, None]" = OrderedDict()
+        self._stop = threading.Event()
+        self._capacity_freed = threading.Event()
+        
+        # Polling adaptatif : immédiat tant qu'il y a du travail, backoff sinon
+        self.long_poll = max(0.0, long_poll)
+        self.metrics_interval = metrics_interval
+        self.scheduler = PollScheduler(
+            min_interval=poll_interval,
+            max_interval=max_interval if max_interval is not None else 12 * poll_interval
+        )
+        
+        # Session HTTP persistante (keep-alive, retry avec backoff)
+        self.session = self._create_session()
+        
+        # Mises à jour de statut en attente d'envoi groupé
+        self.batch_status = batch_status
+        self.batch_interval = batch_interval
+        self._batch_supported = True
+        self._pending_statuses: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._status_condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._status_thread: Optional[threading.Thread] = None
         
         # Initialiser l'agent Jarvis
         self.config = get_config()
@@ -48,7 +256,45 @@ class JarvisWebhook:
         
         self.logger.info("🔗 Webhook Jarvis initialisé")
         self.logger.info(f"   API: {self.api_url}")
-        self.logger.info(f"   Polling: toutes les {self.poll_interval}s")
+        self.logger.info(
+            f"   Polling: adaptatif, de {self.scheduler.min_interval}s à {self.scheduler.max_interval}s d'inactivité"
+        )
+        if self.long_poll:
+            self.logger.info(f"   Long-poll: {self.long_poll}s demandées au serveur")
+        if self.workers:
+            self.logger.info(
+                f"   Workers: {self.workers} (dont {self.fast_workers} réservé(s) aux commandes rapides), "
+                f"{self.max_in_flight} commande(s) en vol maximum"
+            )
+        if self.batch_status:
+            self.logger.info(f"   Statuts: envoi groupé toutes les {self.batch_interval}s")
+    
+    def _create_session(self) -> requests.Session:
+        """
+        Crée la session HTTP partagée par tous les appels à l'API.
+        
+        Returns:
+            Session avec pool de connexions, en-têtes d'authentification et retry
+        """
+        session = requests.Session()
+        session.headers.update({
+            "Content-Type": "application/json",
+            "Cookie": f"jarvis_session={self.session_cookie}"
+        })
+        
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"POST"}),
+            raise_on_status=False
+        )
+        # Une connexion par worker, plus le polling et l'envoi des statuts
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.workers + 2, max_retries=retry)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        
+        return session
     
     def get_pending_commands(self) -> List[Dict[str, Any]]:
         """
@@ -57,15 +303,22 @@ class JarvisWebhook:
         Returns:
             Liste des commandes en attente
         """
+        return self._fetch_commands() or []
+    
+    def _fetch_commands(self) -> Optional[List[Dict[str, Any]]]:
+        """
+        Interroge l'API, en demandant au serveur d'attendre si le long-poll est activé.
+        
+        Returns:
+            Liste des commandes en attente, ou None si la requête a échoué
+        """
+        payload = {"waitSeconds": self.long_poll} if self.long_poll else {}
+        
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.api_url}/api/trpc/jarvis.getPendingCommands",
-                headers={
-                    "Content-Type": "application/json",
-                    "Cookie": f"jarvis_session={self.session_cookie}"
-                },
-                json={},
-                timeout=10
+                json=payload,
+                timeout=10 + self.long_poll
             )
             
             if response.status_code == 200:
@@ -76,11 +329,11 @@ class JarvisWebhook:
                 return []
             else:
                 self.logger.error(f"Erreur API: {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             self.logger.error(f"Erreur lors de la récupération des commandes: {e}")
-            return []
+            return None
     
     def update_command_status(
         self,
@@ -92,6 +345,11 @@ class JarvisWebhook:
         """
         Met à jour le statut d'une commande.
         
+        En mode batch, seuls les statuts finaux (completed, failed) sont mis
+        en file et envoyés avec les autres dans un même aller-retour. Les
+        autres transitions, dont « processing » qui réserve la commande
+        auprès de l'API, sont envoyées immédiatement.
+        
         Args:
             command_id: ID de la commande
             status: Nouveau statut (pending, processing, completed, failed)
@@ -99,25 +357,49 @@ class JarvisWebhook:
             error: Message d'erreur (optionnel)
             
         Returns:
-            True si la mise à jour a réussi
+            True si la mise à jour a réussi (ou a été mise en file en mode batch)
         """
-        try:
-            payload = {
-                "commandId": command_id,
-                "status": status
-            }
-            
-            if result is not None:
-                payload["result"] = result
-            if error is not None:
-                payload["error"] = error
+        payload = {
+            "commandId": command_id,
+            "status": status
+        }
+        
+        if result is not None:
+            payload["result"] = result
+        if error is not None:
+            payload["error"] = error
+        
+        if self.batch_status and status in FINAL_STATUSES:
+            self._queue_status(payload)
+            return True
+        
+        return self._send_status(payload)
+    
+    def flush_status_updates(self):
+        """
+        Envoie immédiatement les mises à jour de statut en attente.
+        
+        Un envoi déjà en cours dans un autre thread est attendu : au retour,
+        tous les statuts mis en file avant l'appel ont été transmis. Les
+        commandes terminées ne sont libérées qu'à ce moment, pour qu'un
+        polling ne les reprenne pas tant que l'API les voit en attente.
+        """
+        with self._flush_lock:
+            with self._status_condition:
+                payloads = list(self._pending_statuses.values())
+                self._pending_statuses.clear()
             
-            response = requests.post(
+            if payloads:
+                self._send_status_batch(payloads)
+                self._release_commands([
+                    payload["commandId"] for payload in payloads if payload["status"] in FINAL_STATUSES
+                ])
+    
+    def _send_status(self, payload: Dict[str, Any]) -> bool:
+        """Envoie une mise à jour de statut unique."""
+        try:
+            response = self.session.post(
                 f"{self.api_url}/api/trpc/jarvis.updateCommandStatus",
-                headers={
-                    "Content-Type": "application/json",
-                    "Cookie": f"jarvis_session={self.session_cookie}"
-                },
                 json=payload,
                 timeout=10
             )
@@ -128,6 +410,69 @@ class JarvisWebhook:
             self.logger.error(f"Erreur lors de la mise à jour du statut: {e}")
             return False
     
+    def _send_status_batch(self, payloads: List[Dict[str, Any]]) -> bool:
+        """
+        Envoie plusieurs mises à jour en une requête tRPC batch.
+        
+        Si l'API refuse le format batch, le webhook repasse définitivement
+        à des requêtes individuelles.
+        """
+        if len(payloads) == 1 or not self._batch_supported:
+            return all([self._send_status(payload) for payload in payloads])
+        
+        procedures = ",".join(["jarvis.updateCommandStatus"] * len(payloads))
+        try:
+            response = self.session.post(
+                f"{self.api_url}/api/trpc/{procedures}",
+                params={"batch": "1"},
+                json={str(index): payload for index, payload in enumerate(payloads)},
+                timeout=10
+            )
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'envoi groupé des statuts: {e}")
+            return False
+        
+        if response.status_code in (400, 404, 405):
+            self.logger.warning("Envoi groupé non supporté par l'API, passage en requêtes individuelles")
+            self._batch_supported = False
+            return all([self._send_status(payload) for payload in payloads])
+        
+        return response.status_code == 200
+    
+    def _queue_status(self, payload: Dict[str, Any]):
+        """Met une mise à jour de statut en file pour le prochain envoi groupé."""
+        with self._status_condition:
+            # Un statut plus récent remplace celui qui n'a pas encore été envoyé
+            self._pending_statuses.pop(payload["commandId"], None)
+            self._pending_statuses[payload["commandId"]] = payload
+            self._status_condition.notify()
+        
+        if self._status_thread is None:
+            self._start_status_flusher()
+    
+    def _start_status_flusher(self):
+        """Démarre le thread d'envoi périodique des statuts."""
+        with self._status_condition:
+            if self._status_thread is not None:
+                return
+            self._status_thread = threading.Thread(
+                target=self._status_flush_loop,
+                name="jarvis-status-flusher",
+                daemon=True
+            )
+            self._status_thread.start()
+    
+    def _status_flush_loop(self):
+        """Envoie les statuts en attente au plus tard toutes les batch_interval secondes."""
+        while True:
+            with self._status_condition:
+                while not self._pending_statuses:
+                    self._status_condition.wait()
+            
+            # Laisser le temps aux autres transitions de rejoindre le lot
+            time.sleep(self.batch_interval)
+            self.flush_status_updates()
+    
     def execute_command(self, command: Dict[str, Any]) -> Dict[str, Any]:
         """
         Exécute une commande avec l'agent Jarvis.
@@ -199,26 +544,207 @@ class JarvisWebhook:
         self.logger.success("🚀 Webhook Jarvis démarré")
         self.logger.info("En attente de commandes...")
         
+        self._install_signal_handlers()
+        if self.workers:
+            self._start_workers()
+        
+        next_metrics = time.monotonic() + self.metrics_interval
+        
         try:
-            while True:
+            while not self._stop.is_set():
+                # Les statuts en file doivent être transmis avant de redemander les commandes en attente
+                if self.batch_status:
+                    self.flush_status_updates()
+                
+                # Ne récupérer de nouvelles commandes que s'il reste de la place
+                if self.workers and not self._has_capacity():
+                    self._capacity_freed.clear()
+                    if not self._has_capacity():
+                        self._capacity_freed.wait(self.poll_interval)
+                    continue
+                
                 # Récupérer les commandes en attente
-                commands = self.get_pending_commands()
+                started = time.monotonic()
+                commands = self._fetch_commands()
+                elapsed = time.monotonic() - started
+                error = commands is None
+                commands = commands or []
+                new_work = False
                 
-                if commands:
-                    self.logger.info(f"📥 {len(commands)} commande(s) en attente")
+                if commands and self.workers:
+                    # Les workers exécutent, le polling continue
+                    accepted = self._dispatch(commands)
+                    if accepted:
+                        self.logger.info(f"📥 {accepted} commande(s) mise(s) en file")
+                    new_work = accepted > 0
+                
+                elif commands:
+                    # Une commande déjà exécutée encore listée par l'API n'est pas relancée
+                    fresh = [command for command in commands if command["id"] not in self._executed_ids]
+                    if fresh:
+                        self.logger.info(f"📥 {len(fresh)} commande(s) en attente")
                     
                     # Exécuter chaque commande
-                    for command in commands:
+                    for command in fresh:
+                        self._remember_executed(command["id"])
                         self.execute_command(command)
+                    
+                    new_work = bool(fresh)
+                
+                # Un long-poll honoré par le serveur a déjà attendu : pas de délai supplémentaire
+                waited = bool(self.long_poll) and not error and elapsed >= self.long_poll / 2
+                delay = self.scheduler.record_poll(len(commands), new_work or waited, error)
+                
+                if self.metrics_interval and time.monotonic() >= next_metrics:
+                    self._log_poll_metrics()
+                    next_metrics = time.monotonic() + self.metrics_interval
                 
                 # Attendre avant le prochain polling
-                time.sleep(self.poll_interval)
+                if delay:
+                    self._stop.wait(delay)
                 
         except KeyboardInterrupt:
             self.logger.info("\n⏹️  Arrêt du webhook...")
         except Exception as e:
             self.logger.error(f"Erreur fatale: {e}")
             raise
+        finally:
+            if self.workers:
+                self._drain()
+            if self.batch_status:
+                self.flush_status_updates()
+            self.session.close()
+            self._log_poll_metrics()
+    
+    def stop(self):
+        """Demande l'arrêt du webhook à la fin du cycle de polling en cours."""
+        self._stop.set()
+        self._capacity_freed.set()
+    
+    def poll_metrics(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs de polling.
+        
+        Returns:
+            Nombre de pollings, de pollings vides, ratio de pollings vides...
+        """
+        return self.scheduler.stats()
+    
+    def _log_poll_metrics(self):
+        """Journalise les compteurs de polling."""
+        stats = self.poll_metrics()
+        self.logger.info(
+            f"📊 Polling: {stats['polls']} requête(s), {stats['empty_polls']} vide(s) "
+            f"({stats['empty_ratio']:.0%}), {stats['commands']} commande(s) reçue(s), "
+            f"{stats['errors']} erreur(s), prochain délai {stats['current_delay']}s"
+        )
+    
+    def _install_signal_handlers(self):
+        """Arrête proprement le webhook sur SIGTERM."""
+        def handle_sigterm(signum, frame):
+            self.logger.info("\n⏹️  SIGTERM reçu, arrêt du webhook...")
+            self.stop()
+        
+        try:
+            signal.signal(signal.SIGTERM, handle_sigterm)
+        except ValueError:
+            # signal.signal n'est disponible que dans le thread principal
+            pass
+    
+    def _start_workers(self):
+        """Démarre les workers d'exécution."""
+        for index in range(self.workers):
+            allow_slow = index >= self.fast_workers
+            thread = threading.Thread(
+                target=self._worker_loop,
+                args=(allow_slow,),
+                name=f"jarvis-worker-{index + 1}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+    
+    def _worker_loop(self, allow_slow: bool):
+        """Boucle d'un worker : exécute les commandes de la file jusqu'à sa fermeture."""
+        while True:
+            command = self._queue.get(allow_slow)
+            if command is None:
+                return
+            
+            try:
+                self.execute_command(command)
+            except Exception as e:
+                self.logger.error(f"Erreur inattendue du worker: {e}")
+                self._release_commands([command["id"]])
+            else:
+                # En mode batch, la commande est libérée à l'envoi de son statut final
+                if not self.batch_status:
+                    self._release_commands([command["id"]])
+    
+    def _release_commands(self, command_ids: List[int]):
+        """Retire des commandes de la liste des commandes en vol et réveille le polling."""
+        if not command_ids:
+            return
+        with self._tracked_lock:
+            self._tracked_ids.difference_update(command_ids)
+        self._capacity_freed.set()
+    
+    def _remember_executed(self, command_id: int):
+        """Mémorise une commande exécutée en mode séquentiel (les plus anciennes sont oubliées)."""
+        self._executed_ids[command_id] = None
+        while len(self._executed_ids) > RECENT_COMMANDS_LIMIT:
+            self._executed_ids.popitem(last=False)
+    
+    def _has_capacity(self) -> bool:
+        """Indique si de nouvelles commandes peuvent être prises en charge."""
+        with self._tracked_lock:
+            return len(self._tracked_ids) < self.max_in_flight
+    
+    def _dispatch(self, commands: List[Dict[str, Any]]) -> int:
+        """
+        Place les commandes dans la file des workers.
+        
+        Les commandes déjà en file ou en cours (toujours « pending » côté API
+        tant qu'elles n'ont pas démarré) sont ignorées, et celles qui dépassent
+        la limite en vol restent en attente pour un prochain polling.
+        
+        Returns:
+            Nombre de commandes mises en file
+        """
+        accepted = 0
+        for command in commands:
+            with self._tracked_lock:
+                if command["id"] in self._tracked_ids:
+                    continue
+                if len(self._tracked_ids) >= self.max_in_flight:
+                    break
+                self._tracked_ids.add(command["id"])
+            
+            self._queue.put(command)
+            accepted += 1
+        
+        return accepted
+    
+    def _drain(self):
+        """Attend la fin des commandes en cours ; les commandes non démarrées restent en attente côté API."""
+        dropped = self._queue.close()
+        if dropped:
+            self.logger.info(f"{dropped} commande(s) non démarrée(s) laissée(s) en attente")
+        
+        running = [thread for thread in self._threads if thread.is_alive()]
+        if running:
+            self.logger.info("Attente de la fin des commandes en cours...")
+        
+        deadline = time.monotonic() + self.drain_timeout if self.drain_timeout is not None else None
+        for thread in running:
+            timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+            thread.join(timeout)
+        
+        still_running = [thread.name for thread in self._threads if thread.is_alive()]
+        if still_running:
+            self.logger.warning(f"Commandes toujours en cours à l'arrêt : {', '.join(still_running)}")
+        else:
+            self.logger.info("Tous les workers sont arrêtés")
 
 
 def main():
@@ -244,7 +770,48 @@ def main():
         "--interval",
         type=int,
         default=5,
-        help="Intervalle de polling en secondes (défaut: 5)"
+        help="Intervalle de polling en secondes, point de départ du backoff (défaut: 5)"
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=None,
+        help="Intervalle maximal de polling en période d'inactivité, en secondes (défaut: 12 × --interval)"
+    )
+    parser.add_argument(
+        "--long-poll",
+        type=float,
+        default=0,
+        help="Attente demandée au serveur quand aucune commande n'est disponible, en secondes (défaut: 0, désactivé)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Nombre de workers d'exécution parallèle (défaut: 0, exécution séquentielle)"
+    )
+    parser.add_argument(
+        "--fast-workers",
+        type=int,
+        default=1,
+        help="Workers réservés aux commandes rapides ask/learn/analyze (défaut: 1)"
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=None,
+        help="Nombre maximum de commandes en file ou en cours (défaut: 2 × workers)"
+    )
+    parser.add_argument(
+        "--batch-status",
+        action="store_true",
+        help="Regrouper les mises à jour de statut en requêtes tRPC batch"
+    )
+    parser.add_argument(
+        "--drain-timeout",
+        type=float,
+        default=None,
+        help="Attente maximale des commandes en cours à l'arrêt, en secondes (défaut: illimitée)"
     )
     
     args = parser.parse_args()
@@ -253,7 +820,14 @@ def main():
     webhook = JarvisWebhook(
         api_url=args.api_url,
         session_cookie=args.session_cookie,
-        poll_interval=args.interval
+        poll_interval=args.interval,
+        workers=args.workers,
+        fast_workers=args.fast_workers,
+        max_in_flight=args.max_in_flight,
+        drain_timeout=args.drain_timeout,
+        batch_status=args.batch_status,
+        max_interval=args.max_interval,
+        long_poll=args.long_poll
     )
     
     webhook.run()
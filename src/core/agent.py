@@ -2,16 +2,12 @@
 Agent Jarvis - Orchestrateur principal.
 """
 
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, Iterator
 
 from .config import get_config
 from .logger import init_logger_from_config
-from .llm import LLMClient
-from .knowledge_base import KnowledgeBase
-from ..modules.builder import Builder
-from ..modules.fixer import Fixer
-from ..modules.deployer import Deployer
 
 
 class JarvisAgent:
@@ -30,35 +26,77 @@ class JarvisAgent:
         # Initialiser le logger
         self.logger = init_logger_from_config(self.config)
         
-        self.logger.section("Initialisation de l'Agent Jarvis")
-        
-        # Initialiser le client LLM
-        self.logger.action("Initialisation du client LLM...")
-        self.llm = LLMClient(self.config)
-        self.logger.success(f"Client LLM initialisé (modèle: {self.config.llm.model})")
-        
-        # Initialiser la base de connaissances
-        self.logger.action("Initialisation de la base de connaissances...")
-        self.kb = KnowledgeBase(self.config, self.llm)
-        self.logger.success("Base de connaissances initialisée")
-        
-        # Initialiser les modules
-        self.logger.action("Initialisation des modules...")
-        
-        self.builder = None
-        if self.config.modules.builder:
-            self.builder = Builder(self.config, self.llm, self.kb, self.logger)
-            self.logger.success("✓ Module Builder activé")
-        
-        self.fixer = None
-        if self.config.modules.fixer:
-            self.fixer = Fixer(self.config, self.llm, self.kb, self.logger)
-            self.logger.success("✓ Module Fixer activé")
-        
-        self.deployer = Deployer(self.config, self.llm, self.kb, self.logger)
-        self.logger.success("✓ Module Deployer activé")
-        
-        self.logger.success("Agent Jarvis prêt !")
+        # Les sous-systèmes (client LLM, base de connaissances, modules) sont
+        # créés au premier accès : une commande n'initialise que ce qu'elle utilise
+        self._init_lock = threading.RLock()
+        self._llm = None
+        self._kb = None
+        self._builder = None
+        self._fixer = None
+        self._deployer = None
+    
+    @property
+    def llm(self):
+        """Client LLM, créé au premier accès."""
+        if self._llm is None:
+            with self._init_lock:
+                if self._llm is None:
+                    from .llm import LLMClient
+                    
+                    self.logger.action("Initialisation du client LLM...")
+                    self._llm = LLMClient(self.config)
+                    self.logger.success(f"Client LLM initialisé (modèle: {self.config.llm.model})")
+        return self._llm
+    
+    @property
+    def kb(self):
+        """Base de connaissances, créée au premier accès."""
+        if self._kb is None:
+            with self._init_lock:
+                if self._kb is None:
+                    from .knowledge_base import KnowledgeBase
+                    
+                    llm = self.llm
+                    self.logger.action("Initialisation de la base de connaissances...")
+                    self._kb = KnowledgeBase(self.config, llm)
+                    self.logger.success("Base de connaissances initialisée")
+        return self._kb
+    
+    @property
+    def builder(self):
+        """Module Builder, créé au premier accès (None s'il est désactivé)."""
+        if self._builder is None and self.config.modules.builder:
+            with self._init_lock:
+                if self._builder is None:
+                    from ..modules.builder import Builder
+                    
+                    self._builder = Builder(self.config, self.llm, self.kb, self.logger)
+                    self.logger.success("✓ Module Builder activé")
+        return self._builder
+    
+    @property
+    def fixer(self):
+        """Module Fixer, créé au premier accès (None s'il est désactivé)."""
+        if self._fixer is None and self.config.modules.fixer:
+            with self._init_lock:
+                if self._fixer is None:
+                    from ..modules.fixer import Fixer
+                    
+                    self._fixer = Fixer(self.config, self.llm, self.kb, self.logger)
+                    self.logger.success("✓ Module Fixer activé")
+        return self._fixer
+    
+    @property
+    def deployer(self):
+        """Module Deployer, créé au premier accès."""
+        if self._deployer is None:
+            with self._init_lock:
+                if self._deployer is None:
+                    from ..modules.deployer import Deployer
+                    
+                    self._deployer = Deployer(self.config, self.llm, self.kb, self.logger)
+                    self.logger.success("✓ Module Deployer activé")
+        return self._deployer
     
     def process_request(self, request: str) -> Dict[str, Any]:
         """
@@ -91,13 +129,16 @@ class JarvisAgent:
                 "suggestion": "Essayez de reformuler votre demande"
             }
     
-    def build(self, request: str, output_dir: Optional[str] = None) -> Dict[str, Any]:
+    def build(self, request: str, output_dir: Optional[str] = None,
+              on_chunk: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
         """
         Construit un outil informatique.
         
         Args:
             request: Description de l'outil à construire
             output_dir: Répertoire de sortie (optionnel)
+            on_chunk: Fonction appelée avec (nom de fichier, fragment) pendant la génération ;
+                pour un site statique, elle est appelée simultanément depuis plusieurs threads
             
         Returns:
             Résultat de la construction
@@ -122,7 +163,8 @@ class JarvisAgent:
                     project_name=analysis.get("project_name", "site_web"),
                     description=request,
                     features=analysis.get("features", []),
-                    output_dir=output_dir
+                    output_dir=output_dir,
+                    on_chunk=on_chunk
                 )
         
         elif "api" in tool_type:
@@ -132,7 +174,8 @@ class JarvisAgent:
                 project_name=analysis.get("project_name", "api"),
                 description=request,
                 endpoints=endpoints,
-                output_dir=output_dir
+                output_dir=output_dir,
+                on_chunk=on_chunk
             )
         
         elif "cli" in tool_type or "commande" in tool_type:
@@ -142,7 +185,8 @@ class JarvisAgent:
                 project_name=analysis.get("project_name", "cli_tool"),
                 description=request,
                 commands=commands,
-                output_dir=output_dir
+                output_dir=output_dir,
+                on_chunk=on_chunk
             )
         
         else:
@@ -152,7 +196,8 @@ class JarvisAgent:
                 project_name=analysis.get("project_name", "projet"),
                 description=request,
                 features=analysis.get("features", []),
-                output_dir=output_dir
+                output_dir=output_dir,
+                on_chunk=on_chunk
             )
     
     def fix(self, project_path: str, issue_description: str) -> Dict[str, Any]:
@@ -213,18 +258,57 @@ class JarvisAgent:
         Returns:
             Réponse de l'agent
         """
+        full_context = self._build_ask_context(question, context)
+        return self.llm.answer_question(question, full_context)
+    
+    def ask_stream(self, question: str, context: Optional[str] = None) -> Iterator[str]:
+        """
+        Pose une question à l'agent et produit la réponse au fil de sa génération.
+        
+        Args:
+            question: Question à poser
+            context: Contexte additionnel (optionnel)
+            
+        Yields:
+            Fragments de la réponse
+        """
+        full_context = self._build_ask_context(question, context)
+        return self.llm.answer_question_stream(question, full_context)
+    
+    def _build_ask_context(self, question: str, context: Optional[str]) -> Optional[str]:
+        """
+        Complète le contexte d'une question avec les solutions de la base de connaissances.
+        
+        Le contexte fourni et les solutions se partagent les tokens laissés par
+        la question dans le budget du prompt (le contexte fourni pèse double) ;
+        un texte trop long est coupé à une limite de paragraphe ou de ligne.
+        """
+        from . import prompts
+        
         # Rechercher dans la base de connaissances
         solutions = self.kb.search_solutions(question, limit=3)
         
-        kb_context = ""
-        if solutions:
-            kb_context = "\n\nSolutions similaires trouvées dans la base de connaissances :\n"
-            for i, solution in enumerate(solutions, 1):
-                kb_context += f"\n{i}. {solution.get('problem', 'N/A')}\n   Solution : {solution.get('solution', 'N/A')[:200]}...\n"
+        budget = self.llm.budget
+        header = "\n\nSolutions similaires trouvées dans la base de connaissances :\n" if solutions else ""
+        available = budget.remaining(prompts.answer_question_messages(question, header or "-"))
+        
+        entries = [
+            f"\n{i}. {solution.get('problem', 'N/A')}\n   Solution : {solution.get('solution', 'N/A')}\n"
+            for i, solution in enumerate(solutions, 1)
+        ]
+        texts = ([context] if context else []) + entries
+        weights = ([2] if context else []) + [1] * len(entries)
+        fitted = budget.fit(texts, available, weights)
+        
+        if context:
+            context, entries = fitted[0], fitted[1:]
+        else:
+            entries = fitted
+        kb_context = header + "".join(entries) if any(entries) else ""
         
         full_context = f"{context}\n{kb_context}" if context else kb_context
         
-        return self.llm.answer_question(question, full_context if full_context else None)
+        return full_context if full_context else None
     
     def deploy(
         self,
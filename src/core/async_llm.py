@@ -0,0 +1,347 @@
+"""
+Module du client LLM asynchrone.
+
+Toutes les requêtes passent par une boucle d'événements dédiée au client :
+le pool de connexions HTTP et la limite de requêtes simultanées sont ainsi
+partagés par toutes les tâches et tous les threads du processus.
+"""
+
+import asyncio
+import threading
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterator, Awaitable
+
+from .cache import PersistentLRUCache
+from .llm import BaseLLMClient
+from . import prompts
+
+
+def _sync_method(name: str):
+    """Crée la version bloquante d'une méthode asynchrone du client."""
+    def wrapper(self, *args, **kwargs):
+        return self.run_sync(getattr(self, name)(*args, **kwargs))
+    
+    wrapper.__name__ = f"{name}_sync"
+    wrapper.__doc__ = f"Version bloquante de {name}, utilisable hors d'une boucle asyncio."
+    return wrapper
+
+
+def _sync_stream_method(name: str):
+    """Crée la version bloquante d'une méthode de streaming asynchrone du client."""
+    def wrapper(self, *args, **kwargs):
+        return self.iterate_sync(getattr(self, name)(*args, **kwargs))
+    
+    wrapper.__name__ = f"{name}_sync"
+    wrapper.__doc__ = f"Version bloquante de {name}, sous forme de générateur."
+    return wrapper
+
+
+class AsyncLLMClient(BaseLLMClient):
+    """Client asynchrone pour interagir avec les modèles LLM."""
+    
+    def __init__(self, config, cache: Optional[PersistentLRUCache] = None):
+        """
+        Initialise le client LLM asynchrone.
+        
+        Args:
+            config: Instance de Config contenant la configuration LLM
+            cache: Cache des réponses à partager avec un LLMClient (optionnel)
+        """
+        super().__init__(config, cache)
+        
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        
+        # Créés dans la boucle du client, au premier appel
+        self._client = None
+        self._in_flight: Optional[asyncio.Semaphore] = None
+    
+    async def chat(self, messages: List[Dict[str, str]],
+                   temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None,
+                   use_cache: Optional[bool] = None) -> str:
+        """
+        Envoie une requête de chat au modèle LLM.
+        
+        Args:
+            messages: Liste de messages au format OpenAI
+            temperature: Température pour la génération (optionnel)
+            max_tokens: Longueur de réponse voulue (optionnel, bornée par la place laissée par le prompt)
+            use_cache: Forcer (True) ou désactiver (False) le cache pour cet appel
+            
+        Returns:
+            Réponse du modèle
+        """
+        return await self._submit(self._chat(messages, temperature, max_tokens, use_cache))
+    
+    async def chat_stream(self, messages: List[Dict[str, str]],
+                          temperature: Optional[float] = None,
+                          max_tokens: Optional[int] = None,
+                          use_cache: Optional[bool] = None) -> AsyncIterator[str]:
+        """
+        Envoie une requête de chat et produit la réponse au fil de sa génération.
+        
+        Args:
+            messages: Liste de messages au format OpenAI
+            temperature: Température pour la génération (optionnel)
+            max_tokens: Longueur de réponse voulue (optionnel, bornée par la place laissée par le prompt)
+            use_cache: Forcer (True) ou désactiver (False) le cache pour cet appel
+            
+        Yields:
+            Fragments de texte dans l'ordre de réception
+        """
+        stream = self._chat_stream(messages, temperature, max_tokens, use_cache)
+        
+        async def next_chunk():
+            return await stream.__anext__()
+        
+        try:
+            while True:
+                try:
+                    chunk = await self._submit(next_chunk())
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            await self._submit(stream.aclose())
+    
+    async def generate_code(self, prompt: str, language: str = "python") -> str:
+        """Génère du code à partir d'un prompt."""
+        return await self.chat(prompts.generate_code_messages(prompt, language))
+    
+    def generate_code_stream(self, prompt: str, language: str = "python") -> AsyncIterator[str]:
+        """Génère du code à partir d'un prompt, au fil de la génération."""
+        return self.chat_stream(prompts.generate_code_messages(prompt, language))
+    
+    async def analyze_code(self, code: str, language: str = "python") -> Dict[str, Any]:
+        """Analyse du code pour détecter des problèmes."""
+        response = await self.chat(prompts.analyze_code_messages(code, language))
+        return prompts.parse_analysis_response(response)
+    
+    async def fix_code(self, code: str, error_message: str, language: str = "python") -> str:
+        """Répare du code en fonction d'un message d'erreur."""
+        return await self.chat(prompts.fix_code_messages(code, error_message, language),
+                               max_tokens=self.budget.rewrite_tokens(code))
+    
+    def fix_code_stream(self, code: str, error_message: str, language: str = "python") -> AsyncIterator[str]:
+        """Répare du code en fonction d'un message d'erreur, au fil de la génération."""
+        return self.chat_stream(prompts.fix_code_messages(code, error_message, language),
+                                max_tokens=self.budget.rewrite_tokens(code))
+    
+    async def explain_code(self, code: str, language: str = "python") -> str:
+        """Explique ce que fait un code."""
+        return await self.chat(prompts.explain_code_messages(code, language))
+    
+    async def generate_documentation(self, code: str, language: str = "python") -> str:
+        """Génère de la documentation pour du code."""
+        return await self.chat(prompts.documentation_messages(code, language))
+    
+    async def refactor_code(self, code: str, language: str = "python",
+                            objective: str = "améliorer la lisibilité et la maintenabilité",
+                            usages: Optional[str] = None) -> str:
+        """Refactorise du code selon un objectif."""
+        return await self.chat(prompts.refactor_code_messages(code, language, objective, usages),
+                               max_tokens=self.budget.rewrite_tokens(code))
+    
+    async def answer_question(self, question: str, context: Optional[str] = None) -> str:
+        """Répond à une question, éventuellement avec un contexte."""
+        return await self.chat(prompts.answer_question_messages(question, context))
+    
+    def answer_question_stream(self, question: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        """Répond à une question au fil de la génération."""
+        return self.chat_stream(prompts.answer_question_messages(question, context))
+    
+    # Versions bloquantes, pour les appelants synchrones existants
+    chat_sync = _sync_method("chat")
+    chat_stream_sync = _sync_stream_method("chat_stream")
+    generate_code_sync = _sync_method("generate_code")
+    generate_code_stream_sync = _sync_stream_method("generate_code_stream")
+    analyze_code_sync = _sync_method("analyze_code")
+    fix_code_sync = _sync_method("fix_code")
+    fix_code_stream_sync = _sync_stream_method("fix_code_stream")
+    explain_code_sync = _sync_method("explain_code")
+    generate_documentation_sync = _sync_method("generate_documentation")
+    refactor_code_sync = _sync_method("refactor_code")
+    answer_question_sync = _sync_method("answer_question")
+    answer_question_stream_sync = _sync_stream_method("answer_question_stream")
+    
+    def run_sync(self, coro: Awaitable) -> Any:
+        """
+        Exécute une coroutine du client depuis du code synchrone.
+        
+        Args:
+            coro: Coroutine à exécuter
+            
+        Returns:
+            Résultat de la coroutine
+        """
+        loop = self._ensure_loop()
+        if self._in_client_loop():
+            raise RuntimeError("run_sync ne peut pas être appelé depuis la boucle du client")
+        
+        async def runner():
+            return await coro
+        
+        return asyncio.run_coroutine_threadsafe(runner(), loop).result()
+    
+    def iterate_sync(self, stream: AsyncIterator[str]) -> Iterator[str]:
+        """
+        Parcourt un flux asynchrone du client depuis du code synchrone.
+        
+        Args:
+            stream: Flux retourné par une méthode *_stream
+            
+        Yields:
+            Fragments du flux
+        """
+        async def next_chunk():
+            return await stream.__anext__()
+        
+        try:
+            while True:
+                try:
+                    yield self.run_sync(next_chunk())
+                except StopAsyncIteration:
+                    break
+        finally:
+            self.run_sync(stream.aclose())
+    
+    async def aclose(self):
+        """Ferme le client HTTP et arrête la boucle du client."""
+        if self._loop is None:
+            return
+        
+        if self._client is not None:
+            await self._submit(self._client.close())
+            self._client = None
+        
+        loop = self._loop
+        self._loop = None
+        loop.call_soon_threadsafe(loop.stop)
+    
+    def close(self):
+        """Version bloquante de aclose."""
+        if self._loop is None:
+            return
+        
+        if self._client is not None:
+            self.run_sync(self._client.close())
+            self._client = None
+        
+        loop, thread = self._loop, self._loop_thread
+        self._loop = None
+        loop.call_soon_threadsafe(loop.stop)
+        if thread is not None:
+            thread.join(timeout=5)
+    
+    async def _chat(self, messages: List[Dict[str, str]], temperature: Optional[float],
+                    max_tokens: Optional[int], use_cache: Optional[bool]) -> str:
+        """Envoie une requête de chat depuis la boucle du client."""
+        temp, tokens = self._resolve_params(messages, temperature, max_tokens)
+        
+        # Le niveau disque du cache (SQLite) est bloquant : hors de la boucle
+        cache_key, cached = await asyncio.to_thread(self._cache_lookup, messages, temp, tokens, use_cache)
+        if cached is not None:
+            return cached
+        
+        client, in_flight = self._get_client()
+        async with in_flight:
+            response = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens
+            )
+        
+        content = response.choices[0].message.content
+        
+        if cache_key is not None and content is not None:
+            await asyncio.to_thread(self.cache.set, cache_key, content)
+        
+        return content
+    
+    async def _chat_stream(self, messages: List[Dict[str, str]], temperature: Optional[float],
+                           max_tokens: Optional[int], use_cache: Optional[bool]) -> AsyncIterator[str]:
+        """Produit une réponse en streaming depuis la boucle du client."""
+        temp, tokens = self._resolve_params(messages, temperature, max_tokens)
+        
+        cache_key, cached = await asyncio.to_thread(self._cache_lookup, messages, temp, tokens, use_cache)
+        if cached is not None:
+            yield cached
+            return
+        
+        parts = []
+        client, in_flight = self._get_client()
+        async with in_flight:
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens,
+                stream=True
+            )
+            
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    if cache_key is not None:
+                        parts.append(delta)
+                    yield delta
+        
+        # Seule une réponse reçue en entier est mise en cache
+        if cache_key is not None:
+            await asyncio.to_thread(self.cache.set, cache_key, "".join(parts))
+    
+    def _get_client(self):
+        """Crée au besoin le client OpenAI et son pool de connexions."""
+        if self._client is None:
+            import httpx
+            from openai import AsyncOpenAI
+            
+            pool_size = self.config.llm.http_pool_size
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size
+                ),
+                timeout=httpx.Timeout(600.0, connect=10.0)
+            )
+            # Les variables d'environnement OPENAI_API_KEY et base_url sont déjà configurées
+            self._client = AsyncOpenAI(http_client=http_client)
+            self._in_flight = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._client, self._in_flight
+    
+    async def _submit(self, coro: Awaitable) -> Any:
+        """Exécute une coroutine dans la boucle du client et en attend le résultat."""
+        loop = self._ensure_loop()
+        if self._in_client_loop():
+            return await coro
+        
+        async def runner():
+            return await coro
+        
+        future = asyncio.run_coroutine_threadsafe(runner(), loop)
+        return await asyncio.wrap_future(future)
+    
+    def _in_client_loop(self) -> bool:
+        """Indique si l'appelant s'exécute déjà dans la boucle du client."""
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Démarre au besoin la boucle d'événements dédiée du client."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="async-llm-client",
+                    daemon=True
+                )
+                thread.start()
+                self._loop, self._loop_thread = loop, thread
+            return self._loop
@@ -0,0 +1,92 @@
+"""
+Module de stockage adressé par contenu des fichiers de projets.
+
+Chaque contenu est rangé une seule fois sous son empreinte SHA-256,
+compressé par zlib, dans blobs/<2 premiers caractères>/<empreinte>. Les
+historiques de projets ne conservent qu'un manifeste {chemin: empreinte} :
+un fichier inchangé d'une construction à l'autre n'est jamais réécrit.
+"""
+
+import hashlib
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Optional
+
+
+class BlobStore:
+    """Stockage de contenus compressés indexés par leur empreinte SHA-256."""
+    
+    def __init__(self, root: Path, compression_level: int = 6):
+        """
+        Initialise le stockage.
+        
+        Args:
+            root: Répertoire des blobs
+            compression_level: Niveau de compression zlib (0 à 9)
+        """
+        self.root = Path(root)
+        self.compression_level = compression_level
+    
+    @staticmethod
+    def digest(content: bytes) -> str:
+        """
+        Calcule l'empreinte d'un contenu.
+        
+        Args:
+            content: Contenu brut
+            
+        Returns:
+            Empreinte SHA-256 hexadécimale
+        """
+        return hashlib.sha256(content).hexdigest()
+    
+    def put(self, content: bytes, digest: Optional[str] = None) -> str:
+        """
+        Enregistre un contenu s'il n'est pas déjà présent.
+        
+        Args:
+            content: Contenu brut
+            digest: Empreinte déjà calculée (optionnel)
+            
+        Returns:
+            Empreinte du contenu
+        """
+        digest = digest or self.digest(content)
+        blob_file = self.path(digest)
+        if blob_file.exists():
+            return digest
+        
+        blob_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Écriture atomique : un blob présent est toujours complet
+        tmp_file = blob_file.with_name(f".{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'wb') as f:
+            f.write(zlib.compress(content, self.compression_level))
+        os.replace(tmp_file, blob_file)
+        return digest
+    
+    def get(self, digest: str) -> bytes:
+        """
+        Lit un contenu.
+        
+        Args:
+            digest: Empreinte du contenu
+            
+        Returns:
+            Contenu brut
+            
+        Raises:
+            FileNotFoundError: Si le blob est absent
+        """
+        with open(self.path(digest), 'rb') as f:
+            return zlib.decompress(f.read())
+    
+    def exists(self, digest: str) -> bool:
+        """Indique si un contenu est présent."""
+        return self.path(digest).exists()
+    
+    def path(self, digest: str) -> Path:
+        """Retourne le fichier d'un blob."""
+        return self.root / digest[:2] / digest
@@ -0,0 +1,222 @@
+"""
+Module de cache persistant à deux niveaux (mémoire LRU + SQLite).
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+def make_cache_key(*parts: Any) -> str:
+    """
+    Calcule une clé de cache déterministe à partir de valeurs sérialisables.
+    
+    Args:
+        parts: Valeurs entrant dans la clé (dictionnaires, listes, nombres...)
+        
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PersistentLRUCache:
+    """Cache clé/valeur avec un niveau mémoire LRU et un niveau disque SQLite."""
+    
+    def __init__(self, db_path: Optional[Path], max_memory_entries: int = 256,
+                 max_disk_entries: int = 10000, ttl_seconds: Optional[float] = None):
+        """
+        Initialise le cache.
+        
+        Args:
+            db_path: Chemin du fichier SQLite (None pour un cache uniquement en mémoire)
+            max_memory_entries: Nombre maximum d'entrées gardées en mémoire
+            max_disk_entries: Nombre maximum d'entrées gardées sur disque
+            ttl_seconds: Durée de vie d'une entrée en secondes (None = illimitée)
+        """
+        self.db_path = Path(db_path) if db_path else None
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "writes": 0,
+            "evictions": 0
+        }
+        
+        self._conn = None
+        if self.db_path:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache(accessed_at)")
+            self._conn.commit()
+    
+    def get(self, key: str) -> Optional[str]:
+        """
+        Récupère une valeur du cache.
+        
+        Args:
+            key: Clé de l'entrée
+            
+        Returns:
+            Valeur stockée ou None si absente ou expirée
+        """
+        now = time.time()
+        
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+            
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if not self._is_expired(created_at, now):
+                        self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._conn.commit()
+                        self._remember(key, value, created_at)
+                        self._stats["disk_hits"] += 1
+                        return value
+                    self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._conn.commit()
+            
+            self._stats["misses"] += 1
+            return None
+    
+    def set(self, key: str, value: str):
+        """
+        Enregistre une valeur dans le cache.
+        
+        Args:
+            key: Clé de l'entrée
+            value: Valeur à stocker
+        """
+        now = time.time()
+        
+        with self._lock:
+            self._remember(key, value, now)
+            self._stats["writes"] += 1
+            
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                self._evict_disk()
+                self._conn.commit()
+    
+    def set_many(self, items: Dict[str, str]):
+        """
+        Enregistre plusieurs valeurs dans le cache en une seule transaction.
+        
+        Args:
+            items: Valeurs à stocker, par clé
+        """
+        now = time.time()
+        
+        with self._lock:
+            for key, value in items.items():
+                self._remember(key, value, now)
+            self._stats["writes"] += len(items)
+            
+            if self._conn is not None and items:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    [(key, value, now, now) for key, value in items.items()]
+                )
+                self._evict_disk()
+                self._conn.commit()
+    
+    def record_bypass(self):
+        """Comptabilise un appel qui a volontairement contourné le cache."""
+        with self._lock:
+            self._stats["bypassed"] += 1
+    
+    def clear(self):
+        """Vide les deux niveaux du cache."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM cache")
+                self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs du cache.
+        
+        Returns:
+            Dictionnaire des compteurs (hits, misses, évictions...)
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_entries"] = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+    
+    def close(self):
+        """Ferme la connexion SQLite."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def _is_expired(self, created_at: float, now: float) -> bool:
+        """Indique si une entrée a dépassé sa durée de vie."""
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+    
+    def _remember(self, key: str, value: str, created_at: float):
+        """Place une entrée dans le niveau mémoire en respectant la limite LRU."""
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+    
+    def _evict_disk(self):
+        """Supprime les entrées expirées puis les moins récemment utilisées sur disque."""
+        if self.ttl_seconds is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            )
+            self._stats["evictions"] += max(cursor.rowcount, 0)
+        
+        count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self._stats["evictions"] += overflow
@@ -16,6 +16,21 @@ class LLMConfig:
     model: str
     temperature: float
     max_tokens: int
+    max_output_tokens: int
+    context_window: int
+    prompt_budget: int
+    max_concurrent_requests: int
+    http_pool_size: int
+
+
+@dataclass
+class LLMCacheConfig:
+    """Configuration du cache des réponses LLM."""
+    enabled: bool
+    memory_entries: int
+    disk_entries: int
+    ttl_seconds: int
+    bypass_nonzero_temperature: bool
 
 
 @dataclass
@@ -33,6 +48,22 @@ class KnowledgeBaseConfig:
     path: str
     vector_db_enabled: bool
     auto_save: bool
+    bulk_chunk_size: int
+    dedupe_enabled: bool
+    dedupe_threshold: float
+    storage: str
+    lexical_flush_delay: float
+
+
+@dataclass
+class EmbeddingsConfig:
+    """Configuration des embeddings de la base de connaissances."""
+    provider: str
+    model: str
+    batch_size: int
+    cache_enabled: bool
+    memory_entries: int
+    disk_entries: int
 
 
 @dataclass
@@ -51,6 +82,7 @@ class InterfaceConfig:
     api_port: int
     web_ui_enabled: bool
     web_ui_port: int
+    daemon_socket: str
 
 
 @dataclass
@@ -61,6 +93,40 @@ class ModulesConfig:
     learner: bool
 
 
+@dataclass
+class PerformanceConfig:
+    """Configuration des performances (parallélisme, index des projets)."""
+    builder_max_workers: int
+    fixer_parallel: bool
+    fixer_max_workers: int
+    project_index_enabled: bool
+    project_index_watch: bool
+    symbol_index_enabled: bool
+
+
+@dataclass
+class RetrievalConfig:
+    """Configuration de la recherche dans la base de connaissances."""
+    default_mode: str
+    rrf_k: int
+    candidate_multiplier: int
+    rerank_enabled: bool
+    rerank_model: str
+    rerank_budget_ms: int
+
+
+@dataclass
+class ContextConfig:
+    """Configuration du contexte de code envoyé au LLM pour un diagnostic."""
+    token_budget: int
+    max_candidates: int
+    max_files: int
+    chunk_lines: int
+    max_file_bytes: int
+    use_git: bool
+    use_embeddings: bool
+
+
 @dataclass
 class TemplatesConfig:
     """Configuration des templates."""
@@ -106,7 +172,22 @@ class Config:
             provider=llm_config.get('provider', 'openai'),
             model=llm_config.get('model', 'gpt-4.1-mini'),
             temperature=llm_config.get('temperature', 0.7),
-            max_tokens=llm_config.get('max_tokens', 4000)
+            max_tokens=llm_config.get('max_tokens', 4000),
+            max_output_tokens=llm_config.get('max_output_tokens', 16000),
+            context_window=llm_config.get('context_window', 128000),
+            prompt_budget=llm_config.get('prompt_budget', 12000),
+            max_concurrent_requests=llm_config.get('max_concurrent_requests', 8),
+            http_pool_size=llm_config.get('http_pool_size', 20)
+        )
+        
+        # Configuration du cache des réponses LLM
+        cache_config = self._raw_config.get('llm_cache', {})
+        self.llm_cache = LLMCacheConfig(
+            enabled=cache_config.get('enabled', True),
+            memory_entries=cache_config.get('memory_entries', 256),
+            disk_entries=cache_config.get('disk_entries', 10000),
+            ttl_seconds=cache_config.get('ttl_seconds', 7 * 24 * 3600),
+            bypass_nonzero_temperature=cache_config.get('bypass_nonzero_temperature', True)
         )
         
         # Configuration de sécurité
@@ -123,7 +204,12 @@ class Config:
         self.knowledge_base = KnowledgeBaseConfig(
             path=kb_config.get('path', './knowledge_base'),
             vector_db_enabled=kb_config.get('vector_db_enabled', True),
-            auto_save=kb_config.get('auto_save', True)
+            auto_save=kb_config.get('auto_save', True),
+            bulk_chunk_size=kb_config.get('bulk_chunk_size', 500),
+            dedupe_enabled=kb_config.get('dedupe_enabled', True),
+            dedupe_threshold=kb_config.get('dedupe_threshold', 0.95),
+            storage=kb_config.get('storage', 'json'),
+            lexical_flush_delay=kb_config.get('lexical_flush_delay', 2.0)
         )
         
         # Configuration de la journalisation
@@ -141,7 +227,8 @@ class Config:
             api_enabled=interface_config.get('api_enabled', False),
             api_port=interface_config.get('api_port', 8000),
             web_ui_enabled=interface_config.get('web_ui_enabled', False),
-            web_ui_port=interface_config.get('web_ui_port', 3000)
+            web_ui_port=interface_config.get('web_ui_port', 3000),
+            daemon_socket=interface_config.get('daemon_socket', 'run/jarvis-agent.sock')
         )
         
         # Configuration des modules
@@ -152,6 +239,51 @@ class Config:
             learner=modules_config.get('learner', True)
         )
         
+        # Configuration des performances
+        performance_config = self._raw_config.get('performance', {})
+        self.performance = PerformanceConfig(
+            builder_max_workers=performance_config.get('builder_max_workers', 3),
+            fixer_parallel=performance_config.get('fixer_parallel', True),
+            fixer_max_workers=performance_config.get('fixer_max_workers', 4),
+            project_index_enabled=performance_config.get('project_index_enabled', True),
+            project_index_watch=performance_config.get('project_index_watch', False),
+            symbol_index_enabled=performance_config.get('symbol_index_enabled', True)
+        )
+        
+        # Configuration des embeddings
+        embeddings_config = self._raw_config.get('embeddings', {})
+        self.embeddings = EmbeddingsConfig(
+            provider=embeddings_config.get('provider', 'default'),
+            model=embeddings_config.get('model', 'all-MiniLM-L6-v2'),
+            batch_size=embeddings_config.get('batch_size', 64),
+            cache_enabled=embeddings_config.get('cache_enabled', True),
+            memory_entries=embeddings_config.get('memory_entries', 2048),
+            disk_entries=embeddings_config.get('disk_entries', 100000)
+        )
+        
+        # Configuration de la recherche
+        retrieval_config = self._raw_config.get('retrieval', {})
+        self.retrieval = RetrievalConfig(
+            default_mode=retrieval_config.get('default_mode', 'vector'),
+            rrf_k=retrieval_config.get('rrf_k', 60),
+            candidate_multiplier=retrieval_config.get('candidate_multiplier', 4),
+            rerank_enabled=retrieval_config.get('rerank_enabled', False),
+            rerank_model=retrieval_config.get('rerank_model', 'cross-encoder/ms-marco-MiniLM-L-6-v2'),
+            rerank_budget_ms=retrieval_config.get('rerank_budget_ms', 300)
+        )
+        
+        # Configuration du contexte des diagnostics
+        context_config = self._raw_config.get('context', {})
+        self.context = ContextConfig(
+            token_budget=context_config.get('token_budget', 6000),
+            max_candidates=context_config.get('max_candidates', 500),
+            max_files=context_config.get('max_files', 20),
+            chunk_lines=context_config.get('chunk_lines', 60),
+            max_file_bytes=context_config.get('max_file_bytes', 200000),
+            use_git=context_config.get('use_git', True),
+            use_embeddings=context_config.get('use_embeddings', True)
+        )
+        
         # Configuration des templates
         templates_config = self._raw_config.get('templates', {})
         self.templates = TemplatesConfig(
@@ -171,6 +303,26 @@ class Config:
         base_dir = self.get_base_dir()
         return base_dir / self.knowledge_base.path
     
+    def get_llm_cache_path(self) -> Path:
+        """Retourne le chemin du fichier SQLite du cache des réponses LLM."""
+        return self.get_knowledge_base_path() / "llm_cache.db"
+    
+    def get_knowledge_store_path(self) -> Path:
+        """Retourne le chemin du fichier SQLite des enregistrements (knowledge_base.storage: sqlite)."""
+        return self.get_knowledge_base_path() / "knowledge.db"
+    
+    def get_project_index_dir(self) -> Path:
+        """Retourne le répertoire des index de fichiers des projets analysés."""
+        return self.get_knowledge_base_path() / "project_index"
+    
+    def get_embedding_cache_path(self) -> Path:
+        """Retourne le chemin du fichier SQLite du cache des embeddings."""
+        return self.get_knowledge_base_path() / "embedding_cache.db"
+    
+    def get_daemon_socket_path(self) -> Path:
+        """Retourne le chemin du socket Unix du démon."""
+        return self.get_base_dir() / self.interface.daemon_socket
+    
     def get_logs_dir(self) -> Path:
         """Retourne le répertoire des logs."""
         base_dir = self.get_base_dir()
@@ -206,7 +358,19 @@ class Config:
                 'provider': self.llm.provider,
                 'model': self.llm.model,
                 'temperature': self.llm.temperature,
-                'max_tokens': self.llm.max_tokens
+                'max_tokens': self.llm.max_tokens,
+                'max_output_tokens': self.llm.max_output_tokens,
+                'context_window': self.llm.context_window,
+                'prompt_budget': self.llm.prompt_budget,
+                'max_concurrent_requests': self.llm.max_concurrent_requests,
+                'http_pool_size': self.llm.http_pool_size
+            },
+            'llm_cache': {
+                'enabled': self.llm_cache.enabled,
+                'memory_entries': self.llm_cache.memory_entries,
+                'disk_entries': self.llm_cache.disk_entries,
+                'ttl_seconds': self.llm_cache.ttl_seconds,
+                'bypass_nonzero_temperature': self.llm_cache.bypass_nonzero_temperature
             },
             'security': {
                 'require_confirmation_for_critical_actions': self.security.require_confirmation_for_critical_actions,
@@ -217,7 +381,12 @@ class Config:
             'knowledge_base': {
                 'path': self.knowledge_base.path,
                 'vector_db_enabled': self.knowledge_base.vector_db_enabled,
-                'auto_save': self.knowledge_base.auto_save
+                'auto_save': self.knowledge_base.auto_save,
+                'bulk_chunk_size': self.knowledge_base.bulk_chunk_size,
+                'dedupe_enabled': self.knowledge_base.dedupe_enabled,
+                'dedupe_threshold': self.knowledge_base.dedupe_threshold,
+                'storage': self.knowledge_base.storage,
+                'lexical_flush_delay': self.knowledge_base.lexical_flush_delay
             },
             'logging': {
                 'level': self.logging.level,
@@ -229,13 +398,47 @@ class Config:
                 'api_enabled': self.interface.api_enabled,
                 'api_port': self.interface.api_port,
                 'web_ui_enabled': self.interface.web_ui_enabled,
-                'web_ui_port': self.interface.web_ui_port
+                'web_ui_port': self.interface.web_ui_port,
+                'daemon_socket': self.interface.daemon_socket
             },
             'modules': {
                 'builder': self.modules.builder,
                 'fixer': self.modules.fixer,
                 'learner': self.modules.learner
             },
+            'performance': {
+                'builder_max_workers': self.performance.builder_max_workers,
+                'fixer_parallel': self.performance.fixer_parallel,
+                'fixer_max_workers': self.performance.fixer_max_workers,
+                'project_index_enabled': self.performance.project_index_enabled,
+                'project_index_watch': self.performance.project_index_watch,
+                'symbol_index_enabled': self.performance.symbol_index_enabled
+            },
+            'embeddings': {
+                'provider': self.embeddings.provider,
+                'model': self.embeddings.model,
+                'batch_size': self.embeddings.batch_size,
+                'cache_enabled': self.embeddings.cache_enabled,
+                'memory_entries': self.embeddings.memory_entries,
+                'disk_entries': self.embeddings.disk_entries
+            },
+            'retrieval': {
+                'default_mode': self.retrieval.default_mode,
+                'rrf_k': self.retrieval.rrf_k,
+                'candidate_multiplier': self.retrieval.candidate_multiplier,
+                'rerank_enabled': self.retrieval.rerank_enabled,
+                'rerank_model': self.retrieval.rerank_model,
+                'rerank_budget_ms': self.retrieval.rerank_budget_ms
+            },
+            'context': {
+                'token_budget': self.context.token_budget,
+                'max_candidates': self.context.max_candidates,
+                'max_files': self.context.max_files,
+                'chunk_lines': self.context.chunk_lines,
+                'max_file_bytes': self.context.max_file_bytes,
+                'use_git': self.context.use_git,
+                'use_embeddings': self.context.use_embeddings
+            },
             'templates': {
                 'web_static': self.templates.web_static,
                 'web_dynamic': self.templates.web_dynamic,
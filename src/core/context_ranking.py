@@ -0,0 +1,403 @@
+"""
+Module de sélection du contexte de code envoyé au LLM pour un diagnostic.
+
+Les fichiers du projet sont notés par rapport à la description du
+problème : chemins cités par une trace d'appels, identifiants du problème
+présents dans le fichier, fichiers modifiés récemment (git) et similarité
+des embeddings. Les meilleurs fichiers sont découpés en blocs (fonctions,
+classes) et les blocs les mieux notés remplissent un budget de tokens.
+"""
+
+import re
+import subprocess
+from pathlib import Path
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+
+from .dedupe import cosine_similarities
+from .prompt_budget import MIN_SHARE_TOKENS, Tokenizer, get_tokenizer
+
+
+# Poids des signaux dans la note d'un fichier
+TRACE_WEIGHT = 10.0
+IDENTIFIER_WEIGHT = 4.0
+PATH_WEIGHT = 2.0
+GIT_WEIGHT = 1.5
+EMBEDDING_WEIGHT = 3.0
+
+# Bonus d'un bloc contenant une ligne citée par la trace
+TRACE_LINE_BONUS = 5.0
+UNMATCHED_CHUNK_FACTOR = 0.5
+
+_TRACE_PATTERNS = [
+    # Python : File "app/models.py", line 42, in save
+    re.compile(r'File "(?P<path>[^"]+)", line (?P<line>\d+)'),
+    # JavaScript/TypeScript, compilateurs, pytest : src/api.ts:12:5
+    re.compile(r'(?P<path>[\w.@~/\\-]*[\w-]\.[A-Za-z]{1,5}):(?P<line>\d+)')
+]
+_IDENTIFIER_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+_WORD_PATTERN = re.compile(r"[a-zà-ÿ0-9]{4,}")
+_CAMEL_PATTERN = re.compile(r"[a-z0-9][A-Z]")
+
+# Début d'un bloc de premier niveau, par langage
+_BOUNDARIES = {
+    'python': re.compile(r"(?:async\s+def|def|class)\s|@"),
+    'javascript': re.compile(r"(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function|class|const|let|var)\s"),
+    'typescript': re.compile(
+        r"(?:export\s+)?(?:default\s+)?(?:async\s+)?(?:function|class|const|let|var|interface|type|enum)\s"
+    )
+}
+
+
+def extract_trace_locations(text: str) -> List[Tuple[str, int]]:
+    """
+    Extrait les emplacements cités par une trace d'appels ou un message d'erreur.
+    
+    Args:
+        text: Description du problème
+        
+    Returns:
+        Couples (chemin tel que cité, numéro de ligne)
+    """
+    locations = []
+    for pattern in _TRACE_PATTERNS:
+        for match in pattern.finditer(text):
+            location = (match.group("path").replace("\\", "/"), int(match.group("line")))
+            if location not in locations:
+                locations.append(location)
+    return locations
+
+
+def extract_identifiers(text: str) -> Set[str]:
+    """
+    Extrait les identifiants de code cités dans un texte.
+    
+    Sont retenus les mots qui ressemblent à du code : snake_case, camelCase,
+    noms pointés (module.fonction), constantes en majuscules et noms suivis
+    d'une parenthèse ; un nom pointé apporte aussi chacune de ses parties.
+    
+    Args:
+        text: Description du problème
+        
+    Returns:
+        Identifiants
+    """
+    identifiers = set()
+    for match in _IDENTIFIER_PATTERN.finditer(text):
+        word = match.group()
+        followed_by_call = text[match.end():match.end() + 1] == "("
+        if not ("_" in word or "." in word or _CAMEL_PATTERN.search(word)
+                or (word.isupper() and len(word) >= 4) or followed_by_call):
+            continue
+        if len(word) < 3 or word.replace(".", "").isdigit():
+            continue
+        identifiers.add(word)
+        if "." in word:
+            identifiers.update(part for part in word.split(".") if len(part) >= 3)
+    return identifiers
+
+
+def recent_git_changes(project_path: Path, max_commits: int = 30) -> Dict[str, int]:
+    """
+    Liste les fichiers modifiés récemment d'après git.
+    
+    Args:
+        project_path: Racine du projet
+        max_commits: Nombre de commits examinés
+        
+    Returns:
+        Dictionnaire {chemin relatif: rang} ; 0 pour une modification non
+        commitée, n pour une modification du n-ième commit le plus récent
+        (vide hors d'un dépôt git)
+    """
+    def git(*args) -> Optional[str]:
+        try:
+            result = subprocess.run(["git", *args], cwd=project_path, capture_output=True,
+                                    text=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            return None
+        return result.stdout if result.returncode == 0 else None
+    
+    ranks: Dict[str, int] = {}
+    for path in (git("diff", "--name-only", "--relative", "HEAD") or "").splitlines():
+        ranks.setdefault(path, 0)
+    
+    log = git("log", f"-n{max_commits}", "--name-only", "--relative", "--pretty=format:%x00")
+    for rank, commit in enumerate((log or "").split("\x00")[1:], 1):
+        for path in commit.splitlines():
+            if path:
+                ranks.setdefault(path, rank)
+    return ranks
+
+
+def chunk_ranges(lines: List[str], language: str, max_lines: int) -> List[Tuple[int, int]]:
+    """
+    Découpe un fichier en blocs aux limites des définitions de premier niveau.
+    
+    Les définitions voisines sont regroupées tant que le bloc ne dépasse pas
+    max_lines ; une définition plus longue est coupée en fenêtres.
+    
+    Args:
+        lines: Lignes du fichier
+        language: Langage du fichier
+        max_lines: Nombre maximum de lignes par bloc
+        
+    Returns:
+        Couples (première ligne, ligne suivant la dernière), indices à partir de 0
+    """
+    boundary = _BOUNDARIES.get(language)
+    starts = [0]
+    if boundary is not None:
+        for number, line in enumerate(lines[1:], 1):
+            # Un décorateur reste attaché à la définition qui le suit
+            if boundary.match(line) and not lines[number - 1].startswith("@"):
+                starts.append(number)
+    sections = list(zip(starts, starts[1:] + [len(lines)]))
+    
+    ranges: List[Tuple[int, int]] = []
+    for start, end in sections:
+        if ranges and end - ranges[-1][0] <= max_lines:
+            ranges[-1] = (ranges[-1][0], end)
+            continue
+        for window in range(start, end, max_lines):
+            ranges.append((window, min(window + max_lines, end)))
+    return ranges
+
+
+class ContextRanker:
+    """Sélection des extraits de code les plus pertinents pour un problème, dans un budget de tokens."""
+    
+    def __init__(self, embedding_function=None,
+                 symbol_lookup: Optional[Callable[[Set[str]], Dict[str, Set[str]]]] = None,
+                 tokenizer: Optional[Tokenizer] = None, use_git: bool = True, max_candidates: int = 500, max_files: int = 20,
+                 chunk_lines: int = 60, max_file_bytes: int = 200000):
+        """
+        Initialise la sélection.
+        
+        Args:
+            embedding_function: Fonction d'embedding (avec embed_query) pour la similarité
+                                sémantique (None pour désactiver ce signal)
+            symbol_lookup: Fonction retournant, pour des identifiants, les fichiers qui
+                           les définissent ou les utilisent {chemin: identifiants} ;
+                           sans elle, les identifiants sont cherchés dans le contenu
+            tokenizer: Tokenizer du modèle (optionnel, celui par défaut)
+            use_git: Tenir compte des fichiers modifiés récemment
+            max_candidates: Nombre maximum de fichiers lus pour chercher les identifiants
+            max_files: Nombre de fichiers les mieux notés découpés en blocs
+            chunk_lines: Nombre maximum de lignes par bloc
+            max_file_bytes: Taille au-delà de laquelle un fichier n'est pas lu
+        """
+        self.embedding_function = embedding_function
+        self.symbol_lookup = symbol_lookup
+        self.tokenizer = tokenizer or get_tokenizer()
+        self.use_git = use_git
+        self.max_candidates = max_candidates
+        self.max_files = max_files
+        self.chunk_lines = chunk_lines
+        self.max_file_bytes = max_file_bytes
+    
+    def rank_files(self, project_path: Path, issue: str,
+                   candidates: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Note les fichiers candidats par rapport au problème.
+        
+        Args:
+            project_path: Racine du projet
+            issue: Description du problème (trace d'appels incluse le cas échéant)
+            candidates: Couples (chemin relatif, langage) des fichiers candidats
+            
+        Returns:
+            Fichiers notés (path, language, score, reasons, trace_lines,
+            identifiers), du plus pertinent au moins pertinent
+        """
+        project_path = Path(project_path)
+        traces = extract_trace_locations(issue)
+        identifiers = extract_identifiers(issue)
+        words = set(_WORD_PATTERN.findall(issue.lower()))
+        git_ranks = recent_git_changes(project_path) if self.use_git else {}
+        
+        files = []
+        for path, language in candidates:
+            entry = {"path": path, "language": language, "score": 0.0, "reasons": [],
+                     "trace_lines": [], "identifiers": set()}
+            
+            for trace_path, line in traces:
+                if self._same_file(project_path, path, trace_path):
+                    entry["trace_lines"].append(line)
+            if entry["trace_lines"]:
+                entry["score"] += TRACE_WEIGHT
+                entry["reasons"].append("trace")
+            
+            path_words = self._path_words(path)
+            matched = sum(1 for word in words if any(
+                word.startswith(part) or part.startswith(word) for part in path_words if len(part) >= 4
+            ))
+            if matched:
+                entry["score"] += PATH_WEIGHT * min(1.0, matched / 2)
+                entry["reasons"].append("chemin")
+            
+            if path in git_ranks:
+                entry["score"] += GIT_WEIGHT / (1 + git_ranks[path])
+                entry["reasons"].append("git")
+            
+            files.append(entry)
+        
+        if identifiers:
+            self._score_identifiers(project_path, files, identifiers)
+        
+        return sorted(files, key=lambda entry: entry["score"], reverse=True)
+    
+    def select(self, project_path: Path, issue: str, candidates: Iterable[Tuple[str, str]],
+               token_budget: int) -> List[Dict[str, Any]]:
+        """
+        Sélectionne les extraits de code à envoyer au LLM.
+        
+        Args:
+            project_path: Racine du projet
+            issue: Description du problème
+            candidates: Couples (chemin relatif, langage) des fichiers candidats
+            token_budget: Nombre maximum de tokens des extraits
+            
+        Returns:
+            Extraits (path, start_line, end_line, content, score, reasons), les
+            plus pertinents en premier, lignes numérotées à partir de 1
+        """
+        project_path = Path(project_path)
+        ranked = self.rank_files(project_path, issue, candidates)[:self.max_files]
+        
+        chunks = []
+        for rank, entry in enumerate(ranked):
+            try:
+                file_path = project_path / entry["path"]
+                if file_path.stat().st_size > self.max_file_bytes:
+                    continue
+                lines = file_path.read_text(encoding='utf-8').splitlines(keepends=True)
+            except (OSError, UnicodeDecodeError):
+                continue
+            
+            for start, end in chunk_ranges(lines, entry["language"], self.chunk_lines):
+                content = "".join(lines[start:end])
+                score = 0.0
+                if any(start < line <= end for line in entry["trace_lines"]):
+                    score += TRACE_LINE_BONUS
+                if entry["identifiers"]:
+                    hits = sum(1 for identifier in entry["identifiers"] if identifier in content)
+                    score += IDENTIFIER_WEIGHT * hits / len(entry["identifiers"])
+                # Un bloc sans signal propre ne garde que la moitié de la note de son fichier
+                score += entry["score"] if score else entry["score"] * UNMATCHED_CHUNK_FACTOR
+                chunks.append({
+                    "path": entry["path"], "start_line": start + 1, "end_line": end,
+                    "content": content, "score": score, "reasons": list(entry["reasons"]),
+                    "rank": rank
+                })
+        
+        if self.embedding_function is not None and chunks:
+            self._score_embeddings(issue, chunks)
+        
+        # Sans aucun signal, l'ordre des candidats est conservé
+        chunks.sort(key=lambda chunk: (-chunk["score"], chunk["rank"], chunk["start_line"]))
+        
+        selected = []
+        skipped = []
+        remaining = token_budget
+        for chunk in chunks:
+            tokens = self.tokenizer.count(chunk["content"])
+            if tokens <= remaining:
+                selected.append(chunk)
+                remaining -= tokens
+            else:
+                skipped.append(chunk)
+        
+        # Place restante : le meilleur bloc trop long (pertinent, ou le premier si rien
+        # n'a été retenu) est coupé à une limite syntaxique
+        pertinent = [chunk for chunk in skipped if chunk["score"] > 0 or not selected]
+        if pertinent and remaining >= MIN_SHARE_TOKENS:
+            chunk = dict(pertinent[0])
+            chunk["content"] = self.tokenizer.truncate(chunk["content"], remaining)
+            if chunk["content"]:
+                chunk["end_line"] = chunk["start_line"] + chunk["content"].count("\n") - 1
+                selected.append(chunk)
+        
+        return self._merge_adjacent(selected)
+    
+    def _score_identifiers(self, project_path: Path, files: List[Dict[str, Any]], identifiers: Set[str]):
+        """Ajoute aux notes la part des identifiants du problème présents dans chaque fichier."""
+        by_path = {entry["path"]: entry for entry in files}
+        
+        if self.symbol_lookup is not None:
+            found = self.symbol_lookup(identifiers)
+        else:
+            # Sans index des symboles, le contenu des fichiers les mieux notés est lu
+            pattern = re.compile(r"\b(?:" + "|".join(re.escape(identifier) for identifier in
+                                                      sorted(identifiers, key=len, reverse=True)) + r")\b")
+            found = {}
+            ordered = sorted(files, key=lambda entry: entry["score"], reverse=True)
+            for entry in ordered[:self.max_candidates]:
+                try:
+                    file_path = project_path / entry["path"]
+                    if file_path.stat().st_size > self.max_file_bytes:
+                        continue
+                    content = file_path.read_text(encoding='utf-8', errors='replace')
+                except OSError:
+                    continue
+                hits = set(pattern.findall(content))
+                if hits:
+                    found[entry["path"]] = hits
+        
+        for path, hits in found.items():
+            entry = by_path.get(path)
+            if entry is None or not hits:
+                continue
+            entry["identifiers"] = set(hits) & identifiers
+            entry["score"] += IDENTIFIER_WEIGHT * len(entry["identifiers"]) / len(identifiers)
+            entry["reasons"].append("identifiants")
+    
+    def _score_embeddings(self, issue: str, chunks: List[Dict[str, Any]]):
+        """Ajoute aux notes des blocs leur similarité sémantique avec le problème."""
+        try:
+            query = self.embedding_function.embed_query([issue])[0]
+            vectors = self.embedding_function([f"{chunk['path']}\n{chunk['content']}" for chunk in chunks])
+        except Exception:
+            return
+        
+        for chunk, similarity in zip(chunks, cosine_similarities(query, vectors)):
+            chunk["score"] += EMBEDDING_WEIGHT * max(0.0, float(similarity))
+    
+    def _merge_adjacent(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Réunit les blocs contigus d'un même fichier, en gardant l'ordre de pertinence des fichiers."""
+        by_path: Dict[str, List[Dict[str, Any]]] = {}
+        for chunk in chunks:
+            by_path.setdefault(chunk["path"], []).append(chunk)
+        
+        merged = []
+        for path_chunks in by_path.values():
+            path_chunks.sort(key=lambda chunk: chunk["start_line"])
+            for chunk in path_chunks:
+                previous = merged[-1] if merged and merged[-1]["path"] == chunk["path"] else None
+                if previous is not None and previous["end_line"] + 1 == chunk["start_line"]:
+                    previous["end_line"] = chunk["end_line"]
+                    previous["content"] += chunk["content"]
+                    previous["score"] = max(previous["score"], chunk["score"])
+                else:
+                    merged.append({key: value for key, value in chunk.items() if key != "rank"})
+        return merged
+    
+    @staticmethod
+    def _same_file(project_path: Path, path: str, trace_path: str) -> bool:
+        """Indique si un chemin cité par une trace désigne un fichier du projet."""
+        if trace_path.startswith("./"):
+            trace_path = trace_path[2:]
+        if trace_path == path:
+            return True
+        if trace_path.startswith("/"):
+            try:
+                return Path(trace_path).resolve().relative_to(project_path.resolve()).as_posix() == path
+            except (OSError, ValueError):
+                pass
+        # Chemin relatif à un autre répertoire de travail (conteneur, CI) : comparaison par la fin
+        return trace_path.endswith("/" + path) or path.endswith("/" + trace_path)
+    
+    @staticmethod
+    def _path_words(path: str) -> Set[str]:
+        """Découpe un chemin en mots (répertoires, snake_case, camelCase)."""
+        spaced = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", path)
+        return {word.lower() for word in re.split(r"[^A-Za-z0-9]+", spaced) if word}
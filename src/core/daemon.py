@@ -0,0 +1,305 @@
+"""
+Module du démon de l'agent Jarvis.
+
+Le démon garde un JarvisAgent initialisé (client LLM, base de connaissances,
+modules) et sert les commandes de la CLI sur un socket Unix. Le protocole
+est en lignes JSON : une requête par connexion, suivie d'événements
+« chunk » pendant la génération puis d'un événement « result » ou « error ».
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable
+
+
+# Commandes servies par le démon, avec leurs paramètres acceptés
+METHODS = {
+    "ask": ("question", "context"),
+    "build": ("request", "output_dir"),
+    "fix": ("project_path", "issue_description"),
+    "analyze": ("project_path",),
+    "refactor": ("file_path", "objective"),
+    "deploy": ("project_path", "method", "config"),
+    "learn": ("content", "content_type", "tags"),
+}
+
+
+class DaemonUnavailable(Exception):
+    """Aucun démon n'écoute sur le socket."""
+
+
+class DaemonError(Exception):
+    """Le démon a renvoyé une erreur pendant l'exécution d'une commande."""
+
+
+def run_request(agent, method: str, params: Dict[str, Any],
+                on_chunk: Optional[Callable[[Optional[str], str], None]] = None) -> Any:
+    """
+    Exécute une commande sur un agent, dans le démon ou dans le processus courant.
+    
+    Args:
+        agent: Instance de JarvisAgent
+        method: Nom de la commande (voir METHODS)
+        params: Paramètres de la commande
+        on_chunk: Fonction appelée avec (nom de fichier ou None, fragment) pendant la génération
+        
+    Returns:
+        Résultat de la commande
+    """
+    if method not in METHODS:
+        raise ValueError(f"Commande inconnue : {method}")
+    
+    unknown = set(params) - set(METHODS[method])
+    if unknown:
+        raise ValueError(f"Paramètres inconnus pour {method} : {', '.join(sorted(unknown))}")
+    
+    if method == "ask":
+        # La réponse est produite au fil de la génération, puis retournée en entier
+        parts = []
+        for chunk in agent.ask_stream(**params):
+            parts.append(chunk)
+            if on_chunk:
+                on_chunk(None, chunk)
+        return "".join(parts)
+    
+    if method == "build":
+        return agent.build(on_chunk=on_chunk, **params)
+    
+    return getattr(agent, method)(**params)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Traite une requête de la CLI : une ligne JSON en entrée, des lignes JSON en sortie."""
+    
+    def setup(self):
+        super().setup()
+        # Builder appelle on_chunk depuis plusieurs threads : une ligne JSON est écrite d'un bloc
+        self._send_lock = threading.Lock()
+    
+    def handle(self):
+        daemon: "JarvisDaemon" = self.server.jarvis_daemon
+        
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send({"event": "error", "error": f"Requête invalide : {e}"})
+            return
+        
+        method = request.get("method")
+        
+        if method == "ping":
+            self._send({"event": "result", "data": daemon.status()})
+            return
+        
+        if method == "shutdown":
+            self._send({"event": "result", "data": {"stopping": True}})
+            daemon.stop()
+            return
+        
+        def on_chunk(file_name, chunk):
+            self._send({"event": "chunk", "file": file_name, "data": chunk})
+        
+        daemon.logger.info(f"Démon : commande {method}")
+        with daemon.track_request():
+            try:
+                result = run_request(daemon.agent, method, request.get("params", {}), on_chunk)
+                self._send({"event": "result", "data": result})
+            except BrokenPipeError:
+                daemon.logger.warning(f"Démon : client déconnecté pendant {method}")
+            except Exception as e:
+                daemon.logger.error(f"Démon : erreur pendant {method} : {e}")
+                self._send({"event": "error", "error": str(e)})
+    
+    def _send(self, message: Dict[str, Any]):
+        """Envoie un message JSON au client."""
+        line = json.dumps(message, ensure_ascii=False, default=str) + "\n"
+        with self._send_lock:
+            self.wfile.write(line.encode("utf-8"))
+            self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serveur multi-thread sur socket Unix."""
+    
+    daemon_threads = True
+
+
+class JarvisDaemon:
+    """Démon gardant un agent Jarvis initialisé en mémoire."""
+    
+    def __init__(self, agent, socket_path: Path):
+        """
+        Initialise le démon.
+        
+        Args:
+            agent: Instance de JarvisAgent à garder en mémoire
+            socket_path: Chemin du socket Unix d'écoute
+        """
+        self.agent = agent
+        self.logger = agent.logger
+        self.socket_path = Path(socket_path)
+        
+        self._server: Optional[_UnixServer] = None
+        self._started_at = time.time()
+        self._requests = 0
+        self._active = 0
+        self._lock = threading.Lock()
+    
+    def serve_forever(self, warm_up: bool = True):
+        """
+        Écoute sur le socket jusqu'à l'appel de stop().
+        
+        Args:
+            warm_up: Initialiser tous les sous-systèmes de l'agent avant d'écouter
+        """
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Le démon nécessite les sockets Unix, indisponibles sur ce système")
+        
+        if DaemonClient(self.socket_path).is_running():
+            raise RuntimeError(f"Un démon écoute déjà sur {self.socket_path}")
+        
+        if warm_up:
+            self.logger.action("Démon : initialisation de l'agent...")
+            self.agent.kb
+            self.agent.builder
+            self.agent.fixer
+            self.agent.deployer
+        
+        # Un socket restant d'un démon arrêté brutalement est remplacé
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        
+        self._server = _UnixServer(str(self.socket_path), _RequestHandler)
+        self._server.jarvis_daemon = self
+        os.chmod(self.socket_path, 0o600)
+        
+        self._started_at = time.time()
+        self.logger.success(f"Démon Jarvis à l'écoute sur {self.socket_path} (PID {os.getpid()})")
+        
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            self.logger.info("Démon Jarvis arrêté")
+    
+    def stop(self):
+        """Arrête le démon (les commandes en cours se terminent dans leur thread)."""
+        if self._server is not None:
+            # shutdown() attend la fin de serve_forever : à appeler hors de son thread
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+    
+    def status(self) -> Dict[str, Any]:
+        """
+        Retourne l'état du démon.
+        
+        Returns:
+            PID, durée de fonctionnement, nombre de commandes servies et en cours
+        """
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "socket": str(self.socket_path),
+                "uptime": round(time.time() - self._started_at, 1),
+                "requests": self._requests,
+                "active": self._active
+            }
+    
+    @contextmanager
+    def track_request(self):
+        """Contexte comptabilisant une commande en cours."""
+        with self._lock:
+            self._requests += 1
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+class DaemonClient:
+    """Client de la CLI vers le démon Jarvis."""
+    
+    def __init__(self, socket_path: Path, connect_timeout: float = 1.0):
+        """
+        Initialise le client.
+        
+        Args:
+            socket_path: Chemin du socket Unix du démon
+            connect_timeout: Délai maximal de connexion en secondes
+        """
+        self.socket_path = Path(socket_path)
+        self.connect_timeout = connect_timeout
+    
+    def is_running(self) -> bool:
+        """Indique si un démon répond sur le socket."""
+        try:
+            self.call("ping")
+            return True
+        except (DaemonUnavailable, DaemonError):
+            return False
+    
+    def call(self, method: str, params: Optional[Dict[str, Any]] = None,
+             on_chunk: Optional[Callable[[Optional[str], str], None]] = None) -> Any:
+        """
+        Envoie une commande au démon et attend son résultat.
+        
+        Args:
+            method: Nom de la commande (voir METHODS, ou ping / shutdown)
+            params: Paramètres de la commande
+            on_chunk: Fonction appelée avec (nom de fichier ou None, fragment) pendant la génération
+            
+        Returns:
+            Résultat de la commande
+            
+        Raises:
+            DaemonUnavailable: Aucun démon n'écoute (la commande n'a pas été envoyée)
+            DaemonError: La commande a échoué dans le démon
+        """
+        sock = self._connect()
+        
+        try:
+            request = json.dumps({"method": method, "params": params or {}}, ensure_ascii=False, default=str)
+            sock.sendall(request.encode("utf-8") + b"\n")
+            
+            with sock.makefile("r", encoding="utf-8") as stream:
+                for line in stream:
+                    message = json.loads(line)
+                    event = message.get("event")
+                    if event == "chunk":
+                        if on_chunk:
+                            on_chunk(message.get("file"), message.get("data", ""))
+                    elif event == "result":
+                        return message.get("data")
+                    elif event == "error":
+                        raise DaemonError(message.get("error", "Erreur inconnue"))
+        finally:
+            sock.close()
+        
+        raise DaemonError("Connexion au démon interrompue avant la fin de la commande")
+    
+    def _connect(self) -> socket.socket:
+        """Ouvre une connexion au démon."""
+        if not hasattr(socket, "AF_UNIX") or not self.socket_path.exists():
+            raise DaemonUnavailable(str(self.socket_path))
+        
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.connect_timeout)
+        try:
+            sock.connect(str(self.socket_path))
+        except OSError as e:
+            sock.close()
+            raise DaemonUnavailable(f"{self.socket_path} : {e}")
+        
+        # Les commandes (build, fix) peuvent durer plusieurs minutes
+        sock.settimeout(None)
+        return sock
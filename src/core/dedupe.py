@@ -0,0 +1,120 @@
+"""
+Module de détection et de fusion des solutions quasi identiques.
+
+Une même panne récurrente produit des solutions presque identiques. Elles
+sont regroupées par similarité (cosinus des embeddings, ou Jaccard des
+termes sans base vectorielle) et fusionnées en un seul enregistrement qui
+compte ses occurrences.
+"""
+
+from typing import Dict, Any, List, Set
+
+import numpy as np
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    """
+    Calcule la similarité de Jaccard de deux ensembles de termes.
+    
+    Args:
+        first: Premier ensemble
+        second: Second ensemble
+        
+    Returns:
+        Similarité entre 0 et 1
+    """
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+def cosine_similarities(vector: np.ndarray, matrix: np.ndarray) -> np.ndarray:
+    """
+    Calcule la similarité cosinus d'un vecteur avec chaque ligne d'une matrice.
+    
+    Args:
+        vector: Vecteur de référence
+        matrix: Vecteurs comparés, un par ligne
+        
+    Returns:
+        Similarités, dans l'ordre des lignes
+    """
+    matrix = _normalize(np.asarray(matrix, dtype=np.float32))
+    return matrix @ _normalize(np.asarray(vector, dtype=np.float32)[None, :])[0]
+
+
+def group_by_similarity(ids: List[str], vectors: np.ndarray, threshold: float,
+                        block_size: int = 1024) -> Dict[str, List[str]]:
+    """
+    Regroupe les quasi-doublons par similarité cosinus.
+    
+    Les IDs sont parcourus dans l'ordre reçu : chaque ID non encore regroupé
+    devient le représentant de tous les IDs suivants qui lui sont
+    suffisamment similaires. Les similarités sont calculées par blocs de
+    lignes pour borner la mémoire.
+    
+    Args:
+        ids: IDs des vecteurs, le plus ancien en premier
+        vectors: Vecteurs, un par ligne, dans l'ordre des IDs
+        threshold: Similarité cosinus minimale entre deux doublons
+        block_size: Nombre de lignes comparées à la fois
+        
+    Returns:
+        Dictionnaire {ID conservé: IDs de ses doublons}, sans les IDs isolés
+    """
+    matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+    merged = np.zeros(len(ids), dtype=bool)
+    groups: Dict[str, List[str]] = {}
+    
+    for start in range(0, len(ids), block_size):
+        similarities = matrix[start:start + block_size] @ matrix.T
+        for offset, row in enumerate(similarities):
+            position = start + offset
+            if merged[position]:
+                continue
+            
+            candidates = np.nonzero(row[position + 1:] >= threshold)[0] + position + 1
+            duplicates = [index for index in candidates if not merged[index]]
+            if duplicates:
+                merged[duplicates] = True
+                groups[ids[position]] = [ids[index] for index in duplicates]
+    
+    return groups
+
+
+def merge_solution_records(keeper: Dict[str, Any], duplicates: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Fusionne des solutions en double dans la solution conservée.
+    
+    Le texte de la solution conservée est gardé ; les occurrences sont
+    additionnées, les tags réunis et la date de dernière occurrence mise à jour.
+    
+    Args:
+        keeper: Solution conservée
+        duplicates: Solutions fusionnées dans la première
+        
+    Returns:
+        Nouvelle version de la solution conservée
+    """
+    merged = dict(keeper)
+    tags = list(keeper.get("tags") or [])
+    last_seen = keeper.get("last_seen_at", keeper.get("created_at", ""))
+    occurrences = keeper.get("occurrences", 1)
+    
+    for duplicate in duplicates:
+        occurrences += duplicate.get("occurrences", 1)
+        for tag in duplicate.get("tags") or []:
+            if tag not in tags:
+                tags.append(tag)
+        last_seen = max(last_seen, duplicate.get("last_seen_at", duplicate.get("created_at", "")))
+    
+    merged["occurrences"] = occurrences
+    merged["tags"] = tags
+    merged["last_seen_at"] = last_seen
+    return merged
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Ramène chaque ligne à une norme unitaire (les lignes nulles restent nulles)."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
@@ -0,0 +1,194 @@
+"""
+Module des embeddings de la base de connaissances.
+
+Les textes sont encodés par un modèle local (celui de ChromaDB par défaut, ou
+un modèle sentence-transformers) ; chaque vecteur est mis en cache (mémoire
+LRU + SQLite) sous l'empreinte du texte, de sorte qu'une requête ou un
+document déjà vu n'est jamais ré-encodé.
+"""
+
+import base64
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction, Documents, Embeddings
+
+from .cache import PersistentLRUCache, make_cache_key
+
+
+PROVIDERS = ("default", "sentence_transformers")
+
+
+def create_embedding_model(provider: str, model: str) -> EmbeddingFunction:
+    """
+    Crée le modèle d'embedding local.
+    
+    Args:
+        provider: default (modèle ONNX intégré à ChromaDB) ou sentence_transformers
+        model: Nom du modèle sentence-transformers (ignoré pour default)
+        
+    Returns:
+        Fonction d'embedding ChromaDB
+    """
+    from chromadb.utils import embedding_functions
+    
+    if provider == "default":
+        return embedding_functions.DefaultEmbeddingFunction()
+    if provider == "sentence_transformers":
+        return embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model)
+    raise ValueError(f"Fournisseur d'embeddings inconnu : {provider} (attendu : {', '.join(PROVIDERS)})")
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Fonction d'embedding ChromaDB avec cache des vecteurs et encodage par lots."""
+    
+    def __init__(self, model: EmbeddingFunction, cache: Optional[PersistentLRUCache] = None,
+                 batch_size: int = 64):
+        """
+        Initialise la fonction d'embedding.
+        
+        Args:
+            model: Fonction d'embedding sous-jacente (appelée pour les textes absents du cache)
+            cache: Cache des vecteurs (None pour désactiver la mise en cache)
+            batch_size: Nombre maximum de textes encodés par appel au modèle
+        """
+        self.model = model
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        
+        # Les vecteurs de modèles différents ne sont jamais mélangés dans le cache
+        self._model_key = make_cache_key(model.name(), model.get_config())
+        self._lock = threading.Lock()
+        self._stats = {
+            "texts": 0,
+            "cache_hits": 0,
+            "embedded": 0,
+            "batches": 0,
+            "embed_seconds": 0.0
+        }
+    
+    def __call__(self, input: Documents) -> Embeddings:
+        return self._embed(list(input), "document")
+    
+    def embed_query(self, input: Documents) -> Embeddings:
+        return self._embed(list(input), "query")
+    
+    # Nom et configuration du modèle sous-jacent : le cache ne change pas les vecteurs,
+    # les collections créées avec le modèle par défaut de ChromaDB restent compatibles
+    def name(self) -> str:
+        return self.model.name()
+    
+    def get_config(self) -> Dict[str, Any]:
+        return self.model.get_config()
+    
+    def default_space(self):
+        return self.model.default_space()
+    
+    def supported_spaces(self):
+        return self.model.supported_spaces()
+    
+    @staticmethod
+    def build_from_config(config: Dict[str, Any]) -> "CachedEmbeddingFunction":
+        """
+        Reconstruit la fonction d'embedding depuis la configuration du modèle sous-jacent.
+        
+        Args:
+            config: Configuration retournée par get_config (seul le modèle
+                sentence-transformers y porte un model_name)
+                
+        Returns:
+            Fonction d'embedding avec un cache en mémoire neuf
+        """
+        if config.get("model_name"):
+            model = create_embedding_model("sentence_transformers", config["model_name"])
+        else:
+            model = create_embedding_model("default", "")
+        return CachedEmbeddingFunction(model, cache=PersistentLRUCache(None))
+    
+    def is_legacy(self) -> bool:
+        return False
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs d'encodage.
+        
+        Returns:
+            Textes demandés, servis par le cache, encodés, débit d'encodage (textes/s)
+            et compteurs du cache
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        
+        stats["embed_seconds"] = round(stats["embed_seconds"], 3)
+        stats["throughput"] = round(stats["embedded"] / stats["embed_seconds"], 1) if stats["embed_seconds"] else 0.0
+        stats["hit_rate"] = stats["cache_hits"] / stats["texts"] if stats["texts"] else 0.0
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+    
+    def _embed(self, texts: List[str], kind: str) -> List[np.ndarray]:
+        """Retourne les vecteurs des textes, en n'encodant que ceux absents du cache."""
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        
+        # Un texte répété dans le même appel n'est encodé qu'une fois
+        pending: Dict[str, List[int]] = {}
+        keys: Dict[str, str] = {}
+        for position, text in enumerate(texts):
+            if text in pending:
+                pending[text].append(position)
+                continue
+            
+            vector = None
+            if self.cache is not None:
+                keys[text] = make_cache_key(self._model_key, kind, text)
+                vector = self._decode(self.cache.get(keys[text]))
+            if vector is not None:
+                vectors[position] = vector
+            else:
+                pending[text] = [position]
+        
+        missing = list(pending)
+        elapsed = 0.0
+        batches = 0
+        for start in range(0, len(missing), self.batch_size):
+            batch = missing[start:start + self.batch_size]
+            
+            started = time.perf_counter()
+            embedded = self.model.embed_query(batch) if kind == "query" else self.model(batch)
+            elapsed += time.perf_counter() - started
+            batches += 1
+            
+            encoded = {}
+            for text, vector in zip(batch, embedded):
+                vector = np.asarray(vector, dtype=np.float32)
+                for position in pending[text]:
+                    vectors[position] = vector
+                if self.cache is not None:
+                    encoded[keys[text]] = self._encode(vector)
+            
+            # Un lot entier est écrit en une seule transaction
+            if encoded:
+                self.cache.set_many(encoded)
+        
+        with self._lock:
+            self._stats["texts"] += len(texts)
+            self._stats["cache_hits"] += len(texts) - sum(len(positions) for positions in pending.values())
+            self._stats["embedded"] += len(missing)
+            self._stats["batches"] += batches
+            self._stats["embed_seconds"] += elapsed
+        
+        return vectors
+    
+    @staticmethod
+    def _encode(vector: np.ndarray) -> str:
+        """Sérialise un vecteur pour le cache (float32 en base64)."""
+        return base64.b64encode(vector.tobytes()).decode("ascii")
+    
+    @staticmethod
+    def _decode(value: Optional[str]) -> Optional[np.ndarray]:
+        """Désérialise un vecteur du cache."""
+        if value is None:
+            return None
+        return np.frombuffer(base64.b64decode(value), dtype=np.float32)
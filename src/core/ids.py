@@ -0,0 +1,124 @@
+"""
+Module de génération des identifiants de la base de connaissances.
+
+Les identifiants suivent le format ULID : 48 bits d'horodatage en
+millisecondes puis 80 bits aléatoires, encodés en 26 caractères base32 de
+Crockford. Ils sont triables par date de création, uniques sans
+coordination entre processus, et strictement croissants au sein d'un même
+processus (l'aléa est incrémenté quand deux IDs tombent dans la même
+milliseconde).
+"""
+
+import hashlib
+import re
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+ULID_LENGTH = 26
+
+_ENCODING = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_ULID_PATTERN = re.compile(r"[0-7][0-9A-HJKMNP-TV-Z]{25}")
+_RANDOM_BITS = 80
+
+_lock = threading.Lock()
+_last_ms = -1
+_last_random = 0
+
+
+def new_ulid(timestamp: Optional[float] = None, seed: Optional[str] = None) -> str:
+    """
+    Génère un ULID.
+    
+    Args:
+        timestamp: Date à encoder en secondes depuis l'epoch (défaut: maintenant).
+                   Les ULIDs datés explicitement (migrations) ne sont pas monotones.
+        seed: Texte dont l'empreinte remplace l'aléa, pour obtenir toujours le même
+              ULID à partir des mêmes données (avec timestamp uniquement)
+        
+    Returns:
+        ULID de 26 caractères
+    """
+    global _last_ms, _last_random
+    
+    if timestamp is not None:
+        if seed is not None:
+            digest = hashlib.sha256(seed.encode("utf-8")).digest()
+            random_part = int.from_bytes(digest[:_RANDOM_BITS // 8], "big")
+        else:
+            random_part = secrets.randbits(_RANDOM_BITS)
+        return _encode(int(timestamp * 1000), 10) + _encode(random_part, 16)
+    
+    with _lock:
+        milliseconds = int(time.time() * 1000)
+        if milliseconds <= _last_ms:
+            # Même milliseconde (ou horloge reculée) : l'aléa précédent est incrémenté
+            milliseconds = _last_ms
+            random_part = _last_random + 1
+            if random_part >> _RANDOM_BITS:
+                milliseconds += 1
+                random_part = secrets.randbits(_RANDOM_BITS)
+        else:
+            random_part = secrets.randbits(_RANDOM_BITS)
+        _last_ms, _last_random = milliseconds, random_part
+    
+    return _encode(milliseconds, 10) + _encode(random_part, 16)
+
+
+def make_id(prefix: str, timestamp: Optional[float] = None, seed: Optional[str] = None) -> str:
+    """
+    Génère un identifiant préfixé (ex: solution_01J9Z3...).
+    
+    Args:
+        prefix: Préfixe du type d'objet
+        timestamp: Date à encoder (défaut: maintenant)
+        seed: Texte rendant l'identifiant déterministe (voir new_ulid)
+        
+    Returns:
+        Identifiant
+    """
+    return f"{prefix}_{new_ulid(timestamp, seed)}"
+
+
+def split_id(identifier: str) -> Optional[Tuple[str, str]]:
+    """
+    Sépare un identifiant préfixé en (préfixe, ULID).
+    
+    Args:
+        identifier: Identifiant à analyser
+        
+    Returns:
+        Tuple (préfixe, ULID), ou None pour un identifiant d'un autre format
+    """
+    prefix, _, ulid = identifier.rpartition("_")
+    if not prefix or not _ULID_PATTERN.fullmatch(ulid):
+        return None
+    return prefix, ulid
+
+
+def ulid_datetime(ulid: str) -> datetime:
+    """
+    Retourne la date de création encodée dans un ULID.
+    
+    Args:
+        ulid: ULID de 26 caractères
+        
+    Returns:
+        Date locale de création
+    """
+    milliseconds = 0
+    for char in ulid[:10]:
+        milliseconds = milliseconds * 32 + _ENCODING.index(char)
+    return datetime.fromtimestamp(milliseconds / 1000)
+
+
+def _encode(value: int, length: int) -> str:
+    """Encode un entier en base32 de Crockford, sur une longueur fixe."""
+    chars = []
+    for _ in range(length):
+        value, index = divmod(value, 32)
+        chars.append(_ENCODING[index])
+    return "".join(reversed(chars))
@@ -3,11 +3,29 @@ Module de gestion de la base de connaissances de l'agent AMIKAL.
 """
 
 import json
+import os
+import shutil
+import threading
+from itertools import chain, islice
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, Tuple
 from datetime import datetime
-import chromadb
-from chromadb.config import Settings
+
+from .blob_store import BlobStore
+from .cache import PersistentLRUCache
+from .dedupe import cosine_similarities, group_by_similarity, jaccard, merge_solution_records
+from .ids import make_id, split_id
+from .lexical_index import LexicalIndex, tokenize
+from .record_store import SqliteRecordStore
+from .retrieval import SEARCH_MODES, CrossEncoderReranker, reciprocal_rank_fusion
+from .template_index import TemplateIndex
+
+
+# Solutions existantes comparées à une nouvelle solution pour détecter un doublon
+DEDUPE_CANDIDATES = 5
+
+# Caractères de l'ULID formant le répertoire d'une solution (une période d'environ 12 jours)
+SOLUTION_SHARD_LENGTH = 4
 
 
 class KnowledgeBase:
@@ -26,6 +44,38 @@ class KnowledgeBase:
         self.base_path = config.get_knowledge_base_path()
         self.base_path.mkdir(parents=True, exist_ok=True)
         
+        # Index ID → fichier des templates (chargé au premier accès)
+        self.template_index = TemplateIndex(self.base_path / "templates")
+        
+        # Contenu des fichiers des historiques de projets, rangé par empreinte
+        self.blobs = BlobStore(self.base_path / "blobs")
+        
+        # Stockage des enregistrements : fichiers JSON, ou un seul fichier SQLite indexé
+        self.store: Optional[SqliteRecordStore] = None
+        if config.knowledge_base.storage == "sqlite":
+            self.store = SqliteRecordStore(config.get_knowledge_store_path())
+        elif config.knowledge_base.storage != "json":
+            raise ValueError(f"Stockage inconnu : {config.knowledge_base.storage} (attendu : json, sqlite)")
+        
+        # Index lexical (BM25) des templates et des solutions ; celui des solutions est
+        # construit au premier accès s'il est absent (FTS5 du fichier SQLite en stockage sqlite)
+        self._solution_lexical_index = None
+        if self.store is not None:
+            self.template_lexical_index = self.store.lexical_index("template")
+            self._solution_lexical_index = self.store.lexical_index("solution")
+        else:
+            self.template_lexical_index = LexicalIndex(
+                self.base_path / "templates" / "lexical_index.json",
+                flush_delay=config.knowledge_base.lexical_flush_delay
+            )
+        self._solutions_lock = threading.RLock()
+        
+        # Reclassement par cross-encoder des recherches hybrides (optionnel)
+        self.reranker = None
+        if config.retrieval.rerank_enabled:
+            self.reranker = CrossEncoderReranker(config.retrieval.rerank_model)
+            self.reranker.warm_up()
+        
         # Initialisation de ChromaDB si activé
         self.vector_db_enabled = config.knowledge_base.vector_db_enabled
         if self.vector_db_enabled:
@@ -33,6 +83,11 @@ class KnowledgeBase:
     
     def _init_vector_db(self):
         """Initialise la base de données vectorielle ChromaDB."""
+        # Import différé : chromadb domine le temps de démarrage
+        import chromadb
+        from chromadb.config import Settings
+        from .embeddings import CachedEmbeddingFunction, create_embedding_model
+        
         db_path = self.base_path / "chroma_db"
         db_path.mkdir(parents=True, exist_ok=True)
         
@@ -41,23 +96,55 @@ class KnowledgeBase:
             settings=Settings(anonymized_telemetry=False)
         )
         
-        # Collection pour les templates
-        self.templates_collection = self.chroma_client.get_or_create_collection(
-            name="templates",
-            metadata={"description": "Templates de code réutilisables"}
+        # Embeddings locaux, mis en cache : une requête déjà vue n'est pas ré-encodée
+        embeddings = self.config.embeddings
+        cache = None
+        if embeddings.cache_enabled:
+            cache = PersistentLRUCache(
+                db_path=self.config.get_embedding_cache_path(),
+                max_memory_entries=embeddings.memory_entries,
+                max_disk_entries=embeddings.disk_entries
+            )
+        self.embedding_function = CachedEmbeddingFunction(
+            create_embedding_model(embeddings.provider, embeddings.model),
+            cache=cache,
+            batch_size=embeddings.batch_size
         )
         
+        # Collection pour les templates
+        self.templates_collection = self._get_collection("templates", "Templates de code réutilisables")
+        
         # Collection pour les patterns
-        self.patterns_collection = self.chroma_client.get_or_create_collection(
-            name="patterns",
-            metadata={"description": "Patterns de conception appris"}
-        )
+        self.patterns_collection = self._get_collection("patterns", "Patterns de conception appris")
         
         # Collection pour les solutions
-        self.solutions_collection = self.chroma_client.get_or_create_collection(
-            name="solutions",
-            metadata={"description": "Solutions à des problèmes spécifiques"}
-        )
+        self.solutions_collection = self._get_collection("solutions", "Solutions à des problèmes spécifiques")
+    
+    def _get_collection(self, name: str, description: str):
+        """Ouvre (ou crée) une collection ChromaDB avec la fonction d'embedding configurée."""
+        try:
+            return self.chroma_client.get_or_create_collection(
+                name=name,
+                metadata={"description": description},
+                embedding_function=self.embedding_function
+            )
+        except ValueError as e:
+            raise ValueError(
+                f"La collection {name} a été indexée avec un autre modèle d'embedding. "
+                f"Rétablir embeddings.provider / embeddings.model ou supprimer "
+                f"{self.base_path / 'chroma_db'} pour réindexer ({e})"
+            ) from e
+    
+    def embedding_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs d'encodage des embeddings.
+        
+        Returns:
+            Textes encodés, hits du cache, débit d'encodage (textes/s), vide sans base vectorielle
+        """
+        if not self.vector_db_enabled:
+            return {}
+        return self.embedding_function.stats()
     
     def save_template(self, name: str, description: str, code: str, 
                      language: str, tags: List[str] = None) -> str:
@@ -76,10 +163,6 @@ class KnowledgeBase:
         """
         template_id = f"template_{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
         
-        # Sauvegarde dans le système de fichiers
-        template_dir = self.base_path / "templates" / language
-        template_dir.mkdir(parents=True, exist_ok=True)
-        
         template_data = {
             "id": template_id,
             "name": name,
@@ -90,46 +173,119 @@ class KnowledgeBase:
             "created_at": datetime.now().isoformat()
         }
         
-        template_file = template_dir / f"{name}.json"
-        with open(template_file, 'w', encoding='utf-8') as f:
-            json.dump(template_data, f, indent=2, ensure_ascii=False)
-        
-        # Sauvegarde du code dans un fichier séparé
-        code_file = template_dir / f"{name}.{self._get_file_extension(language)}"
-        with open(code_file, 'w', encoding='utf-8') as f:
-            f.write(code)
+        # Sauvegarde dans le stockage
+        self._store_templates([template_data])
+        self._index_template_lexical(template_data)
         
         # Indexation dans ChromaDB si activé
         if self.vector_db_enabled:
             self.templates_collection.add(
-                documents=[f"{name}: {description}\n\n{code}"],
-                metadatas=[{
-                    "name": name,
-                    "language": language,
-                    "tags": ",".join(tags or [])
-                }],
+                documents=[self._template_document(template_data)],
+                metadatas=[self._template_metadata(template_data)],
                 ids=[template_id]
             )
         
         return template_id
     
+    def save_templates_bulk(self, templates: Iterable[Dict[str, Any]],
+                            chunk_size: Optional[int] = None,
+                            on_progress: Optional[Callable[[int], None]] = None) -> List[str]:
+        """
+        Sauvegarde un grand nombre de templates par lots.
+        
+        Chaque lot est écrit sur disque puis indexé dans ChromaDB en un seul
+        appel (embeddings calculés ensemble, une seule transaction).
+        
+        Args:
+            templates: Templates (clés name, description, code, language, tags), lus au fil de l'eau
+            chunk_size: Nombre de templates par lot (défaut: knowledge_base.bulk_chunk_size)
+            on_progress: Fonction appelée avec le nombre de templates sauvegardés après chaque lot
+            
+        Returns:
+            IDs des templates sauvegardés, dans l'ordre d'entrée
+        """
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        created_at = datetime.now().isoformat()
+        saved_ids = []
+        
+        for chunk in self._chunks(templates, chunk_size):
+            batch = []
+            for record in chunk:
+                template_data = {
+                    "id": f"template_{record['name']}_{stamp}_{len(saved_ids) + len(batch):06d}",
+                    "name": record["name"],
+                    "description": record.get("description", ""),
+                    "code": record.get("code", ""),
+                    "language": record.get("language", "text"),
+                    "tags": record.get("tags") or [],
+                    "created_at": record.get("created_at", created_at)
+                }
+                batch.append(template_data)
+            
+            self._store_templates(batch)
+            for template_data in batch:
+                self._index_template_lexical(template_data, persist=False)
+            self.template_lexical_index.flush()
+            
+            if self.vector_db_enabled:
+                self.templates_collection.add(
+                    documents=[self._template_document(data) for data in batch],
+                    metadatas=[self._template_metadata(data) for data in batch],
+                    ids=[data["id"] for data in batch]
+                )
+            
+            saved_ids.extend(data["id"] for data in batch)
+            if on_progress:
+                on_progress(len(saved_ids))
+        
+        return saved_ids
+    
     def search_templates(self, query: str, language: Optional[str] = None, 
-                        limit: int = 5) -> List[Dict[str, Any]]:
+                        limit: int = 5, mode: Optional[str] = None,
+                        rerank: Optional[bool] = None,
+                        budget_ms: Optional[float] = None) -> List[Dict[str, Any]]:
         """
-        Recherche des templates par similarité sémantique.
+        Recherche des templates.
         
         Args:
             query: Requête de recherche
             language: Filtrer par langage (optionnel)
             limit: Nombre maximum de résultats
+            mode: vector (similarité sémantique), lexical (BM25) ou hybrid
+                  (fusion des deux) ; défaut : retrieval.default_mode
+            rerank: Reclasser les résultats hybrides par cross-encoder (défaut : retrieval.rerank_enabled)
+            budget_ms: Temps maximal de reclassement (défaut : retrieval.rerank_budget_ms)
             
         Returns:
-            Liste de templates correspondants
+            Liste de templates correspondants ; le score est une distance en mode
+            vector et une pertinence (plus grand = meilleur) dans les autres modes
         """
-        if not self.vector_db_enabled:
+        mode = self._resolve_search_mode(mode)
+        
+        if mode == "lexical":
             return self._search_templates_filesystem(query, language, limit)
         
-        # Recherche dans ChromaDB
+        if mode == "vector":
+            return self._search_templates_vector(query, language, limit)
+        
+        candidates = limit * self.config.retrieval.candidate_multiplier
+        vector_results = self._search_templates_vector(query, language, candidates)
+        
+        self._sync_template_lexical_index()
+        where = {"language": language} if language else None
+        lexical_hits = self.template_lexical_index.search(query, candidates, where)
+        
+        return self._hybrid_results(
+            query,
+            rankings=[[t["id"] for t in vector_results], [template_id for template_id, _ in lexical_hits]],
+            hydrate=lambda ids: [t for t in (self.get_template(template_id) for template_id in ids) if t],
+            to_text=self._template_document,
+            limit=limit, rerank=rerank, budget_ms=budget_ms
+        )
+    
+    def _search_templates_vector(self, query: str, language: Optional[str],
+                                 limit: int) -> List[Dict[str, Any]]:
+        """Recherche des templates par similarité sémantique dans ChromaDB."""
         where_filter = {"language": language} if language else None
         
         results = self.templates_collection.query(
@@ -154,40 +310,19 @@ class KnowledgeBase:
     
     def _search_templates_filesystem(self, query: str, language: Optional[str] = None,
                                     limit: int = 5) -> List[Dict[str, Any]]:
-        """Recherche de templates dans le système de fichiers (fallback)."""
-        templates_dir = self.base_path / "templates"
-        if not templates_dir.exists():
-            return []
+        """Recherche de templates par mots-clés dans l'index lexical (BM25)."""
+        self._sync_template_lexical_index()
         
-        templates = []
+        where = {"language": language} if language else None
         
-        # Parcourir les répertoires de langages
-        for lang_dir in templates_dir.iterdir():
-            if not lang_dir.is_dir():
-                continue
-            
-            if language and lang_dir.name != language:
-                continue
-            
-            # Lire les fichiers JSON
-            for template_file in lang_dir.glob("*.json"):
-                try:
-                    with open(template_file, 'r', encoding='utf-8') as f:
-                        template_data = json.load(f)
-                        templates.append(template_data)
-                except Exception:
-                    continue
-        
-        # Filtrage simple par mots-clés
-        query_lower = query.lower()
-        filtered_templates = [
-            t for t in templates
-            if query_lower in t.get("name", "").lower() or
-               query_lower in t.get("description", "").lower() or
-               any(query_lower in tag.lower() for tag in t.get("tags", []))
-        ]
+        templates = []
+        for template_id, score in self.template_lexical_index.search(query, limit, where):
+            template_data = self.get_template(template_id)
+            if template_data:
+                template_data["score"] = score
+                templates.append(template_data)
         
-        return filtered_templates[:limit]
+        return templates
     
     def get_template(self, template_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -199,43 +334,29 @@ class KnowledgeBase:
         Returns:
             Données du template ou None
         """
-        templates_dir = self.base_path / "templates"
-        
-        # Rechercher dans tous les répertoires de langages
-        for lang_dir in templates_dir.iterdir():
-            if not lang_dir.is_dir():
-                continue
-            
-            for template_file in lang_dir.glob("*.json"):
-                try:
-                    with open(template_file, 'r', encoding='utf-8') as f:
-                        template_data = json.load(f)
-                        if template_data.get("id") == template_id:
-                            return template_data
-                except Exception:
-                    continue
-        
-        return None
+        if self.store is not None:
+            return self.store.get("template", template_id)
+        return self.template_index.load(template_id)
     
     def save_solution(self, problem: str, solution: str, context: str = "",
-                     tags: List[str] = None) -> str:
+                     tags: List[str] = None, dedupe: Optional[bool] = None) -> str:
         """
         Sauvegarde une solution à un problème.
         
+        Une solution quasi identique à une solution existante n'est pas
+        ajoutée : elle incrémente le compteur d'occurrences de l'existante.
+        
         Args:
             problem: Description du problème
             solution: Solution apportée
             context: Contexte additionnel
             tags: Tags pour la recherche
+            dedupe: Fusionner avec une solution quasi identique (défaut: knowledge_base.dedupe_enabled)
             
         Returns:
-            ID de la solution sauvegardée
+            ID de la solution sauvegardée (ou de la solution existante)
         """
-        solution_id = f"solution_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # Sauvegarde dans le système de fichiers
-        solutions_dir = self.base_path / "solutions"
-        solutions_dir.mkdir(parents=True, exist_ok=True)
+        solution_id = make_id("solution")
         
         solution_data = {
             "id": solution_id,
@@ -243,53 +364,198 @@ class KnowledgeBase:
             "solution": solution,
             "context": context,
             "tags": tags or [],
+            "occurrences": 1,
             "created_at": datetime.now().isoformat()
         }
         
-        solution_file = solutions_dir / f"{solution_id}.json"
-        with open(solution_file, 'w', encoding='utf-8') as f:
-            json.dump(solution_data, f, indent=2, ensure_ascii=False)
+        if dedupe is None:
+            dedupe = self.config.knowledge_base.dedupe_enabled
         
-        # Indexation dans ChromaDB si activé
-        if self.vector_db_enabled:
-            self.solutions_collection.add(
-                documents=[f"Problème: {problem}\n\nSolution: {solution}\n\nContexte: {context}"],
-                metadatas=[{
-                    "tags": ",".join(tags or [])
-                }],
-                ids=[solution_id]
-            )
+        # Les workers du webhook sauvegardent en parallèle : la recherche d'un doublon
+        # et l'écriture ne doivent pas s'entrelacer
+        with self._solutions_lock:
+            if dedupe:
+                duplicate_id = self._find_duplicate_solution(solution_data)
+                if duplicate_id and self._merge_solutions(duplicate_id, [solution_data]):
+                    return duplicate_id
+            
+            # Sauvegarde dans le système de fichiers
+            self._write_solution(solution_data)
+            self.solution_lexical_index.add(solution_id, self._solution_document(solution_data))
+            
+            # Indexation dans ChromaDB si activé
+            if self.vector_db_enabled:
+                self.solutions_collection.add(
+                    documents=[self._solution_document(solution_data)],
+                    metadatas=[self._solution_metadata(solution_data)],
+                    ids=[solution_id]
+                )
         
         return solution_id
     
-    def search_solutions(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+    def save_solutions_bulk(self, solutions: Iterable[Dict[str, Any]],
+                            chunk_size: Optional[int] = None,
+                            on_progress: Optional[Callable[[int], None]] = None) -> List[str]:
+        """
+        Sauvegarde un grand nombre de solutions par lots.
+        
+        Chaque lot est écrit sur disque puis indexé dans ChromaDB en un seul
+        appel (embeddings calculés ensemble, une seule transaction).
+        
+        Args:
+            solutions: Solutions (clés problem, solution, context, tags), lues au fil de l'eau
+            chunk_size: Nombre de solutions par lot (défaut: knowledge_base.bulk_chunk_size)
+            on_progress: Fonction appelée avec le nombre de solutions sauvegardées après chaque lot
+            
+        Returns:
+            IDs des solutions sauvegardées, dans l'ordre d'entrée
+        """
+        created_at = datetime.now().isoformat()
+        saved_ids = []
+        
+        for chunk in self._chunks(solutions, chunk_size):
+            batch = []
+            for record in chunk:
+                solution_data = {
+                    "id": self._new_solution_id(record.get("created_at")),
+                    "problem": record["problem"],
+                    "solution": record["solution"],
+                    "context": record.get("context", ""),
+                    "tags": record.get("tags") or [],
+                    "occurrences": record.get("occurrences", 1),
+                    "created_at": record.get("created_at", created_at)
+                }
+                batch.append(solution_data)
+            
+            self._store_solutions(batch)
+            for solution_data in batch:
+                self.solution_lexical_index.add(
+                    solution_data["id"], self._solution_document(solution_data), persist=False
+                )
+            self.solution_lexical_index.flush()
+            
+            if self.vector_db_enabled:
+                self.solutions_collection.add(
+                    documents=[self._solution_document(data) for data in batch],
+                    metadatas=[self._solution_metadata(data) for data in batch],
+                    ids=[data["id"] for data in batch]
+                )
+            
+            saved_ids.extend(data["id"] for data in batch)
+            if on_progress:
+                on_progress(len(saved_ids))
+        
+        return saved_ids
+    
+    def search_solutions(self, query: str, limit: int = 5, mode: Optional[str] = None,
+                         rerank: Optional[bool] = None,
+                         budget_ms: Optional[float] = None) -> List[Dict[str, Any]]:
         """
         Recherche des solutions similaires.
         
         Args:
             query: Requête de recherche
             limit: Nombre maximum de résultats
+            mode: vector (similarité sémantique), lexical (BM25) ou hybrid
+                  (fusion des deux) ; défaut : retrieval.default_mode
+            rerank: Reclasser les résultats hybrides par cross-encoder (défaut : retrieval.rerank_enabled)
+            budget_ms: Temps maximal de reclassement (défaut : retrieval.rerank_budget_ms)
             
         Returns:
-            Liste de solutions correspondantes
+            Liste de solutions correspondantes ; le score est une distance en mode
+            vector et une pertinence (plus grand = meilleur) dans les autres modes
         """
-        if not self.vector_db_enabled:
-            return []
+        mode = self._resolve_search_mode(mode)
+        
+        if mode == "vector":
+            return self._search_solutions_vector(query, limit)
+        
+        if mode == "lexical":
+            hits = self.solution_lexical_index.search(query, limit)
+            scores = dict(hits)
+            solutions = self.get_solutions([solution_id for solution_id, _ in hits])
+            for solution_data in solutions:
+                solution_data['score'] = scores[solution_data['id']]
+            return solutions
+        
+        candidates = limit * self.config.retrieval.candidate_multiplier
+        vector_results = self._search_solutions_vector(query, candidates)
+        lexical_hits = self.solution_lexical_index.search(query, candidates)
+        
+        # Les résultats vectoriels sont déjà hydratés : seuls les autres sont relus
+        known = {solution_data['id']: solution_data for solution_data in vector_results}
+        
+        def hydrate(ids):
+            missing = self.get_solutions([solution_id for solution_id in ids if solution_id not in known])
+            known.update((solution_data['id'], solution_data) for solution_data in missing)
+            return [known[solution_id] for solution_id in ids if solution_id in known]
         
+        return self._hybrid_results(
+            query,
+            rankings=[list(known), [solution_id for solution_id, _ in lexical_hits]],
+            hydrate=hydrate,
+            to_text=self._solution_document,
+            limit=limit, rerank=rerank, budget_ms=budget_ms
+        )
+    
+    def _search_solutions_vector(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Recherche des solutions par similarité sémantique dans ChromaDB."""
         results = self.solutions_collection.query(
             query_texts=[query],
-            n_results=limit
+            n_results=limit,
+            include=["metadatas", "distances"]
         )
         
+        if not results['ids'] or not results['ids'][0]:
+            return []
+        
+        ids = results['ids'][0]
+        metadatas = results['metadatas'][0] if results.get('metadatas') else [None] * len(ids)
+        distances = results['distances'][0] if results.get('distances') else [None] * len(ids)
+        
+        # Les solutions sont hydratées depuis les métadonnées, sans lecture de fichier
+        hydrated = self._solutions_from_metadatas(ids, metadatas)
+        
         solutions = []
-        if results['ids'] and results['ids'][0]:
-            for i, solution_id in enumerate(results['ids'][0]):
+        for solution_id, distance in zip(ids, distances):
+            solution_data = hydrated.get(solution_id)
+            if solution_data:
+                solution_data['score'] = distance
+                solutions.append(solution_data)
+        
+        return solutions
+    
+    def get_solutions(self, solution_ids: List[str]) -> List[Dict[str, Any]]:
+        """
+        Récupère plusieurs solutions en une seule opération.
+        
+        Args:
+            solution_ids: IDs des solutions
+            
+        Returns:
+            Données des solutions trouvées, dans l'ordre des IDs demandés
+        """
+        if not solution_ids:
+            return []
+        
+        if self.vector_db_enabled:
+            results = self.solutions_collection.get(ids=list(solution_ids), include=["metadatas"])
+            found = self._solutions_from_metadatas(results['ids'], results['metadatas'])
+        else:
+            found = {}
+        
+        # Solutions absentes de ChromaDB : lecture du stockage
+        if self.store is not None:
+            missing = [solution_id for solution_id in solution_ids if solution_id not in found]
+            found.update(self.store.get_many("solution", missing))
+        
+        for solution_id in solution_ids:
+            if solution_id not in found:
                 solution_data = self.get_solution(solution_id)
                 if solution_data:
-                    solution_data['score'] = results['distances'][0][i] if 'distances' in results else None
-                    solutions.append(solution_data)
+                    found[solution_id] = solution_data
         
-        return solutions
+        return [found[solution_id] for solution_id in solution_ids if solution_id in found]
     
     def get_solution(self, solution_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -301,7 +567,10 @@ class KnowledgeBase:
         Returns:
             Données de la solution ou None
         """
-        solution_file = self.base_path / "solutions" / f"{solution_id}.json"
+        if self.store is not None:
+            return self.store.get("solution", solution_id)
+        
+        solution_file = self._solution_path(solution_id)
         
         if not solution_file.exists():
             return None
@@ -312,11 +581,568 @@ class KnowledgeBase:
         except Exception:
             return None
     
+    def migrate_solutions(self, dry_run: bool = False,
+                          on_progress: Optional[Callable[[int], None]] = None) -> Dict[str, str]:
+        """
+        Migre les solutions à l'ancien format d'ID (solution_AAAAMMJJ_HHMMSS).
+        
+        Chaque solution reçoit un ID ULID daté de sa création et déterministe
+        (une migration interrompue peut être relancée sans créer de doublon),
+        est déplacée dans son répertoire par préfixe, et réindexée sous son
+        nouvel ID dans ChromaDB (embeddings existants réutilisés) et dans
+        l'index lexical. L'ancien ID est conservé dans le champ legacy_id.
+        
+        Args:
+            dry_run: Calculer les nouveaux IDs sans rien modifier
+            on_progress: Fonction appelée avec le nombre de solutions migrées après chaque lot
+            
+        Returns:
+            Dictionnaire {ancien ID: nouvel ID}
+        """
+        solutions_dir = self.base_path / "solutions"
+        if self.store is not None:
+            legacy = [(None, solution_data) for solution_data in self.store.iter_records("solution")
+                      if split_id(solution_data["id"]) is None]
+        else:
+            legacy = [(solution_file, None) for solution_file in sorted(solutions_dir.glob("*.json"))] \
+                if solutions_dir.is_dir() else []
+        mapping: Dict[str, str] = {}
+        
+        for chunk in self._chunks(legacy, None):
+            batch = []
+            for solution_file, solution_data in chunk:
+                if solution_data is None:
+                    try:
+                        with open(solution_file, 'r', encoding='utf-8') as f:
+                            solution_data = json.load(f)
+                    except (OSError, ValueError):
+                        continue
+                
+                old_id = solution_data.get("id") or solution_file.stem
+                if split_id(old_id) is not None:
+                    # Déjà au nouveau format mais mal rangée : seul le fichier est déplacé
+                    new_id = old_id
+                else:
+                    try:
+                        timestamp = datetime.fromisoformat(solution_data["created_at"]).timestamp()
+                    except (KeyError, TypeError, ValueError):
+                        timestamp = solution_file.stat().st_mtime if solution_file else datetime.now().timestamp()
+                    new_id = make_id("solution", timestamp, seed=old_id)
+                    solution_data = {**solution_data, "id": new_id, "legacy_id": old_id}
+                
+                mapping[old_id] = new_id
+                batch.append((solution_file, old_id, solution_data))
+            
+            if dry_run or not batch:
+                continue
+            
+            with self._solutions_lock:
+                self._store_solutions([solution_data for _, _, solution_data in batch])
+                for solution_file, old_id, solution_data in batch:
+                    self.solution_lexical_index.remove(old_id, persist=False)
+                    self.solution_lexical_index.add(
+                        solution_data["id"], self._solution_document(solution_data), persist=False
+                    )
+                
+                if self.vector_db_enabled:
+                    self._rekey_solution_vectors([(old_id, solution_data) for _, old_id, solution_data in batch])
+                
+                # Les anciens enregistrements ne sont supprimés qu'une fois le lot réindexé
+                self.solution_lexical_index.flush()
+                for solution_file, old_id, solution_data in batch:
+                    if solution_file is None:
+                        self._delete_solution_record(old_id)
+                    elif solution_file != self._solution_path(solution_data["id"]):
+                        solution_file.unlink(missing_ok=True)
+            
+            if on_progress:
+                on_progress(len(mapping))
+        
+        return mapping
+    
+    def _rekey_solution_vectors(self, renamed: List[Tuple[str, Dict[str, Any]]]):
+        """
+        Réindexe des solutions sous leur nouvel ID dans ChromaDB.
+        
+        Args:
+            renamed: Couples (ancien ID, données de la solution sous son nouvel ID)
+        """
+        old_ids = [old_id for old_id, _ in renamed]
+        existing = self.solutions_collection.get(ids=old_ids, include=["embeddings"])
+        vectors = dict(zip(existing['ids'], existing['embeddings']))
+        
+        # Les embeddings existants sont réutilisés ; les solutions jamais indexées sont encodées
+        with_vectors = [(old_id, data) for old_id, data in renamed if old_id in vectors]
+        without_vectors = [data for old_id, data in renamed if old_id not in vectors]
+        
+        if with_vectors:
+            self.solutions_collection.upsert(
+                ids=[data["id"] for _, data in with_vectors],
+                embeddings=[vectors[old_id] for old_id, _ in with_vectors],
+                documents=[self._solution_document(data) for _, data in with_vectors],
+                metadatas=[self._solution_metadata(data) for _, data in with_vectors]
+            )
+        if without_vectors:
+            self.solutions_collection.upsert(
+                ids=[data["id"] for data in without_vectors],
+                documents=[self._solution_document(data) for data in without_vectors],
+                metadatas=[self._solution_metadata(data) for data in without_vectors]
+            )
+        
+        stale_ids = [old_id for old_id, data in renamed if old_id != data["id"] and old_id in vectors]
+        if stale_ids:
+            self.solutions_collection.delete(ids=stale_ids)
+    
+    def compact_solutions(self, threshold: Optional[float] = None,
+                          dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Fusionne les solutions quasi identiques déjà enregistrées.
+        
+        Chaque groupe de doublons est fusionné dans sa solution la plus
+        ancienne ; les autres sont supprimées des fichiers, de ChromaDB et
+        de l'index lexical.
+        
+        Args:
+            threshold: Similarité minimale entre deux doublons (défaut: knowledge_base.dedupe_threshold)
+            dry_run: Calculer les groupes sans rien modifier
+            
+        Returns:
+            Nombre de solutions, de groupes, de solutions fusionnées et restantes,
+            et les groupes {ID conservé: IDs fusionnés}
+        """
+        threshold = threshold if threshold is not None else self.config.knowledge_base.dedupe_threshold
+        solutions = sorted(self._iter_solutions(), key=lambda data: (data.get("created_at", ""), data["id"]))
+        by_id = {solution_data["id"]: solution_data for solution_data in solutions}
+        
+        if self.vector_db_enabled:
+            groups = self._group_duplicates_vector(list(by_id), threshold)
+        else:
+            groups = self._group_duplicates_lexical(solutions, threshold)
+        
+        merged = sum(len(duplicate_ids) for duplicate_ids in groups.values())
+        
+        if not dry_run:
+            with self._solutions_lock:
+                for keeper_id, duplicate_ids in groups.items():
+                    self._merge_solutions(keeper_id, [by_id[duplicate_id] for duplicate_id in duplicate_ids],
+                                          remove=True)
+                self.solution_lexical_index.flush()
+        
+        return {
+            "solutions": len(solutions),
+            "groups": len(groups),
+            "merged": merged,
+            "remaining": len(solutions) - merged,
+            "duplicates": groups
+        }
+    
+    def _find_duplicate_solution(self, solution_data: Dict[str, Any]) -> Optional[str]:
+        """Cherche une solution existante quasi identique ; retourne son ID ou None."""
+        threshold = self.config.knowledge_base.dedupe_threshold
+        document = self._solution_document(solution_data)
+        
+        if self.vector_db_enabled:
+            # L'embedding est mis en cache : l'ajout éventuel ne le recalcule pas
+            vector = self.embedding_function([document])[0]
+            results = self.solutions_collection.query(
+                query_embeddings=[vector],
+                n_results=DEDUPE_CANDIDATES,
+                include=["embeddings"]
+            )
+            if not results['ids'] or not results['ids'][0]:
+                return None
+            similarities = cosine_similarities(vector, results['embeddings'][0])
+            best = int(similarities.argmax())
+            return results['ids'][0][best] if similarities[best] >= threshold else None
+        
+        terms = set(tokenize(document))
+        hits = self.solution_lexical_index.search(document, DEDUPE_CANDIDATES)
+        for candidate in self.get_solutions([solution_id for solution_id, _ in hits]):
+            if jaccard(terms, set(tokenize(self._solution_document(candidate)))) >= threshold:
+                return candidate["id"]
+        return None
+    
+    def _group_duplicates_vector(self, ids: List[str], threshold: float) -> Dict[str, List[str]]:
+        """Regroupe les doublons par similarité cosinus des embeddings stockés dans ChromaDB."""
+        vectors = {}
+        for start in range(0, len(ids), self.chroma_client.get_max_batch_size()):
+            page = self.solutions_collection.get(
+                ids=ids[start:start + self.chroma_client.get_max_batch_size()],
+                include=["embeddings"]
+            )
+            vectors.update(zip(page['ids'], page['embeddings']))
+        
+        # Les solutions absentes de ChromaDB ne sont pas comparées
+        indexed = [solution_id for solution_id in ids if solution_id in vectors]
+        if not indexed:
+            return {}
+        return group_by_similarity(indexed, [vectors[solution_id] for solution_id in indexed], threshold)
+    
+    def _group_duplicates_lexical(self, solutions: List[Dict[str, Any]],
+                                  threshold: float) -> Dict[str, List[str]]:
+        """Regroupe les doublons par similarité de Jaccard des termes (sans base vectorielle)."""
+        order = {solution_data["id"]: position for position, solution_data in enumerate(solutions)}
+        terms = {solution_data["id"]: set(tokenize(self._solution_document(solution_data)))
+                 for solution_data in solutions}
+        merged = set()
+        groups = {}
+        
+        for solution_data in solutions:
+            keeper_id = solution_data["id"]
+            if keeper_id in merged:
+                continue
+            
+            # Seules les solutions partageant des termes rares sont comparées
+            hits = self.solution_lexical_index.search(self._solution_document(solution_data), DEDUPE_CANDIDATES)
+            duplicate_ids = [
+                solution_id for solution_id, _ in hits
+                if solution_id in order and order[solution_id] > order[keeper_id] and solution_id not in merged
+                and jaccard(terms[keeper_id], terms[solution_id]) >= threshold
+            ]
+            if duplicate_ids:
+                merged.update(duplicate_ids)
+                groups[keeper_id] = sorted(duplicate_ids, key=order.get)
+        
+        return groups
+    
+    def _merge_solutions(self, keeper_id: str, duplicates: List[Dict[str, Any]],
+                         remove: bool = False) -> bool:
+        """
+        Fusionne des solutions dans une solution existante.
+        
+        Args:
+            keeper_id: ID de la solution conservée
+            duplicates: Solutions fusionnées (nouvelles ou existantes)
+            remove: Supprimer les solutions fusionnées de la base
+            
+        Returns:
+            True si la solution conservée existe et a été mise à jour
+        """
+        keeper = self.get_solution(keeper_id)
+        if keeper is None:
+            return False
+        
+        merged = merge_solution_records(keeper, duplicates)
+        self._write_solution(merged)
+        if self.vector_db_enabled:
+            self.solutions_collection.update(ids=[keeper_id], metadatas=[self._solution_metadata(merged)])
+        
+        if remove:
+            duplicate_ids = [duplicate["id"] for duplicate in duplicates]
+            for duplicate_id in duplicate_ids:
+                self.solution_lexical_index.remove(duplicate_id, persist=False)
+                self._delete_solution_record(duplicate_id)
+            if self.vector_db_enabled:
+                self.solutions_collection.delete(ids=duplicate_ids)
+        
+        return True
+    
+    @property
+    def solution_lexical_index(self) -> LexicalIndex:
+        """Index lexical des solutions, construit à partir des fichiers s'il n'existe pas encore."""
+        if self._solution_lexical_index is None:
+            index = LexicalIndex(
+                self.base_path / "lexical_solutions.json",
+                flush_delay=self.config.knowledge_base.lexical_flush_delay
+            )
+            if not index.index_path.exists():
+                index.clear()
+                for solution_data in self._iter_solutions():
+                    index.add(solution_data["id"], self._solution_document(solution_data), persist=False)
+                index.flush()
+            self._solution_lexical_index = index
+        return self._solution_lexical_index
+    
+    def _iter_solutions(self) -> Iterator[Dict[str, Any]]:
+        """Parcourt toutes les solutions stockées."""
+        if self.store is not None:
+            return self.store.iter_records("solution")
+        return self._iter_solution_files()
+    
+    def _iter_solution_files(self, base_path: Optional[Path] = None) -> Iterator[Dict[str, Any]]:
+        """Parcourt les fichiers JSON des solutions (répertoires par préfixe et ancien format à plat)."""
+        solutions_dir = (base_path or self.base_path) / "solutions"
+        if not solutions_dir.is_dir():
+            return
+        
+        for solution_file in chain(solutions_dir.glob("*/*.json"), solutions_dir.glob("*.json")):
+            try:
+                with open(solution_file, 'r', encoding='utf-8') as f:
+                    solution_data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if solution_data.get("id"):
+                yield solution_data
+    
+    def _resolve_search_mode(self, mode: Optional[str]) -> str:
+        """Détermine le mode de recherche effectif."""
+        mode = mode or self.config.retrieval.default_mode
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Mode de recherche inconnu : {mode} (attendu : {', '.join(SEARCH_MODES)})")
+        
+        # Sans base vectorielle, seule la recherche lexicale est possible
+        if not self.vector_db_enabled:
+            return "lexical"
+        return mode
+    
+    def _hybrid_results(self, query: str, rankings: List[List[str]],
+                        hydrate: Callable[[List[str]], List[Dict[str, Any]]],
+                        to_text: Callable[[Dict[str, Any]], str], limit: int,
+                        rerank: Optional[bool], budget_ms: Optional[float]) -> List[Dict[str, Any]]:
+        """
+        Fusionne des classements (RRF), les hydrate puis les reclasse éventuellement.
+        
+        Args:
+            query: Requête de recherche
+            rankings: Classements d'IDs à fusionner
+            hydrate: Fonction retournant les données complètes d'une liste d'IDs
+            to_text: Fonction construisant le texte d'un résultat pour le reclassement
+            limit: Nombre maximum de résultats
+            rerank: Reclasser par cross-encoder (None = configuration)
+            budget_ms: Temps maximal de reclassement (None = configuration)
+            
+        Returns:
+            Résultats, avec le score fusionné
+        """
+        fused = reciprocal_rank_fusion(rankings, k=self.config.retrieval.rrf_k)
+        candidates = fused if self._should_rerank(rerank) else fused[:limit]
+        
+        scores = dict(candidates)
+        results = hydrate([doc_id for doc_id, _ in candidates])
+        for result in results:
+            result['score'] = scores[result['id']]
+        
+        if self._should_rerank(rerank) and results:
+            if budget_ms is None:
+                budget_ms = self.config.retrieval.rerank_budget_ms
+            order = self.reranker.rerank(query, [(r['id'], to_text(r)) for r in results], budget_ms)
+            if order is not None:
+                by_id = {result['id']: result for result in results}
+                results = [by_id[doc_id] for doc_id in order]
+        
+        return results[:limit]
+    
+    def _should_rerank(self, rerank: Optional[bool]) -> bool:
+        """Indique si le reclassement par cross-encoder doit être appliqué."""
+        if rerank is False:
+            return False
+        if rerank is None and not self.config.retrieval.rerank_enabled:
+            return False
+        
+        if self.reranker is None:
+            self.reranker = CrossEncoderReranker(self.config.retrieval.rerank_model)
+        return self.reranker.available
+    
+    def _store_templates(self, batch: List[Dict[str, Any]]):
+        """Enregistre un lot de templates (fichiers JSON et index des templates, ou stockage SQLite)."""
+        if self.store is not None:
+            self.store.put_many("template", batch)
+            return
+        
+        for template_data in batch:
+            template_file = self._write_template(template_data)
+            self.template_index.add(template_data, template_file, persist=False)
+        self.template_index.flush()
+    
+    def _write_template(self, template_data: Dict[str, Any], base_path: Optional[Path] = None) -> Path:
+        """
+        Écrit les fichiers d'un template (données JSON et code).
+        
+        Args:
+            template_data: Données du template
+            base_path: Racine de la base de connaissances (défaut: celle de la configuration)
+            
+        Returns:
+            Chemin du fichier JSON
+        """
+        template_dir = (base_path or self.base_path) / "templates" / template_data["language"]
+        template_dir.mkdir(parents=True, exist_ok=True)
+        
+        name = template_data["name"]
+        template_file = template_dir / f"{name}.json"
+        with open(template_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(template_data, indent=2, ensure_ascii=False))
+        
+        # Sauvegarde du code dans un fichier séparé
+        code_file = template_dir / f"{name}.{self._get_file_extension(template_data['language'])}"
+        with open(code_file, 'w', encoding='utf-8') as f:
+            f.write(template_data["code"])
+        
+        return template_file
+    
+    def _index_template_lexical(self, template_data: Dict[str, Any], persist: bool = True):
+        """Indexe le nom, la description et les tags d'un template dans l'index lexical."""
+        entry = self.template_index.lookup(template_data["id"]) if self.store is None else None
+        text = " ".join([template_data["name"], template_data.get("description", "")] + list(template_data.get("tags") or []))
+        self.template_lexical_index.add(
+            template_data["id"],
+            text,
+            meta={"language": template_data["language"], "mtime": entry["mtime"] if entry else None},
+            persist=persist
+        )
+    
+    def _sync_template_lexical_index(self):
+        """Aligne l'index lexical sur l'index des templates (templates ajoutés, modifiés ou supprimés hors de la base)."""
+        if self.store is not None:
+            # Le stockage SQLite n'est modifié que par la base : son index est toujours à jour
+            return
+        
+        entries = self.template_index.entries()
+        known = {entry["id"] for entry in entries}
+        
+        for entry in entries:
+            meta = self.template_lexical_index.meta(entry["id"])
+            if meta is not None and meta.get("mtime") == entry["mtime"]:
+                continue
+            template_data = self.template_index.load(entry["id"])
+            if template_data:
+                self._index_template_lexical(template_data, persist=False)
+        
+        for template_id in self.template_lexical_index.ids():
+            if template_id not in known:
+                self.template_lexical_index.remove(template_id, persist=False)
+        
+        self.template_lexical_index.flush()
+    
+    def _template_document(self, template_data: Dict[str, Any]) -> str:
+        """Construit le texte indexé dans ChromaDB pour un template."""
+        return f"{template_data['name']}: {template_data['description']}\n\n{template_data['code']}"
+    
+    def _template_metadata(self, template_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit les métadonnées ChromaDB d'un template."""
+        return {
+            "name": template_data["name"],
+            "language": template_data["language"],
+            "tags": ",".join(template_data.get("tags") or [])
+        }
+    
+    def _solution_path(self, solution_id: str, base_path: Optional[Path] = None) -> Path:
+        """
+        Retourne le fichier JSON d'une solution.
+        
+        Les solutions à ID ULID sont rangées dans un sous-répertoire nommé
+        d'après le début de leur ULID ; celles à l'ancien format d'ID restent
+        à la racine de solutions/ jusqu'à leur migration.
+        """
+        solutions_dir = (base_path or self.base_path) / "solutions"
+        parts = split_id(solution_id)
+        if parts is None:
+            return solutions_dir / f"{solution_id}.json"
+        return solutions_dir / parts[1][:SOLUTION_SHARD_LENGTH] / f"{solution_id}.json"
+    
+    def _new_solution_id(self, created_at: Optional[str] = None) -> str:
+        """Génère l'ID d'une solution, daté de sa création si elle est connue."""
+        if created_at:
+            try:
+                return make_id("solution", datetime.fromisoformat(created_at).timestamp())
+            except (TypeError, ValueError):
+                pass
+        return make_id("solution")
+    
+    def _store_solutions(self, batch: List[Dict[str, Any]]):
+        """Enregistre un lot de solutions (une transaction en stockage SQLite)."""
+        if self.store is not None:
+            self.store.put_many("solution", batch)
+            return
+        
+        for solution_data in batch:
+            self._write_solution_file(solution_data)
+    
+    def _write_solution(self, solution_data: Dict[str, Any]):
+        """Enregistre (ou remplace) une solution."""
+        self._store_solutions([solution_data])
+    
+    def _delete_solution_record(self, solution_id: str):
+        """Supprime une solution du stockage."""
+        if self.store is not None:
+            self.store.delete("solution", [solution_id])
+        else:
+            self._solution_path(solution_id).unlink(missing_ok=True)
+    
+    def _write_solution_file(self, solution_data: Dict[str, Any], base_path: Optional[Path] = None):
+        """Écrit le fichier JSON d'une solution."""
+        solution_file = self._solution_path(solution_data['id'], base_path)
+        solution_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Écriture atomique : une lecture concurrente ne voit jamais un fichier partiel
+        tmp_file = solution_file.with_name(f".{solution_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(solution_data, indent=2, ensure_ascii=False))
+        os.replace(tmp_file, solution_file)
+    
+    def _solution_document(self, solution_data: Dict[str, Any]) -> str:
+        """Construit le texte indexé dans ChromaDB pour une solution."""
+        return (f"Problème: {solution_data['problem']}\n\n"
+                f"Solution: {solution_data['solution']}\n\n"
+                f"Contexte: {solution_data['context']}")
+    
+    def _chunks(self, records: Iterable[Dict[str, Any]],
+                chunk_size: Optional[int]) -> Iterator[List[Dict[str, Any]]]:
+        """Découpe un flux d'enregistrements en lots, sans le charger en entier."""
+        size = chunk_size or self.config.knowledge_base.bulk_chunk_size
+        if self.vector_db_enabled:
+            # ChromaDB refuse les ajouts dépassant sa taille de lot maximale
+            size = min(size, self.chroma_client.get_max_batch_size())
+        
+        iterator = iter(records)
+        while True:
+            chunk = list(islice(iterator, max(1, size)))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _solution_metadata(self, solution_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Construit les métadonnées ChromaDB d'une solution, données complètes incluses."""
+        return {
+            "tags": ",".join(solution_data.get("tags") or []),
+            "payload": json.dumps(solution_data, ensure_ascii=False)
+        }
+    
+    def _solutions_from_metadatas(self, ids: List[str],
+                                  metadatas: List[Optional[Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+        """
+        Décode les solutions stockées dans les métadonnées ChromaDB.
+        
+        Les entrées indexées avant l'ajout des données complètes sont lues
+        depuis leurs fichiers, puis complétées dans ChromaDB pour les
+        recherches suivantes.
+        
+        Returns:
+            Dictionnaire {ID: données de la solution}
+        """
+        solutions = {}
+        backfill_ids, backfill_metadatas = [], []
+        
+        for solution_id, metadata in zip(ids, metadatas):
+            payload = (metadata or {}).get("payload")
+            if payload:
+                try:
+                    solutions[solution_id] = json.loads(payload)
+                    continue
+                except ValueError:
+                    pass
+            
+            solution_data = self.get_solution(solution_id)
+            if solution_data:
+                solutions[solution_id] = solution_data
+                backfill_ids.append(solution_id)
+                backfill_metadatas.append(self._solution_metadata(solution_data))
+        
+        if backfill_ids:
+            self.solutions_collection.update(ids=backfill_ids, metadatas=backfill_metadatas)
+        
+        return solutions
+    
     def save_project_history(self, project_name: str, description: str,
                             files: Dict[str, str], metadata: Dict[str, Any] = None) -> str:
         """
         Sauvegarde l'historique d'un projet.
         
+        Le contenu des fichiers est rangé dans le stockage adressé par contenu
+        (blobs/) : seuls les fichiers nouveaux ou modifiés depuis les
+        historiques précédents sont écrits, l'historique lui-même n'est qu'un
+        manifeste {chemin: empreinte}.
+        
         Args:
             project_name: Nom du projet
             description: Description du projet
@@ -326,35 +1152,362 @@ class KnowledgeBase:
         Returns:
             ID de l'historique sauvegardé
         """
-        history_id = f"project_{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        history_id = f"project_{project_name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        parent = self.get_project_history(self._latest_history_id(project_name))
         
-        # Sauvegarde dans le système de fichiers
-        history_dir = self.base_path / "projects_history" / project_name
-        history_dir.mkdir(parents=True, exist_ok=True)
+        manifest = self._store_history_files(files, self.blobs)
+        parent_files = parent["files"] if parent else {}
         
         history_data = {
             "id": history_id,
             "project_name": project_name,
             "description": description,
             "metadata": metadata or {},
-            "created_at": datetime.now().isoformat()
+            "created_at": datetime.now().isoformat(),
+            "parent": parent["id"] if parent else None,
+            "changed": sum(1 for path, entry in manifest.items()
+                           if parent_files.get(path, {}).get("blob") != entry["blob"]),
+            "files": manifest
         }
+        self._put_history(history_data)
         
-        history_file = history_dir / f"{history_id}.json"
-        with open(history_file, 'w', encoding='utf-8') as f:
+        return history_id
+    
+    def list_project_history(self, project_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les historiques de projets, du plus récent au plus ancien.
+        
+        Args:
+            project_name: Filtrer par projet (optionnel)
+            
+        Returns:
+            Résumés des historiques (ID, projet, description, date, parent,
+            nombre de fichiers, fichiers modifiés et taille totale)
+        """
+        if self.store is not None:
+            records = self.store.iter_records("history", project=project_name)
+        else:
+            records = (self._read_history_file(history_file)
+                       for history_file in self._history_files(self.base_path, project_name))
+        
+        summaries = []
+        for history_data in records:
+            if not history_data:
+                continue
+            files = history_data.get("files") or {}
+            summaries.append({
+                "id": history_data["id"],
+                "project_name": history_data["project_name"],
+                "description": history_data.get("description", ""),
+                "created_at": history_data.get("created_at", ""),
+                "parent": history_data.get("parent"),
+                "files": len(files),
+                "changed": history_data.get("changed", len(files)),
+                "size": sum(entry.get("size", 0) for entry in files.values() if isinstance(entry, dict))
+            })
+        
+        return sorted(summaries, key=lambda summary: (summary["created_at"], summary["id"]), reverse=True)
+    
+    def get_project_history(self, history_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Récupère le manifeste d'un historique de projet.
+        
+        Les historiques enregistrés avant le stockage adressé par contenu
+        (copie complète des fichiers) sont convertis à leur première lecture.
+        
+        Args:
+            history_id: ID de l'historique
+            
+        Returns:
+            Manifeste de l'historique (files : {chemin: {blob, size}}) ou None
+        """
+        if not history_id:
+            return None
+        
+        if self.store is not None:
+            history_data = self.store.get("history", history_id)
+            if history_data and self._needs_history_upgrade(history_data):
+                history_data["files"] = self._store_history_files(history_data["files"], self.blobs)
+                self.store.put("history", history_data)
+            return history_data
+        
+        for history_file in (self.base_path / "projects_history").glob(f"*/{history_id}.json"):
+            return self._read_history_file(history_file)
+        return None
+    
+    def read_project_history_file(self, history_id: str, path: str) -> Optional[str]:
+        """
+        Lit le contenu d'un fichier dans un historique de projet.
+        
+        Args:
+            history_id: ID de l'historique
+            path: Chemin du fichier dans le projet
+            
+        Returns:
+            Contenu du fichier ou None s'il est absent de l'historique
+        """
+        history_data = self.get_project_history(history_id)
+        entry = (history_data or {}).get("files", {}).get(path)
+        if entry is None:
+            return None
+        return self.blobs.get(entry["blob"]).decode('utf-8')
+    
+    def diff_project_history(self, old_id: str, new_id: str) -> Dict[str, Any]:
+        """
+        Compare deux historiques de projets à partir de leurs manifestes.
+        
+        Args:
+            old_id: ID de l'historique de référence
+            new_id: ID de l'historique comparé
+            
+        Returns:
+            Chemins ajoutés, supprimés et modifiés, et nombre de fichiers inchangés
+            
+        Raises:
+            ValueError: Si l'un des historiques est introuvable
+        """
+        old = self.get_project_history(old_id)
+        new = self.get_project_history(new_id)
+        for history_id, history_data in ((old_id, old), (new_id, new)):
+            if history_data is None:
+                raise ValueError(f"Historique introuvable : {history_id}")
+        
+        old_files, new_files = old["files"], new["files"]
+        common = old_files.keys() & new_files.keys()
+        modified = sorted(path for path in common if old_files[path]["blob"] != new_files[path]["blob"])
+        
+        return {
+            "added": sorted(new_files.keys() - old_files.keys()),
+            "removed": sorted(old_files.keys() - new_files.keys()),
+            "modified": modified,
+            "unchanged": len(common) - len(modified)
+        }
+    
+    def restore_project_history(self, history_id: str, dest: Path, overwrite: bool = False) -> List[str]:
+        """
+        Restaure les fichiers d'un historique de projet.
+        
+        Args:
+            history_id: ID de l'historique
+            dest: Répertoire de destination
+            overwrite: Remplacer les fichiers existants dont le contenu diffère
+            
+        Returns:
+            Chemins des fichiers restaurés
+            
+        Raises:
+            ValueError: Si l'historique est introuvable, ou si des fichiers existants
+                        diffèrent et que overwrite est faux
+        """
+        history_data = self.get_project_history(history_id)
+        if history_data is None:
+            raise ValueError(f"Historique introuvable : {history_id}")
+        
+        dest = Path(dest)
+        contents = {path: self.blobs.get(entry["blob"]) for path, entry in history_data["files"].items()}
+        
+        # Vérification avant toute écriture : une restauration refusée ne modifie rien
+        conflicts = [path for path, content in contents.items()
+                     if (dest / path).is_file() and (dest / path).read_bytes() != content]
+        if conflicts and not overwrite:
+            raise ValueError(f"{len(conflicts)} fichier(s) existant(s) modifié(s) dans {dest} : "
+                             f"{', '.join(conflicts[:5])} (utiliser overwrite pour les remplacer)")
+        
+        for path, content in contents.items():
+            file_path = dest / path
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_bytes(content)
+        
+        return sorted(contents)
+    
+    def _latest_history_id(self, project_name: str) -> Optional[str]:
+        """Retourne l'ID du dernier historique d'un projet."""
+        if self.store is not None:
+            return self.store.latest_id("history", project_name)
+        
+        # Les IDs se terminent par la date de sauvegarde : le plus grand est le plus récent
+        history_files = list(self._history_files(self.base_path, project_name))
+        return max(history_files, key=lambda history_file: history_file.stem).stem if history_files else None
+    
+    def _store_history_files(self, files: Dict[str, str], blobs: BlobStore) -> Dict[str, Dict[str, Any]]:
+        """Range le contenu des fichiers dans les blobs et retourne le manifeste {chemin: {blob, size}}."""
+        manifest = {}
+        for path, content in files.items():
+            data = content.encode('utf-8') if isinstance(content, str) else content
+            manifest[path] = {"blob": blobs.put(data), "size": len(data)}
+        return manifest
+    
+    def _needs_history_upgrade(self, history_data: Dict[str, Any]) -> bool:
+        """Indique si un historique contient encore le contenu des fichiers au lieu d'un manifeste."""
+        files = history_data.get("files")
+        return files is None or any(not isinstance(entry, dict) for entry in files.values())
+    
+    def _history_files(self, base_path: Path, project_name: Optional[str] = None) -> Iterator[Path]:
+        """Parcourt les manifestes JSON des historiques de projets."""
+        history_root = base_path / "projects_history"
+        if not history_root.is_dir():
+            return iter(())
+        return history_root.glob(f"{project_name or '*'}/*.json")
+    
+    def _read_history_file(self, history_file: Path, blobs: Optional[BlobStore] = None,
+                           upgrade: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Lit le manifeste JSON d'un historique de projet.
+        
+        Un historique à l'ancien format (fichiers copiés dans un répertoire
+        voisin) est converti : son contenu est rangé dans les blobs puis,
+        si upgrade est vrai, le manifeste est réécrit et la copie supprimée.
+        
+        Args:
+            history_file: Fichier JSON de l'historique
+            blobs: Stockage recevant le contenu des anciens historiques (défaut: celui de la base)
+            upgrade: Réécrire les anciens historiques convertis
+            
+        Returns:
+            Manifeste de l'historique ou None s'il est illisible
+        """
+        try:
+            with open(history_file, 'r', encoding='utf-8') as f:
+                history_data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self._needs_history_upgrade(history_data):
+            return history_data
+        
+        files_dir = history_file.with_suffix("")
+        files = {}
+        if files_dir.is_dir():
+            for file_path in files_dir.rglob("*"):
+                if file_path.is_file():
+                    files[file_path.relative_to(files_dir).as_posix()] = file_path.read_bytes()
+        history_data["files"] = self._store_history_files(files, blobs or self.blobs)
+        
+        if upgrade:
+            self._write_history(history_data, history_file.parents[2])
+            shutil.rmtree(files_dir, ignore_errors=True)
+        return history_data
+    
+    def _copy_history_blobs(self, history_data: Dict[str, Any], source: BlobStore, dest: BlobStore):
+        """Copie dans un autre stockage les blobs d'un historique qui y manquent."""
+        if source.root == dest.root:
+            return
+        for entry in history_data["files"].values():
+            if not dest.exists(entry["blob"]):
+                dest.path(entry["blob"]).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source.path(entry["blob"]), dest.path(entry["blob"]))
+    
+    def _put_history(self, history_data: Dict[str, Any]):
+        """Enregistre le manifeste d'un historique de projet."""
+        if self.store is not None:
+            self.store.put("history", history_data)
+        else:
+            self._write_history(history_data)
+    
+    def _write_history(self, history_data: Dict[str, Any], base_path: Optional[Path] = None):
+        """Écrit le manifeste JSON d'un historique de projet."""
+        history_dir = (base_path or self.base_path) / "projects_history" / history_data["project_name"]
+        history_dir.mkdir(parents=True, exist_ok=True)
+        
+        history_file = history_dir / f"{history_data['id']}.json"
+        tmp_file = history_file.with_name(f".{history_file.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
             json.dump(history_data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_file, history_file)
+    
+    def import_json_layout(self, source: Optional[Path] = None,
+                           on_progress: Optional[Callable[[str, int], None]] = None) -> Dict[str, int]:
+        """
+        Importe les fichiers JSON (templates, solutions, historiques) dans le stockage SQLite.
+        
+        Les enregistrements sont écrits par lots, une transaction par lot, et
+        indexés dans la recherche plein texte. Les IDs sont conservés : les
+        embeddings de ChromaDB restent valides. Un import répété remplace les
+        enregistrements déjà importés.
+        
+        Args:
+            source: Racine de la base au format fichiers (défaut: knowledge_base.path)
+            on_progress: Fonction appelée avec le type et le nombre d'enregistrements importés après chaque lot
+            
+        Returns:
+            Nombre d'enregistrements importés par type
+        """
+        if self.store is None:
+            raise ValueError("L'import nécessite knowledge_base.storage: sqlite")
         
-        # Sauvegarde des fichiers
-        files_dir = history_dir / history_id
-        files_dir.mkdir(parents=True, exist_ok=True)
+        source = Path(source) if source else self.base_path
+        counts = {"template": 0, "solution": 0, "history": 0}
         
-        for file_path, content in files.items():
-            file_full_path = files_dir / file_path
-            file_full_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(file_full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        templates = TemplateIndex(source / "templates")
+        template_records = (templates.load(entry["id"]) for entry in templates.entries())
+        for chunk in self._chunks((data for data in template_records if data), None):
+            self.store.put_many("template", chunk)
+            for template_data in chunk:
+                self._index_template_lexical(template_data, persist=False)
+            self.template_lexical_index.flush()
+            counts["template"] += len(chunk)
+            if on_progress:
+                on_progress("template", counts["template"])
         
-        return history_id
+        with self._solutions_lock:
+            for chunk in self._chunks(self._iter_solution_files(source), None):
+                self.store.put_many("solution", chunk)
+                for solution_data in chunk:
+                    self.solution_lexical_index.add(
+                        solution_data["id"], self._solution_document(solution_data), persist=False
+                    )
+                self.solution_lexical_index.flush()
+                counts["solution"] += len(chunk)
+                if on_progress:
+                    on_progress("solution", counts["solution"])
+        
+        # Les anciens historiques sont convertis sans modifier la source
+        source_blobs = BlobStore(source / "blobs")
+        history_records = (self._read_history_file(history_file, self.blobs, upgrade=False)
+                           for history_file in self._history_files(source))
+        for chunk in self._chunks((data for data in history_records if data), None):
+            for history_data in chunk:
+                self._copy_history_blobs(history_data, source_blobs, self.blobs)
+            self.store.put_many("history", chunk)
+            counts["history"] += len(chunk)
+            if on_progress:
+                on_progress("history", counts["history"])
+        
+        return counts
+    
+    def export_json_layout(self, dest: Optional[Path] = None) -> Dict[str, int]:
+        """
+        Exporte le stockage SQLite au format fichiers JSON (retour arrière ou sauvegarde lisible).
+        
+        Args:
+            dest: Racine de la base au format fichiers (défaut: knowledge_base.path)
+            
+        Returns:
+            Nombre d'enregistrements exportés par type
+        """
+        if self.store is None:
+            raise ValueError("L'export nécessite knowledge_base.storage: sqlite")
+        
+        dest = Path(dest) if dest else self.base_path
+        counts = {"template": 0, "solution": 0, "history": 0}
+        
+        templates = TemplateIndex(dest / "templates")
+        for template_data in self.store.iter_records("template"):
+            templates.add(template_data, self._write_template(template_data, dest), persist=False)
+            counts["template"] += 1
+        templates.flush()
+        
+        for solution_data in self.store.iter_records("solution"):
+            self._write_solution_file(solution_data, dest)
+            counts["solution"] += 1
+        
+        dest_blobs = BlobStore(dest / "blobs")
+        for record in self.store.iter_records("history"):
+            history_data = self.get_project_history(record["id"]) if self._needs_history_upgrade(record) else record
+            self._copy_history_blobs(history_data, self.blobs, dest_blobs)
+            self._write_history(history_data, dest)
+            counts["history"] += 1
+        
+        return counts
     
     def _get_file_extension(self, language: str) -> str:
         """Retourne l'extension de fichier pour un langage."""
@@ -0,0 +1,293 @@
+"""
+Module d'index lexical (index inversé avec classement BM25).
+
+Les textes sont découpés en termes sans accents ni majuscules ; les
+identifiants composés (err_connection_refused, numpy.linalg) sont indexés
+en entier et par parties. L'index est persisté dans un fichier JSON et mis
+à jour document par document.
+
+Chaque écriture réécrit tout le fichier (coût proportionnel au nombre de
+documents) : avec un délai d'écriture, les modifications rapprochées sont
+écrites ensemble, au plus tard à la sortie du processus.
+"""
+
+import atexit
+import heapq
+import json
+import math
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+
+INDEX_VERSION = 1
+
+# Identifiants composés : parties alphanumériques reliées par . _ - ou /
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[._\-/][a-z0-9]+)*")
+_PART_PATTERN = re.compile(r"[._\-/]")
+
+STOPWORDS = frozenset("""
+a au aux avec ce ces cette dans de des du elle en est et il ils je la le les leur
+mais me mon ne nous on ou par pas pour qu que qui sa se ses son sur ta te tes ton
+tu un une vos votre vous y d l j n s t c
+an and are as at be by for from how in is it of on or that the this to what with
+""".split())
+
+
+def fold(text: str) -> str:
+    """
+    Met un texte en minuscules et retire ses accents.
+    
+    Args:
+        text: Texte à normaliser
+        
+    Returns:
+        Texte normalisé
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Découpe un texte en termes indexables.
+    
+    Args:
+        text: Texte à découper
+        
+    Returns:
+        Termes, dans l'ordre du texte (les identifiants composés suivis de leurs parties)
+    """
+    terms = []
+    for token in _TOKEN_PATTERN.findall(fold(text)):
+        parts = _PART_PATTERN.split(token)
+        if len(parts) > 1:
+            terms.append(token)
+            terms.extend(part for part in parts if part not in STOPWORDS)
+        elif token not in STOPWORDS:
+            terms.append(token)
+    return terms
+
+
+class LexicalIndex:
+    """Index inversé persistant avec classement BM25."""
+    
+    def __init__(self, index_path: Path, k1: float = 1.5, b: float = 0.75,
+                 flush_delay: float = 0):
+        """
+        Initialise l'index.
+        
+        Args:
+            index_path: Fichier JSON de l'index
+            k1: Saturation de la fréquence des termes (BM25)
+            b: Normalisation par la longueur des documents (BM25)
+            flush_delay: Délai avant l'écriture demandée par add/remove, en secondes
+                         (0 = écriture immédiate)
+        """
+        self.index_path = Path(index_path)
+        self.k1 = k1
+        self.b = b
+        self.flush_delay = flush_delay
+        self._timer: Optional[threading.Timer] = None
+        
+        # Seuls les documents sont persistés ; les listes inversées sont reconstruites au chargement
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._total_length = 0
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+        
+        if self.flush_delay > 0:
+            # Les modifications encore en attente sont écrites à la sortie du processus
+            atexit.register(self.flush)
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            return len(self._docs)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return doc_id in self._docs
+    
+    def add(self, doc_id: str, text: str, meta: Optional[Dict[str, Any]] = None,
+            persist: bool = True):
+        """
+        Indexe un document (ou remplace sa version précédente).
+        
+        Args:
+            doc_id: ID du document
+            text: Texte à indexer
+            meta: Métadonnées retournées avec le document et utilisables comme filtre
+            persist: Écrire l'index sur disque (après flush_delay), sinon attendre flush()
+        """
+        with self._lock:
+            self._ensure_loaded()
+            self._remove(doc_id)
+            
+            terms = Counter(tokenize(text))
+            self._docs[doc_id] = {
+                "terms": dict(terms),
+                "length": sum(terms.values()),
+                "meta": meta or {}
+            }
+            self._link(doc_id)
+            
+            self._dirty = True
+            if persist:
+                self._schedule_persist()
+    
+    def remove(self, doc_id: str, persist: bool = True):
+        """
+        Retire un document de l'index.
+        
+        Args:
+            doc_id: ID du document
+            persist: Écrire l'index sur disque (après flush_delay), sinon attendre flush()
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if self._remove(doc_id):
+                self._dirty = True
+                if persist:
+                    self._schedule_persist()
+    
+    def meta(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne les métadonnées d'un document indexé."""
+        with self._lock:
+            self._ensure_loaded()
+            doc = self._docs.get(doc_id)
+            return dict(doc["meta"]) if doc else None
+    
+    def ids(self) -> List[str]:
+        """Retourne les IDs des documents indexés."""
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._docs)
+    
+    def search(self, query: str, limit: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Recherche les documents les plus pertinents pour une requête.
+        
+        Args:
+            query: Requête en texte libre
+            limit: Nombre maximum de résultats
+            where: Filtre d'égalité sur les métadonnées (ex: {"language": "python"})
+            
+        Returns:
+            Couples (ID, score BM25), du plus pertinent au moins pertinent
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if not self._docs:
+                return []
+            
+            doc_count = len(self._docs)
+            average_length = self._total_length / doc_count or 1.0
+            scores: Dict[str, float] = {}
+            
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    doc = self._docs[doc_id]
+                    if where and any(doc["meta"].get(key) != value for key, value in where.items()):
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * doc["length"] / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+            
+            return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+    
+    def flush(self):
+        """Écrit l'index sur disque s'il a été modifié."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._persist()
+    
+    def clear(self):
+        """Vide l'index."""
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            self._total_length = 0
+            self._loaded = True
+            self._dirty = True
+            self._persist()
+    
+    def _ensure_loaded(self):
+        """Charge l'index persisté au premier accès."""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        if not self.index_path.exists():
+            return
+        
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        
+        if data.get("version") != INDEX_VERSION:
+            return
+        
+        self._docs = data.get("docs", {})
+        for doc_id in self._docs:
+            self._link(doc_id)
+    
+    def _link(self, doc_id: str):
+        """Ajoute un document aux listes inversées."""
+        doc = self._docs[doc_id]
+        for term, frequency in doc["terms"].items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self._total_length += doc["length"]
+    
+    def _remove(self, doc_id: str) -> bool:
+        """Retire un document des listes inversées ; indique s'il était indexé."""
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return False
+        
+        for term in doc["terms"]:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_length -= doc["length"]
+        return True
+    
+    def _schedule_persist(self):
+        """Écrit l'index, ou programme son écriture si un délai est configuré."""
+        if self.flush_delay <= 0:
+            self._persist()
+            return
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def _persist(self):
+        """Écrit l'index de façon atomique."""
+        if not self._dirty:
+            return
+        
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_suffix(self.index_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": INDEX_VERSION, "docs": self._docs}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
@@ -3,55 +3,200 @@ Module de gestion des interactions avec les modèles LLM.
 """
 
 import os
-from typing import List, Dict, Any, Optional
-from openai import OpenAI
+import threading
+from typing import List, Dict, Any, Optional, Iterator, Tuple
 
+from .cache import PersistentLRUCache, make_cache_key
+from .prompt_budget import PromptBudget
+from . import prompts
 
-class LLMClient:
-    """Client pour interagir avec les modèles LLM."""
+
+class BaseLLMClient:
+    """Paramètres et cache des réponses communs aux clients LLM."""
     
-    def __init__(self, config):
+    def __init__(self, config, cache: Optional[PersistentLRUCache] = None):
         """
-        Initialise le client LLM.
+        Initialise les paramètres communs.
         
         Args:
             config: Instance de Config contenant la configuration LLM
+            cache: Cache des réponses à partager (optionnel, créé si absent)
         """
         self.config = config
         self.provider = config.llm.provider
         self.model = config.llm.model
         self.temperature = config.llm.temperature
         self.max_tokens = config.llm.max_tokens
+        self.max_concurrent_requests = config.llm.max_concurrent_requests
+        
+        # Budget de tokens : assemblage des prompts et max_tokens de chaque requête
+        self.budget = PromptBudget(config)
+        
+        # Cache des réponses, indexé sur (modèle, messages, température, max_tokens)
+        self.cache = cache
+        if self.cache is None and config.llm_cache.enabled:
+            self.cache = PersistentLRUCache(
+                db_path=config.get_llm_cache_path(),
+                max_memory_entries=config.llm_cache.memory_entries,
+                max_disk_entries=config.llm_cache.disk_entries,
+                ttl_seconds=config.llm_cache.ttl_seconds
+            )
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Retourne les compteurs du cache des réponses.
+        
+        Returns:
+            Dictionnaire des compteurs, vide si le cache est désactivé
+        """
+        if self.cache is None:
+            return {}
+        return self.cache.stats()
+    
+    def _resolve_params(self, messages: List[Dict[str, str]], temperature: Optional[float],
+                        max_tokens: Optional[int]) -> Tuple[float, int]:
+        """Applique les valeurs par défaut de la configuration et borne max_tokens à la place laissée par le prompt."""
+        temp = temperature if temperature is not None else self.temperature
+        tokens = self.budget.output_tokens(messages, max_tokens)
+        return temp, tokens
+    
+    def _cache_lookup(self, messages: List[Dict[str, str]], temperature: float,
+                      max_tokens: int, use_cache: Optional[bool]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Cherche une réponse en cache.
+        
+        Returns:
+            Tuple (clé à utiliser pour stocker la réponse ou None, réponse en cache ou None)
+        """
+        if self._should_use_cache(temperature, use_cache):
+            cache_key = make_cache_key(self.model, messages, temperature, max_tokens)
+            return cache_key, self.cache.get(cache_key)
+        
+        if self.cache is not None:
+            self.cache.record_bypass()
+        return None, None
+    
+    def _should_use_cache(self, temperature: float, use_cache: Optional[bool]) -> bool:
+        """Détermine si un appel peut être servi depuis le cache."""
+        if self.cache is None or use_cache is False:
+            return False
+        if use_cache is True:
+            return True
+        return not (temperature > 0 and self.config.llm_cache.bypass_nonzero_temperature)
+
+
+class LLMClient(BaseLLMClient):
+    """Client pour interagir avec les modèles LLM."""
+    
+    def __init__(self, config, cache: Optional[PersistentLRUCache] = None):
+        """
+        Initialise le client LLM.
+        
+        Args:
+            config: Instance de Config contenant la configuration LLM
+            cache: Cache des réponses à partager (optionnel)
+        """
+        super().__init__(config, cache)
+        
+        # Initialisation du client OpenAI (import différé : le module est lent à charger)
+        from openai import OpenAI
         
-        # Initialisation du client OpenAI
         # Les variables d'environnement OPENAI_API_KEY et base_url sont déjà configurées
         self.client = OpenAI()
+        
+        # Limite des requêtes simultanées, partagée par tous les threads
+        self._in_flight = threading.BoundedSemaphore(self.max_concurrent_requests)
     
     def chat(self, messages: List[Dict[str, str]], 
              temperature: Optional[float] = None,
-             max_tokens: Optional[int] = None) -> str:
+             max_tokens: Optional[int] = None,
+             use_cache: Optional[bool] = None) -> str:
         """
         Envoie une requête de chat au modèle LLM.
         
         Args:
             messages: Liste de messages au format OpenAI
             temperature: Température pour la génération (optionnel)
-            max_tokens: Nombre maximum de tokens (optionnel)
+            max_tokens: Longueur de réponse voulue (optionnel, bornée par la place laissée par le prompt)
+            use_cache: Forcer (True) ou désactiver (False) le cache pour cet appel
             
         Returns:
             Réponse du modèle
         """
-        temp = temperature if temperature is not None else self.temperature
-        tokens = max_tokens if max_tokens is not None else self.max_tokens
+        temp, tokens = self._resolve_params(messages, temperature, max_tokens)
+        
+        cache_key, cached = self._cache_lookup(messages, temp, tokens, use_cache)
+        if cached is not None:
+            return cached
+        
+        with self._in_flight:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens
+            )
+        
+        content = response.choices[0].message.content
+        
+        if cache_key is not None and content is not None:
+            self.cache.set(cache_key, content)
+        
+        return content
+    
+    def chat_stream(self, messages: List[Dict[str, str]],
+                    temperature: Optional[float] = None,
+                    max_tokens: Optional[int] = None,
+                    use_cache: Optional[bool] = None) -> Iterator[str]:
+        """
+        Envoie une requête de chat et produit la réponse au fil de sa génération.
+        
+        Args:
+            messages: Liste de messages au format OpenAI
+            temperature: Température pour la génération (optionnel)
+            max_tokens: Longueur de réponse voulue (optionnel, bornée par la place laissée par le prompt)
+            use_cache: Forcer (True) ou désactiver (False) le cache pour cet appel
+            
+        Yields:
+            Fragments de texte dans l'ordre de réception
+            
+        Le flux occupe une place de la limite de requêtes simultanées jusqu'à ce qu'il
+        soit lu en entier ou fermé : un appelant qui s'arrête avant la fin doit appeler
+        close() sur le générateur.
+        """
+        temp, tokens = self._resolve_params(messages, temperature, max_tokens)
+        
+        cache_key, cached = self._cache_lookup(messages, temp, tokens, use_cache)
+        if cached is not None:
+            yield cached
+            return
         
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=temp,
-            max_tokens=tokens
-        )
+        parts = []
+        with self._in_flight:
+            stream = self.client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=temp,
+                max_tokens=tokens,
+                stream=True
+            )
+            
+            try:
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if cache_key is not None:
+                            parts.append(delta)
+                        yield delta
+            finally:
+                # Un flux abandonné rend sa connexion avant de libérer sa place
+                stream.close()
         
-        return response.choices[0].message.content
+        # Seule une réponse reçue en entier est mise en cache
+        if cache_key is not None:
+            self.cache.set(cache_key, "".join(parts))
     
     def generate_code(self, prompt: str, language: str = "python") -> str:
         """
@@ -64,17 +209,20 @@ class LLMClient:
         Returns:
             Code généré
         """
-        system_message = f"""Tu es un expert en développement {language}.
-Génère du code propre, bien structuré et commenté.
-Suis les meilleures pratiques et conventions du langage.
-Retourne uniquement le code, sans explications supplémentaires."""
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": prompt}
-        ]
+        return self.chat(prompts.generate_code_messages(prompt, language))
+    
+    def generate_code_stream(self, prompt: str, language: str = "python") -> Iterator[str]:
+        """
+        Génère du code à partir d'un prompt, au fil de la génération.
         
-        return self.chat(messages)
+        Args:
+            prompt: Description de ce que le code doit faire
+            language: Langage de programmation cible
+            
+        Yields:
+            Fragments du code généré
+        """
+        return self.chat_stream(prompts.generate_code_messages(prompt, language))
     
     def analyze_code(self, code: str, language: str = "python") -> Dict[str, Any]:
         """
@@ -87,39 +235,8 @@ Retourne uniquement le code, sans explications supplémentaires."""
         Returns:
             Dictionnaire contenant l'analyse
         """
-        system_message = f"""Tu es un expert en analyse de code {language}.
-Analyse le code fourni et identifie :
-1. Les erreurs potentielles
-2. Les problèmes de performance
-3. Les violations des meilleures pratiques
-4. Les suggestions d'amélioration
-
-Retourne ta réponse au format JSON avec les clés suivantes :
-- errors: liste des erreurs
-- warnings: liste des avertissements
-- suggestions: liste des suggestions d'amélioration
-- severity: niveau de gravité global (low, medium, high)"""
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Code à analyser :\n\n```{language}\n{code}\n```"}
-        ]
-        
-        response = self.chat(messages)
-        
-        # Tenter de parser la réponse JSON
-        import json
-        try:
-            # Extraire le JSON de la réponse si elle contient du texte supplémentaire
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end > start:
-                json_str = response[start:end]
-                return json.loads(json_str)
-            else:
-                return {"raw_response": response}
-        except json.JSONDecodeError:
-            return {"raw_response": response}
+        response = self.chat(prompts.analyze_code_messages(code, language))
+        return prompts.parse_analysis_response(response)
     
     def fix_code(self, code: str, error_message: str, language: str = "python") -> str:
         """
@@ -133,28 +250,23 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         Returns:
             Code corrigé
         """
-        system_message = f"""Tu es un expert en débogage {language}.
-Analyse le code et l'erreur fournis, puis génère une version corrigée du code.
-Retourne uniquement le code corrigé, sans explications supplémentaires."""
-        
-        user_message = f"""Code avec erreur :
-```{language}
-{code}
-```
-
-Erreur rencontrée :
-```
-{error_message}
-```
-
-Corrige ce code."""
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ]
+        return self.chat(prompts.fix_code_messages(code, error_message, language),
+                         max_tokens=self.budget.rewrite_tokens(code))
+    
+    def fix_code_stream(self, code: str, error_message: str, language: str = "python") -> Iterator[str]:
+        """
+        Répare du code en fonction d'un message d'erreur, au fil de la génération.
         
-        return self.chat(messages)
+        Args:
+            code: Code à réparer
+            error_message: Message d'erreur
+            language: Langage de programmation
+            
+        Yields:
+            Fragments du code corrigé
+        """
+        return self.chat_stream(prompts.fix_code_messages(code, error_message, language),
+                                max_tokens=self.budget.rewrite_tokens(code))
     
     def explain_code(self, code: str, language: str = "python") -> str:
         """
@@ -167,16 +279,7 @@ Corrige ce code."""
         Returns:
             Explication du code
         """
-        system_message = f"""Tu es un expert en {language}.
-Explique clairement ce que fait le code fourni, en français.
-Structure ton explication de manière pédagogique."""
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Explique ce code :\n\n```{language}\n{code}\n```"}
-        ]
-        
-        return self.chat(messages)
+        return self.chat(prompts.explain_code_messages(code, language))
     
     def generate_documentation(self, code: str, language: str = "python") -> str:
         """
@@ -189,25 +292,11 @@ Structure ton explication de manière pédagogique."""
         Returns:
             Documentation générée
         """
-        system_message = f"""Tu es un expert en documentation technique {language}.
-Génère une documentation complète pour le code fourni, incluant :
-- Description générale
-- Paramètres et types
-- Valeurs de retour
-- Exemples d'utilisation
-- Notes importantes
-
-Utilise le format de documentation standard pour {language}."""
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Documente ce code :\n\n```{language}\n{code}\n```"}
-        ]
-        
-        return self.chat(messages)
+        return self.chat(prompts.documentation_messages(code, language))
     
     def refactor_code(self, code: str, language: str = "python", 
-                     objective: str = "améliorer la lisibilité et la maintenabilité") -> str:
+                     objective: str = "améliorer la lisibilité et la maintenabilité",
+                     usages: Optional[str] = None) -> str:
         """
         Refactorise du code selon un objectif.
         
@@ -215,21 +304,13 @@ Utilise le format de documentation standard pour {language}."""
             code: Code à refactoriser
             language: Langage de programmation
             objective: Objectif du refactoring
+            usages: Utilisations du code dans le reste du projet (optionnel)
             
         Returns:
             Code refactorisé
         """
-        system_message = f"""Tu es un expert en refactoring {language}.
-Refactorise le code fourni pour {objective}.
-Conserve la fonctionnalité exacte du code original.
-Retourne uniquement le code refactorisé."""
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Code à refactoriser :\n\n```{language}\n{code}\n```"}
-        ]
-        
-        return self.chat(messages)
+        return self.chat(prompts.refactor_code_messages(code, language, objective, usages),
+                         max_tokens=self.budget.rewrite_tokens(code))
     
     def answer_question(self, question: str, context: Optional[str] = None) -> str:
         """
@@ -242,17 +323,17 @@ Retourne uniquement le code refactorisé."""
         Returns:
             Réponse à la question
         """
-        system_message = """Tu es un assistant expert en développement informatique.
-Réponds de manière claire, précise et structurée en français.
-Si tu n'es pas sûr d'une information, indique-le clairement."""
-        
-        user_message = question
-        if context:
-            user_message = f"Contexte :\n{context}\n\nQuestion :\n{question}"
-        
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_message}
-        ]
+        return self.chat(prompts.answer_question_messages(question, context))
+    
+    def answer_question_stream(self, question: str, context: Optional[str] = None) -> Iterator[str]:
+        """
+        Répond à une question au fil de la génération.
         
-        return self.chat(messages)
+        Args:
+            question: Question à répondre
+            context: Contexte additionnel (optionnel)
+            
+        Yields:
+            Fragments de la réponse
+        """
+        return self.chat_stream(prompts.answer_question_messages(question, context))
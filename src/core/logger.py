@@ -7,8 +7,6 @@ import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-from rich.console import Console
-from rich.logging import RichHandler
 
 
 class Logger:
@@ -30,8 +28,8 @@ class Logger:
         self.level = getattr(logging, level.upper(), logging.INFO)
         self.console_output = console_output
         
-        # Console Rich pour un affichage amélioré
-        self.console = Console()
+        # Console Rich pour un affichage amélioré, créée au premier accès
+        self._console = None
         
         # Configuration du logger
         self.logger = logging.getLogger(name)
@@ -40,6 +38,8 @@ class Logger:
         
         # Handler pour la console avec Rich
         if console_output:
+            from rich.logging import RichHandler
+            
             console_handler = RichHandler(
                 console=self.console,
                 show_time=True,
@@ -68,6 +68,15 @@ class Logger:
             file_handler.setFormatter(file_formatter)
             self.logger.addHandler(file_handler)
     
+    @property
+    def console(self):
+        """Console Rich utilisée pour l'affichage."""
+        if self._console is None:
+            from rich.console import Console
+            
+            self._console = Console()
+        return self._console
+    
     def debug(self, message: str):
         """Log un message de debug."""
         self.logger.debug(message)
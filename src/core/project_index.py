@@ -0,0 +1,357 @@
+"""
+Module de l'index persistant des fichiers d'un projet.
+
+L'index conserve, pour chaque fichier d'un projet analysé, son chemin, sa
+taille, sa date de modification, son langage et (à la demande) son
+empreinte. Il est stocké dans un fichier SQLite par projet et revalidé à
+partir des dates de modification des répertoires : un répertoire inchangé
+n'est pas relu, seuls ses sous-répertoires connus sont vérifiés. En mode
+surveillance (watchdog), les répertoires modifiés sont notifiés et la
+revalidation ne touche plus qu'eux.
+
+La date d'un répertoire ne change qu'à l'ajout, la suppression ou le
+renommage d'une entrée : la taille et la date d'un fichier modifié sur
+place sont mises à jour par refresh(full=True), par le mode surveillance,
+ou à la lecture de son empreinte (file_hash). De même, une règle
+.gitignore modifiée ne s'applique qu'aux répertoires relus ensuite.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+from ..utils.walker import IgnoreRules, detect_language, scan_dir
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    hash TEXT,
+    language TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+CREATE TABLE IF NOT EXISTS dirs (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+"""
+
+
+class ProjectIndex:
+    """Index persistant et incrémental des fichiers d'un projet."""
+    
+    def __init__(self, project_root: Path, index_dir: Path, rules: Optional[IgnoreRules] = None):
+        """
+        Initialise l'index.
+        
+        Args:
+            project_root: Racine du projet
+            index_dir: Répertoire des fichiers d'index (un fichier SQLite par projet)
+            rules: Règles d'exclusion (défaut : répertoires et extensions usuels + .gitignore)
+        """
+        self.root = Path(project_root).resolve()
+        self.rules = rules or IgnoreRules(self.root)
+        
+        # Un fichier par projet, nommé d'après le projet et l'empreinte de son chemin
+        digest = hashlib.sha1(str(self.root).encode('utf-8')).hexdigest()[:12]
+        self.index_path = Path(index_dir) / f"{self.root.name}_{digest}.db"
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        
+        # Mode surveillance : répertoires signalés par watchdog depuis la dernière revalidation
+        self._observer = None
+        self._dirty: Set[str] = set()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+    
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """
+        Met l'index à jour.
+        
+        Args:
+            full: Relire tous les répertoires (détecte aussi les fichiers modifiés sur place)
+            
+        Returns:
+            Nombre de répertoires vérifiés et relus, de fichiers mis à jour et supprimés
+        """
+        stats = {"dirs_checked": 0, "dirs_scanned": 0, "files_updated": 0, "files_removed": 0}
+        
+        with self._lock, self._conn:
+            self.rules.reload()
+            if self.watching and not full:
+                dirty, self._dirty = self._dirty, set()
+                for rel_dir in sorted(dirty):
+                    self._refresh_dirty(rel_dir, stats)
+            else:
+                self._walk([""], stats, force=full)
+        
+        return stats
+    
+    def paths(self, limit: Optional[int] = None, languages: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Liste les fichiers indexés, par ordre de chemin.
+        
+        Args:
+            limit: Nombre maximum de fichiers (None = tous)
+            languages: Filtrer par langage (optionnel)
+            
+        Returns:
+            Chemins relatifs à la racine du projet
+        """
+        return [entry["path"] for entry in self.entries(limit, languages)]
+    
+    def entries(self, limit: Optional[int] = None,
+                languages: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les entrées de l'index, par ordre de chemin.
+        
+        Args:
+            limit: Nombre maximum d'entrées (None = toutes)
+            languages: Filtrer par langage (optionnel)
+            
+        Returns:
+            Entrées (path, size, mtime_ns, hash, language) ; hash vaut None tant
+            que l'empreinte n'a pas été demandée
+        """
+        sql = "SELECT path, size, mtime_ns, hash, language FROM files"
+        params: List[Any] = []
+        if languages is not None:
+            languages = list(languages)
+            sql += f" WHERE language IN ({','.join('?' * len(languages))})"
+            params.extend(languages)
+        sql += " ORDER BY path"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {"path": path, "size": size, "mtime_ns": mtime_ns, "hash": digest, "language": language}
+            for path, size, mtime_ns, digest, language in rows
+        ]
+    
+    def file_hash(self, rel_path: str) -> Optional[str]:
+        """
+        Retourne l'empreinte SHA-256 d'un fichier, recalculée s'il a changé.
+        
+        Args:
+            rel_path: Chemin relatif à la racine du projet
+            
+        Returns:
+            Empreinte hexadécimale, ou None si le fichier n'existe pas
+        """
+        try:
+            stat = (self.root / rel_path).stat()
+        except OSError:
+            return None
+        
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, hash FROM files WHERE path = ?", (rel_path,)
+            ).fetchone()
+        if row and row[2] and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns):
+            return row[2]
+        
+        digest = hashlib.sha256()
+        with open(self.root / rel_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, hash, language) VALUES (?, ?, ?, ?, ?, ?)",
+                (rel_path, self._parent(rel_path), stat.st_size, stat.st_mtime_ns, digest.hexdigest(),
+                 detect_language(rel_path))
+            )
+        return digest.hexdigest()
+    
+    @property
+    def watching(self) -> bool:
+        """Indique si le mode surveillance est actif."""
+        return self._observer is not None and self._observer.is_alive()
+    
+    def watch(self) -> bool:
+        """
+        Active le mode surveillance (watchdog) : les modifications du projet sont
+        notifiées et refresh() ne relit plus que les répertoires concernés.
+        
+        Returns:
+            True si la surveillance est active, False si watchdog n'est pas installé
+        """
+        try:
+            from watchdog.observers import Observer
+        except ImportError:
+            return False
+        
+        with self._lock:
+            if self.watching:
+                return True
+            
+            # Les événements reçus avant la fin de cette revalidation seront retraités
+            observer = Observer()
+            observer.schedule(_ChangeCollector(self), str(self.root), recursive=True)
+            observer.daemon = True
+            observer.start()
+            self.refresh(full=True)
+            self._observer = observer
+        return True
+    
+    def close(self):
+        """Arrête la surveillance et ferme l'index."""
+        with self._lock:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer = None
+            self._conn.close()
+    
+    def _mark_dirty(self, abs_path: str, is_directory: bool):
+        """Enregistre un répertoire à relire (appelé par watchdog)."""
+        try:
+            rel_path = Path(abs_path).relative_to(self.root).as_posix()
+        except ValueError:
+            return
+        rel_path = "" if rel_path == "." else rel_path
+        if rel_path and self.rules.is_ignored_path(rel_path, is_directory):
+            return
+        
+        with self._lock:
+            self._dirty.add(self._parent(rel_path) if rel_path else "")
+            if is_directory:
+                self._dirty.add(rel_path)
+    
+    def _refresh_dirty(self, rel_dir: str, stats: Dict[str, int]):
+        """Relit un répertoire signalé par watchdog (et ses nouveaux sous-répertoires)."""
+        if not (self.root / rel_dir).is_dir():
+            self._remove_tree(rel_dir, stats)
+            return
+        
+        known = {row[0] for row in self._conn.execute("SELECT path FROM dirs WHERE parent = ?", (rel_dir,))}
+        subdirs = self._scan_dir(rel_dir, stats)
+        if subdirs is not None:
+            self._walk([subdir for subdir in subdirs if subdir not in known], stats)
+    
+    def _walk(self, starts: List[str], stats: Dict[str, int], force: bool = False):
+        """Revalide les arborescences données à partir des dates des répertoires."""
+        known = {path: mtime_ns for path, mtime_ns in self._conn.execute("SELECT path, mtime_ns FROM dirs")}
+        children: Dict[str, List[str]] = {}
+        for path, parent in self._conn.execute("SELECT path, parent FROM dirs"):
+            children.setdefault(parent, []).append(path)
+        
+        stack = list(starts)
+        while stack:
+            rel_dir = stack.pop()
+            try:
+                mtime_ns = os.stat(self.root / rel_dir).st_mtime_ns
+            except OSError:
+                self._remove_tree(rel_dir, stats)
+                continue
+            stats["dirs_checked"] += 1
+            
+            if not force and known.get(rel_dir) == mtime_ns:
+                # Répertoire inchangé : ses sous-répertoires connus sont toujours exacts
+                stack.extend(children.get(rel_dir, ()))
+                continue
+            
+            subdirs = self._scan_dir(rel_dir, stats, mtime_ns)
+            if subdirs is not None:
+                stack.extend(subdirs)
+    
+    def _scan_dir(self, rel_dir: str, stats: Dict[str, int],
+                  mtime_ns: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Relit un répertoire : met à jour ses fichiers et retire ses sous-répertoires disparus.
+        
+        Returns:
+            Sous-répertoires à parcourir, ou None si le répertoire est illisible
+        """
+        try:
+            # Date lue avant le contenu : une modification pendant la lecture sera revue
+            if mtime_ns is None:
+                mtime_ns = os.stat(self.root / rel_dir).st_mtime_ns
+            subdirs, files = scan_dir(self.root, rel_dir, self.rules, with_stat=True)
+        except OSError:
+            self._remove_tree(rel_dir, stats)
+            return None
+        stats["dirs_scanned"] += 1
+        
+        current = {walked.rel_path: walked for walked in files}
+        stored = {path: (size, mtime) for path, size, mtime in self._conn.execute(
+            "SELECT path, size, mtime_ns FROM files WHERE dir = ?", (rel_dir,)
+        )}
+        changed = [
+            (path, rel_dir, walked.size, walked.mtime_ns, walked.language)
+            for path, walked in current.items()
+            if stored.get(path) != (walked.size, walked.mtime_ns)
+        ]
+        removed = [(path,) for path in stored.keys() - current.keys()]
+        
+        # L'empreinte d'un fichier modifié est effacée : elle sera recalculée à la demande
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO files (path, dir, size, mtime_ns, hash, language) VALUES (?, ?, ?, ?, NULL, ?)",
+            changed
+        )
+        self._conn.executemany("DELETE FROM files WHERE path = ?", removed)
+        stats["files_updated"] += len(changed)
+        stats["files_removed"] += len(removed)
+        
+        for (known_subdir,) in self._conn.execute(
+            "SELECT path FROM dirs WHERE parent = ?", (rel_dir,)
+        ).fetchall():
+            if known_subdir not in subdirs:
+                self._remove_tree(known_subdir, stats)
+        
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, mtime_ns) VALUES (?, ?, ?)",
+            (rel_dir, self._parent(rel_dir) if rel_dir else None, mtime_ns)
+        )
+        return subdirs
+    
+    def _remove_tree(self, rel_dir: str, stats: Dict[str, int]):
+        """Retire de l'index un répertoire et tout son contenu."""
+        if rel_dir:
+            pattern = rel_dir.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "/%"
+            where, params = "path = ? OR path LIKE ? ESCAPE '\\'", (rel_dir, pattern)
+            file_where, file_params = "dir = ? OR dir LIKE ? ESCAPE '\\'", (rel_dir, pattern)
+        else:
+            where, params = "1", ()
+            file_where, file_params = "1", ()
+        
+        stats["files_removed"] += self._conn.execute(f"DELETE FROM files WHERE {file_where}", file_params).rowcount
+        self._conn.execute(f"DELETE FROM dirs WHERE {where}", params)
+    
+    @staticmethod
+    def _parent(rel_path: str) -> str:
+        """Retourne le répertoire parent d'un chemin relatif ("" pour la racine)."""
+        return rel_path.rpartition("/")[0]
+
+
+class _ChangeCollector:
+    """Gestionnaire d'événements watchdog : signale à l'index les répertoires modifiés."""
+    
+    def __init__(self, index: ProjectIndex):
+        self.index = index
+    
+    def dispatch(self, event):
+        """Reçoit un événement watchdog (création, modification, suppression, déplacement)."""
+        if event.event_type in ("opened", "closed_no_write"):
+            return
+        self.index._mark_dirty(event.src_path, event.is_directory)
+        dest_path = getattr(event, "dest_path", "")
+        if dest_path:
+            self.index._mark_dirty(dest_path, event.is_directory)
@@ -0,0 +1,305 @@
+"""
+Module de budget de tokens des prompts.
+
+Les tokens sont comptés localement : avec tiktoken s'il est installé (et
+son encodage disponible), sinon par une estimation qui découpe le texte
+comme le ferait un tokenizer BPE. Le budget répartit les tokens d'un
+prompt entre ses parties (contexte fourni, base de connaissances, extraits
+de code), coupe les textes trop longs aux limites syntaxiques (blocs,
+lignes, phrases) et dimensionne max_tokens pour chaque requête.
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Sequence
+
+
+# Surcoût de chaque message d'une conversation (rôle, séparateurs) et de la réponse
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_OVERHEAD_TOKENS = 3
+
+# Marque d'un texte coupé
+TRUNCATION_MARKER = "\n[...]"
+
+# En dessous de cette part, un texte est omis plutôt que réduit à un fragment
+MIN_SHARE_TOKENS = 32
+
+# Estimation : mots (un token par tranche de 6 lettres), nombres par 3 chiffres,
+# sauts de ligne, indentations et signes de ponctuation
+_ESTIMATE_PATTERN = re.compile(r"[^\W\d_]+|\d{1,3}|\n+| {4,}|\t+|[^\w\s]|_")
+
+_SENTENCE_END = re.compile(r"[.!?;:](?=\s)|,(?=\s)|\s")
+
+_tokenizers: Dict[Optional[str], "Tokenizer"] = {}
+_tokenizers_lock = threading.Lock()
+
+
+class Tokenizer:
+    """Comptage des tokens d'un modèle et découpe de textes à un nombre de tokens."""
+    
+    def __init__(self, model: Optional[str] = None):
+        """
+        Initialise le tokenizer.
+        
+        Args:
+            model: Modèle dont l'encodage est utilisé (optionnel, o200k_base par défaut)
+        """
+        self.model = model
+        self._encoding = None
+        
+        try:
+            import tiktoken
+        except ImportError:
+            return
+        
+        # L'encodage est téléchargé à la première utilisation : sans réseau ni cache, estimation
+        try:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model) if model else None
+            except KeyError:
+                self._encoding = None
+            if self._encoding is None:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            self._encoding = None
+    
+    @property
+    def exact(self) -> bool:
+        """Indique si les comptes viennent du tokenizer du modèle (et non d'une estimation)."""
+        return self._encoding is not None
+    
+    def count(self, text: str) -> int:
+        """
+        Compte les tokens d'un texte.
+        
+        Args:
+            text: Texte à mesurer
+            
+        Returns:
+            Nombre de tokens
+        """
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        
+        count = 0
+        for piece in _ESTIMATE_PATTERN.findall(text):
+            count += 1 + (len(piece) - 1) // 6 if piece[0].isalpha() else 1
+        return count
+    
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Compte les tokens d'une conversation au format OpenAI.
+        
+        Args:
+            messages: Messages (role, content)
+            
+        Returns:
+            Nombre de tokens du prompt
+        """
+        return sum(MESSAGE_OVERHEAD_TOKENS + self.count(message.get("content") or "")
+                   for message in messages) + REPLY_OVERHEAD_TOKENS
+    
+    def truncate(self, text: str, max_tokens: int, marker: str = TRUNCATION_MARKER) -> str:
+        """
+        Coupe un texte pour qu'il tienne en un nombre de tokens.
+        
+        La coupure se fait de préférence avant un bloc de premier niveau ou
+        après une ligne vide, sinon en fin de ligne, et seulement en dernier
+        recours au milieu d'une ligne (en fin de phrase ou entre deux mots),
+        quand les lignes entières laisseraient plus de la moitié du budget inutilisée.
+        
+        Args:
+            text: Texte à couper
+            max_tokens: Nombre maximum de tokens du résultat, marque comprise
+            marker: Marque ajoutée à un texte coupé
+            
+        Returns:
+            Texte intact s'il tient dans le budget, sinon son début suivi de la marque
+            (vide si même la marque ne tient pas)
+        """
+        if self.count(text) <= max_tokens:
+            return text
+        budget = max_tokens - self.count(marker)
+        if budget <= 0:
+            return ""
+        
+        # Plus grand nombre de lignes entières qui tient dans le budget
+        lines = text.splitlines(keepends=True)
+        used = 0
+        fitting = 0
+        for line in lines:
+            line_tokens = self.count(line)
+            if used + line_tokens > budget:
+                break
+            used += line_tokens
+            fitting += 1
+        
+        # Ligne suivante trop longue pour être omise : coupure à l'intérieur
+        if used < budget // 2:
+            return "".join(lines[:fitting]) + self._truncate_line(lines[fitting], budget - used) + marker
+        
+        # Recul jusqu'à une limite de bloc, sans sacrifier plus de la moitié des lignes retenues
+        for cut in range(fitting, fitting // 2, -1):
+            next_line = lines[cut] if cut < len(lines) else ""
+            if not lines[cut - 1].strip() or (next_line.strip() and not next_line[0].isspace()
+                                              and not next_line.lstrip().startswith((")", "]", "}"))):
+                fitting = cut
+                break
+        
+        return "".join(lines[:fitting]).rstrip("\n") + marker
+    
+    def _truncate_line(self, line: str, budget: int) -> str:
+        """Coupe une ligne trop longue en fin de phrase ou entre deux mots."""
+        low, high = 0, len(line)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(line[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        
+        boundaries = [match.end() for match in _SENTENCE_END.finditer(line, 0, low)]
+        cut = boundaries[-1] if boundaries and boundaries[-1] > low // 2 else low
+        return line[:cut].rstrip()
+
+
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """
+    Retourne le tokenizer d'un modèle (créé une seule fois par processus).
+    
+    Args:
+        model: Nom du modèle (optionnel)
+        
+    Returns:
+        Instance de Tokenizer
+    """
+    with _tokenizers_lock:
+        tokenizer = _tokenizers.get(model)
+        if tokenizer is None:
+            tokenizer = Tokenizer(model)
+            _tokenizers[model] = tokenizer
+        return tokenizer
+
+
+class PromptBudget:
+    """Budget de tokens des prompts et des réponses d'un modèle."""
+    
+    def __init__(self, config, tokenizer: Optional[Tokenizer] = None):
+        """
+        Initialise le budget.
+        
+        Args:
+            config: Instance de Config (section llm)
+            tokenizer: Tokenizer à utiliser (optionnel, celui du modèle configuré)
+        """
+        self.tokenizer = tokenizer or get_tokenizer(config.llm.model)
+        self.context_window = config.llm.context_window
+        self.prompt_budget = config.llm.prompt_budget
+        self.default_output_tokens = config.llm.max_tokens
+        self.max_output_tokens = config.llm.max_output_tokens
+    
+    def count(self, text: str) -> int:
+        """Compte les tokens d'un texte."""
+        return self.tokenizer.count(text)
+    
+    def remaining(self, messages: List[Dict[str, str]]) -> int:
+        """
+        Calcule les tokens encore disponibles dans le budget d'un prompt.
+        
+        Args:
+            messages: Messages déjà assemblés (sans le contenu à ajouter)
+            
+        Returns:
+            Tokens disponibles (0 si le budget est déjà dépassé)
+        """
+        return max(0, self.prompt_budget - self.tokenizer.count_messages(messages))
+    
+    def allocate(self, texts: Sequence[str], budget: int,
+                 weights: Optional[Sequence[float]] = None) -> List[int]:
+        """
+        Répartit un budget de tokens entre plusieurs textes.
+        
+        Un texte plus court que sa part la garde entière et le reste est
+        redistribué entre les autres, au prorata de leurs poids.
+        
+        Args:
+            texts: Textes en concurrence
+            budget: Tokens à répartir
+            weights: Poids de chaque texte (optionnel, égaux par défaut)
+            
+        Returns:
+            Part de chaque texte, en tokens
+        """
+        sizes = [self.count(text) for text in texts]
+        weights = list(weights) if weights is not None else [1.0] * len(texts)
+        shares = [0] * len(texts)
+        pending = set(range(len(texts)))
+        remaining = max(0, budget)
+        
+        while pending:
+            total_weight = sum(weights[index] for index in pending)
+            fitting = [index for index in pending if sizes[index] <= remaining * weights[index] / total_weight]
+            if not fitting:
+                for index in pending:
+                    shares[index] = int(remaining * weights[index] / total_weight)
+                break
+            for index in fitting:
+                shares[index] = sizes[index]
+                remaining -= sizes[index]
+                pending.discard(index)
+        
+        return shares
+    
+    def fit(self, texts: Sequence[str], budget: int,
+            weights: Optional[Sequence[float]] = None) -> List[str]:
+        """
+        Réduit plusieurs textes pour qu'ils tiennent ensemble dans un budget.
+        
+        Args:
+            texts: Textes en concurrence
+            budget: Tokens disponibles pour l'ensemble
+            weights: Poids de chaque texte (optionnel, égaux par défaut)
+            
+        Returns:
+            Textes intacts, coupés aux limites syntaxiques, ou vides si leur part est trop petite
+        """
+        fitted = []
+        for text, share in zip(texts, self.allocate(texts, budget, weights)):
+            if share >= self.count(text):
+                fitted.append(text)
+            elif share < MIN_SHARE_TOKENS:
+                fitted.append("")
+            else:
+                fitted.append(self.tokenizer.truncate(text, share))
+        return fitted
+    
+    def output_tokens(self, messages: List[Dict[str, str]], expected: Optional[int] = None) -> int:
+        """
+        Dimensionne max_tokens pour une requête.
+        
+        Args:
+            messages: Messages de la requête
+            expected: Longueur de réponse attendue (optionnel, max_tokens configuré par défaut)
+            
+        Returns:
+            Tokens de réponse autorisés, dans la limite de max_output_tokens et de
+            la place laissée par le prompt dans la fenêtre du modèle
+        """
+        wanted = expected if expected is not None else self.default_output_tokens
+        room = self.context_window - self.tokenizer.count_messages(messages)
+        return max(1, min(wanted, self.max_output_tokens, room))
+    
+    def rewrite_tokens(self, code: str) -> int:
+        """
+        Estime la longueur de la réponse à une demande de réécriture complète d'un code.
+        
+        Args:
+            code: Code à réécrire (correction, refactoring)
+            
+        Returns:
+            Tokens attendus : le code entier plus une marge
+        """
+        return max(self.default_output_tokens, int(self.count(code) * 1.25) + 256)
+
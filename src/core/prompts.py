@@ -0,0 +1,155 @@
+"""
+Module de construction des prompts envoyés aux modèles LLM.
+
+Partagé par les clients synchrone et asynchrone pour que les deux
+produisent exactement les mêmes requêtes (et donc les mêmes clés de cache).
+"""
+
+import json
+from typing import List, Dict, Any, Optional
+
+
+def generate_code_messages(prompt: str, language: str) -> List[Dict[str, str]]:
+    """Construit les messages d'une demande de génération de code."""
+    system_message = f"""Tu es un expert en développement {language}.
+Génère du code propre, bien structuré et commenté.
+Suis les meilleures pratiques et conventions du langage.
+Retourne uniquement le code, sans explications supplémentaires."""
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def analyze_code_messages(code: str, language: str) -> List[Dict[str, str]]:
+    """Construit les messages d'une demande d'analyse de code."""
+    system_message = f"""Tu es un expert en analyse de code {language}.
+Analyse le code fourni et identifie :
+1. Les erreurs potentielles
+2. Les problèmes de performance
+3. Les violations des meilleures pratiques
+4. Les suggestions d'amélioration
+
+Retourne ta réponse au format JSON avec les clés suivantes :
+- errors: liste des erreurs
+- warnings: liste des avertissements
+- suggestions: liste des suggestions d'amélioration
+- severity: niveau de gravité global (low, medium, high)"""
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": f"Code à analyser :\n\n```{language}\n{code}\n```"}
+    ]
+
+
+def parse_analysis_response(response: str) -> Dict[str, Any]:
+    """
+    Extrait le JSON d'une réponse d'analyse de code.
+    
+    Args:
+        response: Réponse brute du modèle
+        
+    Returns:
+        Analyse décodée, ou {"raw_response": ...} si le JSON est invalide
+    """
+    try:
+        # Extraire le JSON de la réponse si elle contient du texte supplémentaire
+        start = response.find('{')
+        end = response.rfind('}') + 1
+        if start != -1 and end > start:
+            json_str = response[start:end]
+            return json.loads(json_str)
+        else:
+            return {"raw_response": response}
+    except json.JSONDecodeError:
+        return {"raw_response": response}
+
+
+def fix_code_messages(code: str, error_message: str, language: str) -> List[Dict[str, str]]:
+    """Construit les messages d'une demande de réparation de code."""
+    system_message = f"""Tu es un expert en débogage {language}.
+Analyse le code et l'erreur fournis, puis génère une version corrigée du code.
+Retourne uniquement le code corrigé, sans explications supplémentaires."""
+    
+    user_message = f"""Code avec erreur :
+```{language}
+{code}
+```
+
+Erreur rencontrée :
+```
+{error_message}
+```
+
+Corrige ce code."""
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def explain_code_messages(code: str, language: str) -> List[Dict[str, str]]:
+    """Construit les messages d'une demande d'explication de code."""
+    system_message = f"""Tu es un expert en {language}.
+Explique clairement ce que fait le code fourni, en français.
+Structure ton explication de manière pédagogique."""
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": f"Explique ce code :\n\n```{language}\n{code}\n```"}
+    ]
+
+
+def documentation_messages(code: str, language: str) -> List[Dict[str, str]]:
+    """Construit les messages d'une demande de documentation de code."""
+    system_message = f"""Tu es un expert en documentation technique {language}.
+Génère une documentation complète pour le code fourni, incluant :
+- Description générale
+- Paramètres et types
+- Valeurs de retour
+- Exemples d'utilisation
+- Notes importantes
+
+Utilise le format de documentation standard pour {language}."""
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": f"Documente ce code :\n\n```{language}\n{code}\n```"}
+    ]
+
+
+def refactor_code_messages(code: str, language: str, objective: str,
+                           usages: Optional[str] = None) -> List[Dict[str, str]]:
+    """Construit les messages d'une demande de refactoring (avec les utilisations du code ailleurs dans le projet)."""
+    system_message = f"""Tu es un expert en refactoring {language}.
+Refactorise le code fourni pour {objective}.
+Conserve la fonctionnalité exacte du code original.
+Retourne uniquement le code refactorisé."""
+    
+    user_message = f"Code à refactoriser :\n\n```{language}\n{code}\n```"
+    if usages:
+        user_message += (f"\n\nUtilisations dans le reste du projet (conserve les noms et signatures "
+                         f"dont elles dépendent) :\n{usages}")
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message}
+    ]
+
+
+def answer_question_messages(question: str, context: Optional[str]) -> List[Dict[str, str]]:
+    """Construit les messages d'une question, avec contexte éventuel."""
+    system_message = """Tu es un assistant expert en développement informatique.
+Réponds de manière claire, précise et structurée en français.
+Si tu n'es pas sûr d'une information, indique-le clairement."""
+    
+    user_message = question
+    if context:
+        user_message = f"Contexte :\n{context}\n\nQuestion :\n{question}"
+    
+    return [
+        {"role": "system", "content": system_message},
+        {"role": "user", "content": user_message}
+    ]
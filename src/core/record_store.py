@@ -0,0 +1,402 @@
+"""
+Module de stockage des enregistrements de la base de connaissances dans SQLite.
+
+Alternative aux fichiers JSON (knowledge_base.storage: sqlite) : templates,
+solutions et historiques de projets sont rangés dans un seul fichier SQLite
+en mode WAL (lectures concurrentes pendant les écritures), avec des index
+sur le langage, le projet, la date de création et les tags, et une
+recherche plein texte FTS5 par type d'enregistrement.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from .lexical_index import tokenize
+
+
+_KIND_PATTERN = re.compile(r"[a-z_]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    rowid INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    language TEXT,
+    project TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL,
+    UNIQUE (kind, id)
+);
+CREATE INDEX IF NOT EXISTS idx_records_language ON records (kind, language);
+CREATE INDEX IF NOT EXISTS idx_records_created_at ON records (kind, created_at);
+CREATE TABLE IF NOT EXISTS record_tags (
+    kind TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (kind, tag, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_record_tags_id ON record_tags (kind, id);
+"""
+
+# Créé après l'ajout éventuel de la colonne project aux bases existantes
+_PROJECT_INDEX = "CREATE INDEX IF NOT EXISTS idx_records_project ON records (kind, project, created_at)"
+
+
+class SqliteRecordStore:
+    """Enregistrements JSON indexés dans un fichier SQLite (mode WAL)."""
+    
+    def __init__(self, db_path: Path):
+        """
+        Initialise le stockage.
+        
+        Args:
+            db_path: Chemin du fichier SQLite
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Une connexion par thread pour les lectures ; les écritures sont sérialisées
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._fts_tables = set()
+        
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        self._upgrade_schema(conn)
+    
+    def _upgrade_schema(self, conn: sqlite3.Connection):
+        """Ajoute la colonne project aux bases créées avant elle et la renseigne."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(records)")}
+        if "project" not in columns:
+            with self._write_lock, conn:
+                conn.execute("ALTER TABLE records ADD COLUMN project TEXT")
+                conn.execute("UPDATE records SET project = json_extract(data, '$.project_name')")
+        conn.execute(_PROJECT_INDEX)
+    
+    def put(self, kind: str, record: Dict[str, Any]):
+        """
+        Enregistre (ou remplace) un enregistrement.
+        
+        Args:
+            kind: Type d'enregistrement (template, solution, history)
+            record: Données, avec au moins un champ id (project_name renseigne le projet)
+        """
+        self.put_many(kind, [record])
+    
+    def put_many(self, kind: str, records: Iterable[Dict[str, Any]]):
+        """
+        Enregistre plusieurs enregistrements en une seule transaction.
+        
+        Args:
+            kind: Type d'enregistrement
+            records: Données, avec au moins un champ id
+        """
+        with self._write_lock, self._connection() as conn:
+            for record in records:
+                conn.execute(
+                    "INSERT INTO records (kind, id, language, project, created_at, data) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (kind, id) DO UPDATE SET language = excluded.language, "
+                    "project = excluded.project, created_at = excluded.created_at, data = excluded.data",
+                    (kind, record["id"], record.get("language"), record.get("project_name"),
+                     record.get("created_at"), json.dumps(record, ensure_ascii=False))
+                )
+                conn.execute("DELETE FROM record_tags WHERE kind = ? AND id = ?", (kind, record["id"]))
+                conn.executemany(
+                    "INSERT OR IGNORE INTO record_tags (kind, tag, id) VALUES (?, ?, ?)",
+                    [(kind, tag, record["id"]) for tag in record.get("tags") or []]
+                )
+    
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupère un enregistrement.
+        
+        Args:
+            kind: Type d'enregistrement
+            record_id: ID de l'enregistrement
+            
+        Returns:
+            Données de l'enregistrement ou None
+        """
+        row = self._connection().execute(
+            "SELECT data FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def get_many(self, kind: str, record_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Récupère plusieurs enregistrements en une requête par tranche de 500 IDs.
+        
+        Args:
+            kind: Type d'enregistrement
+            record_ids: IDs des enregistrements
+            
+        Returns:
+            Dictionnaire {ID: données} des enregistrements trouvés
+        """
+        found = {}
+        conn = self._connection()
+        for start in range(0, len(record_ids), 500):
+            chunk = record_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for record_id, data in conn.execute(
+                f"SELECT id, data FROM records WHERE kind = ? AND id IN ({placeholders})", (kind, *chunk)
+            ):
+                found[record_id] = json.loads(data)
+        return found
+    
+    def delete(self, kind: str, record_ids: List[str]):
+        """
+        Supprime des enregistrements, leurs tags et leur entrée plein texte.
+        
+        Args:
+            kind: Type d'enregistrement
+            record_ids: IDs des enregistrements
+        """
+        with self._write_lock, self._connection() as conn:
+            for record_id in record_ids:
+                row = conn.execute(
+                    "SELECT rowid FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+                ).fetchone()
+                if row is None:
+                    continue
+                if kind in self._fts_tables:
+                    conn.execute(f"DELETE FROM {kind}_fts WHERE rowid = ?", row)
+                conn.execute("DELETE FROM record_tags WHERE kind = ? AND id = ?", (kind, record_id))
+                conn.execute("DELETE FROM records WHERE rowid = ?", row)
+    
+    def iter_records(self, kind: str, language: Optional[str] = None,
+                     project: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Parcourt les enregistrements d'un type, du plus ancien au plus récent.
+        
+        Args:
+            kind: Type d'enregistrement
+            language: Filtrer par langage (optionnel)
+            project: Filtrer par projet (optionnel)
+            
+        Returns:
+            Itérateur sur les données des enregistrements
+        """
+        sql = "SELECT data FROM records WHERE kind = ?"
+        params: List[Any] = [kind]
+        if language is not None:
+            sql += " AND language = ?"
+            params.append(language)
+        if project is not None:
+            sql += " AND project = ?"
+            params.append(project)
+        
+        for (data,) in self._connection().execute(sql + " ORDER BY created_at, id", params):
+            yield json.loads(data)
+    
+    def latest_id(self, kind: str, project: str) -> Optional[str]:
+        """
+        Retourne l'ID de l'enregistrement le plus récent d'un projet.
+        
+        Args:
+            kind: Type d'enregistrement
+            project: Nom du projet
+            
+        Returns:
+            ID de l'enregistrement ou None
+        """
+        row = self._connection().execute(
+            "SELECT id FROM records WHERE kind = ? AND project = ? ORDER BY created_at DESC, id DESC LIMIT 1",
+            (kind, project)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def ids_with_tag(self, kind: str, tag: str) -> List[str]:
+        """
+        Liste les enregistrements portant un tag.
+        
+        Args:
+            kind: Type d'enregistrement
+            tag: Tag recherché
+            
+        Returns:
+            IDs des enregistrements
+        """
+        return [row[0] for row in self._connection().execute(
+            "SELECT id FROM record_tags WHERE kind = ? AND tag = ?", (kind, tag)
+        )]
+    
+    def count(self, kind: str) -> int:
+        """Retourne le nombre d'enregistrements d'un type."""
+        return self._connection().execute("SELECT COUNT(*) FROM records WHERE kind = ?", (kind,)).fetchone()[0]
+    
+    def lexical_index(self, kind: str) -> "StoreLexicalIndex":
+        """
+        Retourne l'index plein texte (FTS5) d'un type d'enregistrement.
+        
+        Args:
+            kind: Type d'enregistrement
+            
+        Returns:
+            Index offrant la même interface que LexicalIndex
+        """
+        if not _KIND_PATTERN.fullmatch(kind):
+            raise ValueError(f"Type d'enregistrement invalide : {kind}")
+        
+        with self._write_lock, self._connection() as conn:
+            # Les termes sont découpés par tokenize() : le tokenizer FTS5 doit garder
+            # les identifiants composés (numpy.linalg, err_connection_refused) entiers
+            conn.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {kind}_fts USING fts5("
+                f"terms, tokenize = \"unicode61 tokenchars '._-/'\")"
+            )
+        self._fts_tables.add(kind)
+        return StoreLexicalIndex(self, kind)
+    
+    def write_terms(self, kind: str, changes: Dict[str, Optional[str]]):
+        """
+        Met à jour l'index plein texte en une seule transaction.
+        
+        Args:
+            kind: Type d'enregistrement
+            changes: Texte à indexer par ID (None pour retirer l'ID de l'index)
+        """
+        with self._write_lock, self._connection() as conn:
+            for record_id, text in changes.items():
+                row = conn.execute(
+                    "SELECT rowid FROM records WHERE kind = ? AND id = ?", (kind, record_id)
+                ).fetchone()
+                if row is None:
+                    continue
+                conn.execute(f"DELETE FROM {kind}_fts WHERE rowid = ?", row)
+                if text is not None:
+                    conn.execute(
+                        f"INSERT INTO {kind}_fts (rowid, terms) VALUES (?, ?)", (row[0], " ".join(tokenize(text)))
+                    )
+    
+    def search(self, kind: str, query: str, limit: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """
+        Recherche plein texte classée par BM25.
+        
+        Args:
+            kind: Type d'enregistrement
+            query: Requête en texte libre
+            limit: Nombre maximum de résultats
+            where: Filtre d'égalité sur le langage (ex: {"language": "python"})
+            
+        Returns:
+            Couples (ID, score), du plus pertinent au moins pertinent
+        """
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return []
+        
+        sql = (f"SELECT r.id, bm25({kind}_fts) AS rank FROM {kind}_fts "
+               f"JOIN records r ON r.rowid = {kind}_fts.rowid WHERE {kind}_fts MATCH ?")
+        params: List[Any] = [" OR ".join(f'"{term}"' for term in terms)]
+        if where and "language" in where:
+            sql += " AND r.language = ?"
+            params.append(where["language"])
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(limit)
+        
+        # bm25() est négatif (plus petit = plus pertinent) : le signe est inversé
+        return [(record_id, -rank) for record_id, rank in self._connection().execute(sql, params)]
+    
+    def indexed_count(self, kind: str) -> int:
+        """Retourne le nombre d'enregistrements présents dans l'index plein texte d'un type."""
+        return self._connection().execute(f"SELECT COUNT(*) FROM {kind}_fts").fetchone()[0]
+    
+    def indexed_ids(self, kind: str) -> List[str]:
+        """Retourne les IDs présents dans l'index plein texte d'un type."""
+        return [row[0] for row in self._connection().execute(
+            f"SELECT r.id FROM {kind}_fts JOIN records r ON r.rowid = {kind}_fts.rowid"
+        )]
+    
+    def close(self):
+        """Ferme la connexion du thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Retourne la connexion du thread courant."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+class StoreLexicalIndex:
+    """Index plein texte d'un type d'enregistrement, avec l'interface de LexicalIndex."""
+    
+    def __init__(self, store: SqliteRecordStore, kind: str):
+        """
+        Initialise l'index.
+        
+        Args:
+            store: Stockage SQLite
+            kind: Type d'enregistrement indexé
+        """
+        self.store = store
+        self.kind = kind
+        
+        # Modifications différées (persist=False), écrites ensemble par flush()
+        self._pending: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        self.flush()
+        return self.store.indexed_count(self.kind)
+    
+    def __contains__(self, doc_id: str) -> bool:
+        self.flush()
+        return doc_id in set(self.store.indexed_ids(self.kind))
+    
+    def add(self, doc_id: str, text: str, meta: Optional[Dict[str, Any]] = None,
+            persist: bool = True):
+        """Indexe un enregistrement déjà stocké (meta est porté par l'enregistrement)."""
+        with self._lock:
+            self._pending[doc_id] = text
+        if persist:
+            self.flush()
+    
+    def remove(self, doc_id: str, persist: bool = True):
+        """Retire un enregistrement de l'index."""
+        with self._lock:
+            self._pending[doc_id] = None
+        if persist:
+            self.flush()
+    
+    def meta(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Retourne les métadonnées indexées (le langage de l'enregistrement)."""
+        record = self.store.get(self.kind, doc_id)
+        return {"language": record.get("language")} if record else None
+    
+    def ids(self) -> List[str]:
+        """Retourne les IDs indexés."""
+        self.flush()
+        return self.store.indexed_ids(self.kind)
+    
+    def search(self, query: str, limit: int = 10,
+               where: Optional[Dict[str, Any]] = None) -> List[Tuple[str, float]]:
+        """Recherche les enregistrements les plus pertinents (voir SqliteRecordStore.search)."""
+        self.flush()
+        return self.store.search(self.kind, query, limit, where)
+    
+    def flush(self):
+        """Écrit les modifications différées."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if pending:
+            self.store.write_terms(self.kind, pending)
+    
+    def clear(self):
+        """Vide l'index."""
+        with self._lock:
+            self._pending.clear()
+        self.store.write_terms(self.kind, {doc_id: None for doc_id in self.store.indexed_ids(self.kind)})
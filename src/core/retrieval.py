@@ -0,0 +1,113 @@
+"""
+Module de fusion et de reclassement des résultats de recherche.
+
+La recherche hybride combine le classement lexical (BM25) et le classement
+vectoriel par fusion des rangs réciproques (RRF) ; un cross-encoder local
+peut ensuite reclasser les meilleurs candidats dans un budget de temps.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+SEARCH_MODES = ("vector", "lexical", "hybrid")
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fusionne plusieurs classements par rangs réciproques.
+    
+    Args:
+        rankings: Classements d'IDs, du plus pertinent au moins pertinent
+        k: Constante d'atténuation des rangs (60 dans l'article d'origine)
+        
+    Returns:
+        Couples (ID, score fusionné), du plus pertinent au moins pertinent
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CrossEncoderReranker:
+    """Reclassement par cross-encoder local (sentence-transformers), dans un budget de temps."""
+    
+    def __init__(self, model_name: str, logger=None, batch_size: int = 8):
+        """
+        Initialise le reclasseur.
+        
+        Args:
+            model_name: Nom ou chemin du modèle cross-encoder
+            logger: Logger pour signaler un modèle indisponible (optionnel)
+            batch_size: Nombre de paires évaluées entre deux contrôles du budget
+        """
+        self.model_name = model_name
+        self.logger = logger
+        self.batch_size = batch_size
+        
+        self._model = None
+        self._unavailable = False
+        self._loading: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def available(self) -> bool:
+        """Indique si le reclassement peut être utilisé (modèle chargé ou en cours de chargement)."""
+        return not self._unavailable
+    
+    def warm_up(self):
+        """Démarre le chargement du modèle en arrière-plan."""
+        with self._lock:
+            if self._model is not None or self._unavailable or self._loading is not None:
+                return
+            self._loading = threading.Thread(target=self._load, name="cross-encoder-load", daemon=True)
+            self._loading.start()
+    
+    def rerank(self, query: str, candidates: List[Tuple[str, str]],
+               budget_ms: Optional[float] = None) -> Optional[List[str]]:
+        """
+        Reclasse des candidats par pertinence pour la requête.
+        
+        Les candidats sont évalués par lots dans l'ordre reçu ; à l'épuisement
+        du budget, seuls les candidats déjà évalués sont reclassés et les
+        suivants gardent leur position relative derrière eux.
+        
+        Args:
+            query: Requête
+            candidates: Couples (ID, texte), dans l'ordre du classement d'entrée
+            budget_ms: Temps maximal consacré au reclassement (None = illimité)
+            
+        Returns:
+            IDs reclassés, ou None si le modèle n'est pas (encore) disponible
+        """
+        model = self._model
+        if model is None:
+            # Le premier appel lance le chargement sans le faire payer à la requête
+            self.warm_up()
+            return None
+        
+        deadline = time.perf_counter() + budget_ms / 1000 if budget_ms is not None else None
+        scored: List[Tuple[float, str]] = []
+        
+        for start in range(0, len(candidates), self.batch_size):
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            batch = candidates[start:start + self.batch_size]
+            scores = model.predict([(query, text) for _, text in batch])
+            scored.extend((float(score), doc_id) for (doc_id, _), score in zip(batch, scores))
+        
+        reranked = [doc_id for _, doc_id in sorted(scored, key=lambda item: item[0], reverse=True)]
+        return reranked + [doc_id for doc_id, _ in candidates[len(scored):]]
+    
+    def _load(self):
+        """Charge le modèle (exécuté en arrière-plan)."""
+        try:
+            from sentence_transformers import CrossEncoder
+            self._model = CrossEncoder(self.model_name)
+        except Exception as e:
+            self._unavailable = True
+            if self.logger:
+                self.logger.warning(f"Reclassement désactivé, cross-encoder indisponible : {e}")
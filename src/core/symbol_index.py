@@ -0,0 +1,725 @@
+"""
+Module de l'index des symboles d'un projet.
+
+Pour chaque fichier Python (analysé avec ast) et JavaScript/TypeScript
+(analyseur léger par expressions régulières), l'index conserve les
+définitions (fonctions, classes, méthodes, variables de module), les noms
+référencés avec la définition qui les contient (ce qui donne les appelants
+d'une fonction) et les imports. Il est stocké dans un fichier SQLite à côté
+de l'index des fichiers du projet et mis à jour fichier par fichier : seuls
+les fichiers dont la taille ou la date a changé sont réanalysés.
+"""
+
+import ast
+import bisect
+import builtins
+import os
+import posixpath
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .project_index import ProjectIndex
+
+
+# Langages analysés
+PARSED_LANGUAGES = ('python', 'javascript', 'typescript')
+
+# Fichiers plus gros jamais analysés (code généré, bundles)
+MAX_PARSED_BYTES = 1000000
+
+# Les symboles référencent leur fichier par son identifiant (chemins non répétés)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS symbol_files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    language TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS definitions (
+    file_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    qualname TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    end_line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_definitions_name ON definitions(name);
+CREATE INDEX IF NOT EXISTS idx_definitions_scope ON definitions(file_id, qualname);
+CREATE TABLE IF NOT EXISTS refs (
+    file_id INTEGER NOT NULL,
+    scope TEXT NOT NULL,
+    name TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    PRIMARY KEY (file_id, scope, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_refs_name ON refs(name);
+CREATE TABLE IF NOT EXISTS imports (
+    file_id INTEGER NOT NULL,
+    module TEXT NOT NULL,
+    name TEXT,
+    line INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_imports_module ON imports(module);
+CREATE INDEX IF NOT EXISTS idx_imports_file ON imports(file_id);
+"""
+
+# Noms trop courants pour être utiles comme références
+_PYTHON_IGNORED_NAMES = set(dir(builtins)) | {'self', 'cls'}
+_JS_KEYWORDS = {
+    'abstract', 'any', 'as', 'async', 'await', 'boolean', 'break', 'case', 'catch', 'class', 'const',
+    'constructor', 'continue', 'debugger', 'declare', 'default', 'delete', 'do', 'else', 'enum', 'export',
+    'extends', 'false', 'finally', 'for', 'from', 'function', 'if', 'implements', 'import', 'in',
+    'instanceof', 'interface', 'keyof', 'let', 'new', 'null', 'number', 'of', 'private', 'protected',
+    'public', 'readonly', 'return', 'static', 'string', 'super', 'switch', 'this', 'throw', 'true',
+    'try', 'type', 'typeof', 'undefined', 'var', 'void', 'while', 'with', 'yield', 'console', 'require'
+}
+_JS_EXTENSIONS = ('.ts', '.js', '.tsx', '.jsx', '.mjs', '.cjs')
+
+_JS_COMMENT_OR_STRING = re.compile(
+    r"//[^\n]*|/\*.*?\*/|`(?:\\.|[^`\\])*`|\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'", re.S
+)
+_JS_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+_JS_DEFINITIONS = [
+    ('function', re.compile(
+        r"^[ \t]*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>[A-Za-z_$][\w$]*)", re.M)),
+    ('class', re.compile(
+        r"^[ \t]*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>[A-Za-z_$][\w$]*)", re.M)),
+    ('function', re.compile(
+        r"^[ \t]*(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)\s*(?::[^=\n]+)?=\s*(?:async\s+)?"
+        r"(?:function\b|\([^)]*\)\s*(?::[^=\n]+)?=>|[A-Za-z_$][\w$]*\s*=>)", re.M)),
+    ('variable', re.compile(r"^(?:export\s+)?(?:const|let|var)\s+(?P<name>[A-Za-z_$][\w$]*)", re.M)),
+    ('type', re.compile(
+        r"^[ \t]*(?:export\s+)?(?:declare\s+)?(?:interface|type|enum)\s+(?P<name>[A-Za-z_$][\w$]*)", re.M)),
+    ('method', re.compile(
+        r"^[ \t]+(?:(?:public|private|protected|static|async|readonly|get|set|override)\s+)*"
+        r"(?P<name>[A-Za-z_$][\w$]*)\s*(?:<[^>\n]*>)?\s*\([^)]*\)\s*(?::[^{;\n]+)?\{", re.M))
+]
+_JS_IMPORTS = [
+    re.compile(r"\bimport\s+(?:type\s+)?(?P<names>[\w$*{}\s,]+?)\s+from\s+(?P<q>['\"])(?P<module>[^'\"]+)(?P=q)"),
+    re.compile(r"\bimport\s+(?P<q>['\"])(?P<module>[^'\"]+)(?P=q)"),
+    re.compile(r"\bexport\s+(?:type\s+)?(?P<names>\*(?:\s+as\s+[\w$]+)?|\{[^}]*\})\s+from\s+"
+               r"(?P<q>['\"])(?P<module>[^'\"]+)(?P=q)"),
+    re.compile(r"\b(?:require|import)\s*\(\s*(?P<q>['\"])(?P<module>[^'\"]+)(?P=q)\s*\)")
+]
+
+
+@dataclass
+class ParsedFile:
+    """Symboles extraits d'un fichier."""
+    # (nom, nom qualifié, type, première ligne, dernière ligne)
+    definitions: List[Tuple[str, str, str, int, int]] = field(default_factory=list)
+    # (nom, nom qualifié de la définition englobante ou "" au niveau du module, ligne)
+    references: List[Tuple[str, str, int]] = field(default_factory=list)
+    # (module, nom importé ou None, ligne) ; module pointé (Python) ou chemin sans extension (JS/TS)
+    imports: List[Tuple[str, Optional[str], int]] = field(default_factory=list)
+
+
+def parse_python(source: str, rel_path: str) -> Optional[ParsedFile]:
+    """
+    Extrait les symboles d'un fichier Python.
+    
+    Args:
+        source: Contenu du fichier
+        rel_path: Chemin relatif à la racine (résolution des imports relatifs)
+        
+    Returns:
+        Symboles du fichier, ou None si le fichier n'est pas du Python valide
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+    
+    visitor = _PythonVisitor(rel_path)
+    visitor.visit(tree)
+    return visitor.parsed
+
+
+def parse_javascript(source: str, rel_path: str) -> ParsedFile:
+    """
+    Extrait les symboles d'un fichier JavaScript ou TypeScript.
+    
+    L'analyse est lexicale : commentaires et chaînes sont neutralisés, les
+    définitions sont reconnues par motifs et leur étendue par appariement
+    des accolades.
+    
+    Args:
+        source: Contenu du fichier
+        rel_path: Chemin relatif à la racine (résolution des imports relatifs)
+        
+    Returns:
+        Symboles du fichier
+    """
+    # Deux versions de même longueur que la source : sans commentaires, et sans commentaires ni chaînes
+    with_strings = []
+    code = []
+    position = 0
+    for match in _JS_COMMENT_OR_STRING.finditer(source):
+        text = match.group()
+        blank = re.sub(r"[^\n]", " ", text)
+        with_strings.append(source[position:match.start()])
+        code.append(source[position:match.start()])
+        if text.startswith("/"):
+            with_strings.append(blank)
+            code.append(blank)
+        else:
+            with_strings.append(text)
+            code.append(text[0] + blank[2:] + text[-1])
+        position = match.end()
+    with_strings.append(source[position:])
+    code.append(source[position:])
+    with_strings = "".join(with_strings)
+    code = "".join(code)
+    
+    newlines = [offset for offset, char in enumerate(code) if char == "\n"]
+    
+    def line_of(offset: int) -> int:
+        return bisect.bisect_left(newlines, offset) + 1
+    
+    # Accolades appariées : ouverture -> fermeture
+    closing: Dict[int, int] = {}
+    stack = []
+    for offset, char in enumerate(code):
+        if char == "{":
+            stack.append(offset)
+        elif char == "}" and stack:
+            closing[stack.pop()] = offset
+    
+    # Définitions repérées, par position de leur nom : (début, fin, nom, type)
+    found: Dict[int, Tuple[int, int, str, str]] = {}
+    for kind, pattern in _JS_DEFINITIONS:
+        for match in pattern.finditer(code):
+            name = match.group("name")
+            if match.start("name") in found or name in _JS_KEYWORDS:
+                continue
+            brace = _js_body_brace(code, match, kind)
+            end = closing.get(brace, match.end()) if brace is not None else match.end()
+            found[match.start("name")] = (match.start("name"), end, name, kind)
+    
+    parsed = ParsedFile()
+    
+    # Noms qualifiés (Classe.méthode) par balayage des étendues imbriquées ; une
+    # « méthode » hors d'une classe est un appel suivi d'un bloc, pas une définition
+    scopes: List[Tuple[int, int, str]] = []
+    active: List[Tuple[int, str, str]] = []
+    for start, end, name, kind in sorted(found.values()):
+        while active and active[-1][0] < start:
+            active.pop()
+        parent = active[-1] if active else None
+        if kind == 'method' and (parent is None or parent[2] != 'class'):
+            del found[start]
+            continue
+        qualname = f"{parent[1]}.{name}" if parent else name
+        parsed.definitions.append((name, qualname, kind, line_of(start), line_of(end)))
+        if kind != 'variable':
+            active.append((end, qualname, kind))
+            scopes.append((start, end, qualname))
+    
+    # Références : chaque identifiant est rattaché à la définition la plus interne qui le contient
+    seen = set()
+    active_scopes: List[Tuple[int, int, str]] = []
+    next_scope = 0
+    for match in _JS_IDENTIFIER.finditer(code):
+        offset = match.start()
+        while next_scope < len(scopes) and scopes[next_scope][0] <= offset:
+            while active_scopes and active_scopes[-1][1] < scopes[next_scope][0]:
+                active_scopes.pop()
+            active_scopes.append(scopes[next_scope])
+            next_scope += 1
+        while active_scopes and active_scopes[-1][1] < offset:
+            active_scopes.pop()
+        
+        name = match.group()
+        if name in _JS_KEYWORDS or offset in found or code[offset - 1:offset] in ("#", "@") \
+                or (offset and (code[offset - 1].isalnum() or code[offset - 1] in "_$")):
+            continue
+        scope = active_scopes[-1][2] if active_scopes else ""
+        if (name, scope) not in seen:
+            seen.add((name, scope))
+            parsed.references.append((name, scope, line_of(offset)))
+    
+    for pattern in _JS_IMPORTS:
+        for match in pattern.finditer(with_strings):
+            # Un import cité dans une chaîne n'est pas un import
+            if code[match.start()] == " ":
+                continue
+            module = _normalize_js_module(match.group("module"), rel_path)
+            line = line_of(match.start())
+            for name in _parse_js_import_names(match.groupdict().get("names") or "") or [None]:
+                parsed.imports.append((module, name, line))
+    
+    return parsed
+
+
+def python_module_names(rel_path: str) -> List[str]:
+    """
+    Liste les noms sous lesquels un fichier Python peut être importé.
+    
+    Args:
+        rel_path: Chemin relatif à la racine (par exemple src/app/models.py)
+        
+    Returns:
+        Noms pointés, du plus long au plus court (src.app.models, app.models, models)
+    """
+    parts = rel_path[:-len(".py")].split("/") if rel_path.endswith(".py") else rel_path.split("/")
+    if parts[-1] == "__init__":
+        parts = parts[:-1]
+    return [".".join(parts[start:]) for start in range(len(parts))]
+
+
+def js_module_names(rel_path: str) -> List[str]:
+    """
+    Liste les chemins d'import (sans extension) qui désignent un fichier JavaScript ou TypeScript.
+    
+    Args:
+        rel_path: Chemin relatif à la racine (par exemple web/lib/index.ts)
+        
+    Returns:
+        Chemins relatifs à la racine (web/lib/index, web/lib)
+    """
+    base = posixpath.splitext(rel_path)[0]
+    names = [base]
+    if posixpath.basename(base) == "index" and "/" in base:
+        names.append(posixpath.dirname(base))
+    return names
+
+
+class SymbolIndex:
+    """Index persistant des symboles et des imports d'un projet, mis à jour fichier par fichier."""
+    
+    def __init__(self, project_index: ProjectIndex):
+        """
+        Initialise l'index.
+        
+        Args:
+            project_index: Index des fichiers du projet (liste des fichiers à analyser)
+        """
+        self.project_index = project_index
+        self.root = project_index.root
+        self.index_path = project_index.index_path.with_suffix(".symbols.db")
+        
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+    
+    def update(self) -> Dict[str, int]:
+        """
+        Réanalyse les fichiers ajoutés ou modifiés depuis la dernière mise à jour.
+        
+        L'index des fichiers du projet doit avoir été revalidé (refresh) au préalable.
+        
+        Returns:
+            Nombre de fichiers analysés et retirés
+        """
+        entries = self.project_index.entries(languages=PARSED_LANGUAGES)
+        watching = self.project_index.watching
+        
+        with self._lock:
+            stored = {path: (size, mtime_ns) for path, size, mtime_ns in self._conn.execute(
+                "SELECT path, size, mtime_ns FROM symbol_files"
+            )}
+        
+        changed = []
+        for entry in entries:
+            size, mtime_ns = entry["size"], entry["mtime_ns"]
+            if not watching:
+                # Sans surveillance, l'index des fichiers ignore les modifications sur place
+                try:
+                    stat = os.stat(self.root / entry["path"])
+                except OSError:
+                    continue
+                size, mtime_ns = stat.st_size, stat.st_mtime_ns
+            if stored.get(entry["path"]) != (size, mtime_ns):
+                changed.append((entry["path"], entry["language"], size, mtime_ns))
+        removed = stored.keys() - {entry["path"] for entry in entries}
+        
+        # Analyse hors verrou, écriture en une transaction
+        parsed = [(path, language, size, mtime_ns, self._parse(path, language, size))
+                  for path, language, size, mtime_ns in changed]
+        
+        with self._lock, self._conn:
+            for path in removed:
+                self._delete(path)
+            for path, language, size, mtime_ns, symbols in parsed:
+                file_id = self._delete(path, keep_file=True)
+                if file_id is None:
+                    file_id = self._conn.execute(
+                        "INSERT INTO symbol_files (path, size, mtime_ns, language) VALUES (?, ?, ?, ?)",
+                        (path, size, mtime_ns, language)
+                    ).lastrowid
+                else:
+                    self._conn.execute("UPDATE symbol_files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                       (size, mtime_ns, file_id))
+                if symbols is None:
+                    continue
+                self._conn.executemany(
+                    "INSERT INTO definitions (file_id, name, qualname, kind, line, end_line) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(file_id, *definition) for definition in symbols.definitions]
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO refs (file_id, name, scope, line) VALUES (?, ?, ?, ?)",
+                    [(file_id, *reference) for reference in symbols.references]
+                )
+                self._conn.executemany(
+                    "INSERT INTO imports (file_id, module, name, line) VALUES (?, ?, ?, ?)",
+                    [(file_id, *imported) for imported in symbols.imports]
+                )
+        
+        return {"files_parsed": len(changed), "files_removed": len(removed)}
+    
+    def definitions(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Recherche les définitions d'un nom.
+        
+        Args:
+            name: Nom simple (save) ou qualifié (Order.save)
+            
+        Returns:
+            Définitions (path, name, qualname, kind, line, end_line)
+        """
+        # Un nom qualifié est cherché par son dernier élément (indexé), puis filtré
+        return self._definitions("WHERE d.name = ? AND (d.name = ? OR d.qualname = ?)",
+                                 (name.rpartition(".")[2], name, name))
+    
+    def file_definitions(self, rel_path: str) -> List[Dict[str, Any]]:
+        """
+        Liste les définitions d'un fichier, par ordre de ligne.
+        
+        Args:
+            rel_path: Chemin relatif à la racine du projet
+            
+        Returns:
+            Définitions (path, name, qualname, kind, line, end_line)
+        """
+        return self._definitions("WHERE f.path = ?", (rel_path,))
+    
+    def references(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Recherche les références à un nom.
+        
+        Args:
+            name: Nom simple
+            
+        Returns:
+            Références (path, name, scope, line) ; scope est le nom qualifié de la
+            définition qui contient la référence ("" au niveau du module)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT f.path, r.name, r.scope, r.line FROM refs r JOIN symbol_files f ON f.id = r.file_id "
+                "WHERE r.name = ? ORDER BY f.path, r.line", (name,)
+            ).fetchall()
+        return [{"path": path, "name": name, "scope": scope, "line": line} for path, name, scope, line in rows]
+    
+    def callers(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Recherche les définitions qui utilisent un nom.
+        
+        Args:
+            name: Nom simple
+            
+        Returns:
+            Définitions appelantes (path, name, qualname, kind, line, end_line)
+        """
+        return self._definitions(
+            "JOIN refs r ON r.file_id = d.file_id AND r.scope = d.qualname WHERE r.name = ?", (name,)
+        )
+    
+    def lookup(self, names: Iterable[str]) -> Dict[str, Set[str]]:
+        """
+        Recherche les fichiers qui définissent ou utilisent des noms.
+        
+        Args:
+            names: Noms simples ou qualifiés
+            
+        Returns:
+            Dictionnaire {chemin: noms trouvés dans le fichier}
+        """
+        wanted = set(names)
+        if not wanted:
+            return {}
+        # Les noms qualifiés sont cherchés par leur dernier élément (indexé)
+        simple = sorted({name.rpartition(".")[2] for name in wanted})
+        placeholders = ",".join("?" * len(simple))
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT f.path, d.name, d.qualname FROM definitions d JOIN symbol_files f ON f.id = d.file_id "
+                f"WHERE d.name IN ({placeholders})", simple
+            ).fetchall()
+            rows += self._conn.execute(
+                f"SELECT DISTINCT f.path, r.name, NULL FROM refs r JOIN symbol_files f ON f.id = r.file_id "
+                f"WHERE r.name IN ({placeholders})", simple
+            ).fetchall()
+        
+        found: Dict[str, Set[str]] = {}
+        for path, name, qualname in rows:
+            hits = {name, qualname} & wanted
+            if hits:
+                found.setdefault(path, set()).update(hits)
+        return found
+    
+    def imports_of(self, rel_path: str) -> List[str]:
+        """
+        Liste les fichiers du projet importés par un fichier.
+        
+        Args:
+            rel_path: Chemin relatif à la racine du projet
+            
+        Returns:
+            Chemins relatifs des fichiers importés (les modules externes sont omis)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT i.module, i.name FROM imports i JOIN symbol_files f ON f.id = i.file_id "
+                "WHERE f.path = ? ORDER BY i.line", (rel_path,)
+            ).fetchall()
+            known = {path for (path,) in self._conn.execute("SELECT path FROM symbol_files")}
+        
+        imported = []
+        for module, name in rows:
+            if rel_path.endswith(".py"):
+                base = module.replace(".", "/")
+                candidates = ([f"{base}/{name}.py"] if name else []) + [f"{base}.py", f"{base}/__init__.py"]
+            else:
+                candidates = [module + extension for extension in _JS_EXTENSIONS] + \
+                             [f"{module}/index{extension}" for extension in _JS_EXTENSIONS]
+            target = self._resolve(candidates, known, suffix=rel_path.endswith(".py"))
+            if target and target != rel_path and target not in imported:
+                imported.append(target)
+        return imported
+    
+    def importers_of(self, rel_path: str) -> List[str]:
+        """
+        Liste les fichiers du projet qui importent un fichier.
+        
+        Args:
+            rel_path: Chemin relatif à la racine du projet
+            
+        Returns:
+            Chemins relatifs des fichiers qui l'importent
+        """
+        if rel_path.endswith(".py"):
+            # import app.models, from app.models import x, from app import models
+            conditions = ["i.module = ?"] * len(python_module_names(rel_path))
+            params: List[Any] = list(python_module_names(rel_path))
+            for module_name in python_module_names(rel_path):
+                package, _, last = module_name.rpartition(".")
+                if package:
+                    conditions.append("(i.module = ? AND i.name = ?)")
+                    params.extend([package, last])
+        else:
+            params = js_module_names(rel_path)
+            conditions = ["i.module = ?"] * len(params)
+        
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT f.path FROM imports i JOIN symbol_files f ON f.id = i.file_id "
+                f"WHERE ({' OR '.join(conditions)}) AND f.path != ? ORDER BY f.path",
+                params + [rel_path]
+            ).fetchall()
+        return [path for (path,) in rows]
+    
+    def close(self):
+        """Ferme l'index."""
+        with self._lock:
+            self._conn.close()
+    
+    def _parse(self, rel_path: str, language: str, size: int) -> Optional[ParsedFile]:
+        """Analyse un fichier (None s'il est illisible, trop gros ou invalide)."""
+        if size > MAX_PARSED_BYTES:
+            return None
+        try:
+            source = (self.root / rel_path).read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return None
+        if language == 'python':
+            return parse_python(source, rel_path)
+        return parse_javascript(source, rel_path)
+    
+    def _delete(self, rel_path: str, keep_file: bool = False) -> Optional[int]:
+        """Retire les symboles d'un fichier (et le fichier lui-même sauf keep_file) ; retourne son identifiant."""
+        row = self._conn.execute("SELECT id FROM symbol_files WHERE path = ?", (rel_path,)).fetchone()
+        if row is None:
+            return None
+        for table in ("definitions", "refs", "imports"):
+            self._conn.execute(f"DELETE FROM {table} WHERE file_id = ?", (row[0],))
+        if not keep_file:
+            self._conn.execute("DELETE FROM symbol_files WHERE id = ?", (row[0],))
+        return row[0]
+    
+    def _definitions(self, where: str, params: Tuple) -> List[Dict[str, Any]]:
+        """Lit des définitions."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT f.path, d.name, d.qualname, d.kind, d.line, d.end_line FROM definitions d "
+                f"JOIN symbol_files f ON f.id = d.file_id {where} ORDER BY f.path, d.line",
+                params
+            ).fetchall()
+        return [
+            {"path": path, "name": name, "qualname": qualname, "kind": kind, "line": line, "end_line": end_line}
+            for path, name, qualname, kind, line, end_line in rows
+        ]
+    
+    @staticmethod
+    def _resolve(candidates: List[str], known: Set[str], suffix: bool) -> Optional[str]:
+        """Retrouve le premier fichier connu parmi des candidats (à la racine, ou sous un répertoire si suffix)."""
+        for candidate in candidates:
+            if candidate in known:
+                return candidate
+        if suffix:
+            # Disposition src/ : le package importé n'est pas à la racine du projet
+            for candidate in candidates:
+                matches = sorted(path for path in known if path.endswith("/" + candidate))
+                if matches:
+                    return matches[0]
+        return None
+
+
+class _PythonVisitor(ast.NodeVisitor):
+    """Parcours d'un arbre ast : définitions, références et imports."""
+    
+    def __init__(self, rel_path: str):
+        self.rel_path = rel_path
+        self.parsed = ParsedFile()
+        self._scopes: List[Tuple[str, str]] = []
+        self._seen: Set[Tuple[str, str]] = set()
+    
+    def visit_FunctionDef(self, node):
+        kind = 'method' if self._scopes and self._scopes[-1][1] == 'class' else 'function'
+        self._visit_definition(node, kind)
+    
+    visit_AsyncFunctionDef = visit_FunctionDef
+    
+    def visit_ClassDef(self, node):
+        self._visit_definition(node, 'class')
+    
+    def visit_Assign(self, node):
+        if not self._scopes:
+            for target in node.targets:
+                for name_node in [target] + list(getattr(target, "elts", [])):
+                    if isinstance(name_node, ast.Name):
+                        self._define(name_node.id, 'variable', node)
+        self.generic_visit(node)
+    
+    def visit_AnnAssign(self, node):
+        if not self._scopes and isinstance(node.target, ast.Name):
+            self._define(node.target.id, 'variable', node)
+        self.generic_visit(node)
+    
+    def visit_Name(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self._reference(node.id, node.lineno)
+    
+    def visit_Attribute(self, node):
+        if isinstance(node.ctx, ast.Load):
+            self._reference(node.attr, node.lineno)
+        self.generic_visit(node)
+    
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.parsed.imports.append((alias.name, None, node.lineno))
+    
+    def visit_ImportFrom(self, node):
+        module = node.module or ""
+        if node.level:
+            # Import relatif : résolu par rapport au package du fichier
+            package = self.rel_path.split("/")[:-1]
+            package = package[:max(0, len(package) - (node.level - 1))]
+            module = ".".join(package + ([module] if module else []))
+        for alias in node.names:
+            name = None if alias.name == "*" else alias.name
+            if module or name:
+                self.parsed.imports.append((module or name, None if not module else name, node.lineno))
+    
+    def _visit_definition(self, node, kind: str):
+        qualname = self._define(node.name, kind, node)
+        self._scopes.append((qualname, kind))
+        self.generic_visit(node)
+        self._scopes.pop()
+    
+    def _define(self, name: str, kind: str, node) -> str:
+        qualname = f"{self._scopes[-1][0]}.{name}" if self._scopes else name
+        self.parsed.definitions.append((name, qualname, kind, node.lineno, getattr(node, "end_lineno", node.lineno)))
+        return qualname
+    
+    def _reference(self, name: str, line: int):
+        if name in _PYTHON_IGNORED_NAMES:
+            return
+        scope = self._scopes[-1][0] if self._scopes else ""
+        if (name, scope) not in self._seen:
+            self._seen.add((name, scope))
+            self.parsed.references.append((name, scope, line))
+
+
+def _js_body_brace(code: str, match: re.Match, kind: str) -> Optional[int]:
+    """Retourne la position de l'accolade ouvrant le corps d'une définition JavaScript (None sans corps)."""
+    if kind == 'variable':
+        return None
+    if kind == 'method':
+        return match.end() - 1
+    
+    position = match.end()
+    if kind in ('class', 'type'):
+        header = re.compile(r"[^{;\n]*\{").match(code, position)
+        return header.end() - 1 if header else None
+    
+    if match.group().endswith("=>"):
+        body = re.compile(r"\s*\{").match(code, position)
+        return body.end() - 1 if body else None
+    
+    # Fonction : corps après la liste des paramètres (qui peut contenir des accolades)
+    open_paren = code.find("(", position)
+    if open_paren == -1:
+        return None
+    depth = 0
+    for offset in range(open_paren, len(code)):
+        if code[offset] == "(":
+            depth += 1
+        elif code[offset] == ")":
+            depth -= 1
+            if depth == 0:
+                body = re.compile(r"\s*(?::[^{;=]+?)?\s*(?:=>\s*)?\{").match(code, offset + 1)
+                return body.end() - 1 if body else None
+    return None
+
+
+def _normalize_js_module(specifier: str, rel_path: str) -> str:
+    """Ramène un import relatif à un chemin sans extension depuis la racine (les paquets sont inchangés)."""
+    if not specifier.startswith("."):
+        return specifier
+    module = posixpath.normpath(posixpath.join(posixpath.dirname(rel_path), specifier))
+    base, extension = posixpath.splitext(module)
+    return base if extension in _JS_EXTENSIONS else module
+
+
+def _parse_js_import_names(clause: str) -> List[str]:
+    """Extrait les noms importés d'une clause d'import (default, {a, b as c}, * as ns)."""
+    names = []
+    clause = clause.strip()
+    if not clause:
+        return names
+    
+    braces = re.search(r"\{([^}]*)\}", clause)
+    if braces:
+        for item in braces.group(1).split(","):
+            item = item.strip()
+            if item.startswith("type "):
+                item = item[5:].strip()
+            if item:
+                names.append(item.split(" as ")[0].strip())
+        clause = clause[:braces.start()] + clause[braces.end():]
+    
+    for item in clause.split(","):
+        item = item.strip()
+        if item.startswith("*"):
+            names.append("*")
+        elif item:
+            names.append("default")
+    return names
@@ -0,0 +1,269 @@
+"""
+Module de l'index des templates de la base de connaissances.
+
+L'index associe chaque ID de template à son fichier JSON et à ses
+métadonnées. Il est persisté dans templates/index.json et revalidé à partir
+des dates de modification des répertoires : seuls les répertoires modifiés
+depuis la dernière validation sont relus.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+
+INDEX_VERSION = 1
+
+
+class TemplateIndex:
+    """Index persistant ID → fichier des templates."""
+    
+    def __init__(self, templates_dir: Path):
+        """
+        Initialise l'index.
+        
+        Args:
+            templates_dir: Répertoire des templates (un sous-répertoire par langage)
+        """
+        self.templates_dir = Path(templates_dir)
+        self.index_file = self.templates_dir / "index.json"
+        
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._ids_by_path: Dict[str, str] = {}
+        self._dir_mtimes: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._dirty = False
+    
+    def lookup(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne l'entrée d'index d'un template.
+        
+        Args:
+            template_id: ID du template
+            
+        Returns:
+            Entrée (path, name, language, tags, mtime) ou None
+        """
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._entries.get(template_id)
+            if entry is None:
+                # Un template ajouté hors de la base de connaissances n'est visible qu'après revalidation
+                self.refresh()
+                entry = self._entries.get(template_id)
+            return dict(entry) if entry else None
+    
+    def load(self, template_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Charge les données complètes d'un template.
+        
+        Args:
+            template_id: ID du template
+            
+        Returns:
+            Données du template ou None
+        """
+        entry = self.lookup(template_id)
+        if entry is None:
+            return None
+        
+        data = self._read(self.templates_dir / entry["path"])
+        if data is not None and data.get("id") == template_id:
+            return data
+        
+        # Fichier modifié ou supprimé depuis l'indexation : revalider ce répertoire
+        with self._lock:
+            self._scan_language(entry["language"], force=True)
+            self._persist()
+            entry = self._entries.get(template_id)
+        if entry is None:
+            return None
+        data = self._read(self.templates_dir / entry["path"])
+        return data if data is not None and data.get("id") == template_id else None
+    
+    def entries(self, language: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Liste les entrées de l'index.
+        
+        Args:
+            language: Filtrer par langage (optionnel)
+            
+        Returns:
+            Entrées de l'index, avec leur ID
+        """
+        with self._lock:
+            self.refresh()
+            return [
+                {"id": template_id, **entry}
+                for template_id, entry in self._entries.items()
+                if language is None or entry["language"] == language
+            ]
+    
+    def add(self, template_data: Dict[str, Any], template_file: Path, persist: bool = True):
+        """
+        Enregistre un template qui vient d'être écrit.
+        
+        Args:
+            template_data: Données du template (avec id, name, language, tags)
+            template_file: Fichier JSON du template
+            persist: Écrire l'index sur disque immédiatement
+        """
+        with self._lock:
+            self._ensure_loaded()
+            relative = template_file.relative_to(self.templates_dir).as_posix()
+            self._set_entry(template_data, relative, template_file.stat().st_mtime_ns)
+            
+            # Le répertoire vient d'être modifié par la base elle-même : inutile de le relire
+            language_dir = template_file.parent
+            self._dir_mtimes[language_dir.name] = language_dir.stat().st_mtime_ns
+            
+            self._dirty = True
+            if persist:
+                self._persist()
+    
+    def flush(self):
+        """Écrit l'index sur disque s'il a été modifié."""
+        with self._lock:
+            self._persist()
+    
+    def refresh(self):
+        """Relit les répertoires de langages modifiés depuis la dernière validation."""
+        with self._lock:
+            self._ensure_loaded(refresh=False)
+            if not self.templates_dir.is_dir():
+                return
+            
+            languages = {path.name for path in self.templates_dir.iterdir() if path.is_dir()}
+            
+            for language in set(self._dir_mtimes) - languages:
+                self._drop_language(language)
+            
+            for language in languages:
+                self._scan_language(language)
+            
+            self._persist()
+    
+    def rebuild(self):
+        """Reconstruit entièrement l'index à partir des fichiers."""
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_path.clear()
+            self._dir_mtimes.clear()
+            self._loaded = True
+            self._dirty = True
+            self.refresh()
+    
+    def _ensure_loaded(self, refresh: bool = True):
+        """Charge l'index persisté au premier accès, puis le revalide."""
+        if self._loaded:
+            return
+        self._loaded = True
+        
+        if self.index_file.exists():
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == INDEX_VERSION:
+                    self._entries = data.get("entries", {})
+                    self._dir_mtimes = data.get("dir_mtimes", {})
+                    self._ids_by_path = {entry["path"]: template_id for template_id, entry in self._entries.items()}
+            except (OSError, ValueError, KeyError):
+                # Index illisible : il est reconstruit par la revalidation
+                self._entries, self._dir_mtimes, self._ids_by_path = {}, {}, {}
+        
+        if refresh:
+            self.refresh()
+    
+    def _scan_language(self, language: str, force: bool = False):
+        """Relit un répertoire de langage si sa date de modification a changé."""
+        language_dir = self.templates_dir / language
+        if not language_dir.is_dir():
+            self._drop_language(language)
+            return
+        
+        dir_mtime = language_dir.stat().st_mtime_ns
+        if not force and self._dir_mtimes.get(language) == dir_mtime:
+            return
+        
+        seen = set()
+        with os.scandir(language_dir) as entries:
+            for item in entries:
+                if not item.name.endswith(".json") or not item.is_file():
+                    continue
+                relative = f"{language}/{item.name}"
+                seen.add(relative)
+                
+                mtime = item.stat().st_mtime_ns
+                known_id = self._ids_by_path.get(relative)
+                if known_id and self._entries[known_id]["mtime"] == mtime:
+                    continue
+                
+                data = self._read(Path(item.path))
+                if data is None or not data.get("id"):
+                    self._remove_path(relative)
+                    continue
+                self._set_entry(data, relative, mtime)
+        
+        for relative in [path for path in self._ids_by_path if path.startswith(f"{language}/")]:
+            if relative not in seen:
+                self._remove_path(relative)
+        
+        self._dir_mtimes[language] = dir_mtime
+        self._dirty = True
+    
+    def _set_entry(self, data: Dict[str, Any], relative: str, mtime: int):
+        """Ajoute ou remplace l'entrée d'un fichier."""
+        # Un fichier réécrit sous le même nom remplace le template précédent
+        self._remove_path(relative)
+        previous = self._entries.get(data["id"])
+        if previous is not None:
+            self._ids_by_path.pop(previous["path"], None)
+        
+        self._entries[data["id"]] = {
+            "path": relative,
+            "name": data.get("name"),
+            "language": relative.split("/", 1)[0],
+            "tags": data.get("tags", []),
+            "mtime": mtime
+        }
+        self._ids_by_path[relative] = data["id"]
+    
+    def _remove_path(self, relative: str):
+        """Retire l'entrée associée à un fichier."""
+        template_id = self._ids_by_path.pop(relative, None)
+        if template_id is not None:
+            self._entries.pop(template_id, None)
+    
+    def _drop_language(self, language: str):
+        """Retire toutes les entrées d'un langage."""
+        for relative in [path for path in self._ids_by_path if path.startswith(f"{language}/")]:
+            self._remove_path(relative)
+        self._dir_mtimes.pop(language, None)
+        self._dirty = True
+    
+    def _persist(self):
+        """Écrit l'index de façon atomique."""
+        if not self._dirty or not self.templates_dir.is_dir():
+            return
+        
+        tmp_file = self.index_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "dir_mtimes": self._dir_mtimes,
+                "entries": self._entries
+            }, f, ensure_ascii=False)
+        os.replace(tmp_file, self.index_file)
+        self._dirty = False
+    
+    @staticmethod
+    def _read(template_file: Path) -> Optional[Dict[str, Any]]:
+        """Lit un fichier JSON de template."""
+        try:
+            with open(template_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
@@ -0,0 +1,57 @@
+"""
+Tests du stockage adressé par contenu.
+"""
+
+import hashlib
+
+import pytest
+
+from src.core.blob_store import BlobStore
+
+
+def test_round_trip(tmp_path):
+    blobs = BlobStore(tmp_path / "blobs")
+    content = "print('héllo')\n".encode("utf-8") * 100
+    
+    digest = blobs.put(content)
+    
+    assert digest == hashlib.sha256(content).hexdigest()
+    assert blobs.exists(digest)
+    assert blobs.get(digest) == content
+
+
+def test_sharded_layout_and_compression(tmp_path):
+    blobs = BlobStore(tmp_path / "blobs")
+    content = b"a" * 10000
+    
+    digest = blobs.put(content)
+    
+    blob_file = tmp_path / "blobs" / digest[:2] / digest
+    assert blobs.path(digest) == blob_file
+    assert blob_file.is_file()
+    assert blob_file.stat().st_size < len(content)
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    blobs = BlobStore(tmp_path / "blobs")
+    
+    first = blobs.put(b"same")
+    second = blobs.put(b"same")
+    
+    assert first == second
+    assert [path.name for path in (tmp_path / "blobs").rglob("*") if path.is_file()] == [first]
+
+
+def test_empty_content(tmp_path):
+    blobs = BlobStore(tmp_path / "blobs")
+    
+    assert blobs.get(blobs.put(b"")) == b""
+
+
+def test_missing_blob(tmp_path):
+    blobs = BlobStore(tmp_path / "blobs")
+    digest = BlobStore.digest(b"absent")
+    
+    assert not blobs.exists(digest)
+    with pytest.raises(FileNotFoundError):
+        blobs.get(digest)
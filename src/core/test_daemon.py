@@ -0,0 +1,68 @@
+"""
+Tests du protocole du démon (lignes JSON sur le socket).
+"""
+
+import json
+import socket
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.daemon import JarvisDaemon, _RequestHandler
+
+
+class NullLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class ParallelBuildAgent:
+    """Agent simulé dont build appelle on_chunk depuis plusieurs threads, comme Builder."""
+    
+    logger = NullLogger()
+    
+    def __init__(self, files=4, chunks=20, chunk_size=50000):
+        self.files = files
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+    
+    def build(self, request, output_dir=None, on_chunk=None):
+        def produce(file_name):
+            for number in range(self.chunks):
+                on_chunk(file_name, f"{file_name}:{number}:" + "x" * self.chunk_size)
+        
+        threads = [threading.Thread(target=produce, args=(f"file{index}.html",)) for index in range(self.files)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {"files": self.files}
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="sockets Unix indisponibles")
+def test_concurrent_chunks_are_sent_as_whole_lines(tmp_path):
+    agent = ParallelBuildAgent()
+    server = SimpleNamespace(jarvis_daemon=JarvisDaemon(agent, tmp_path / "jarvis.sock"))
+    client, served = socket.socketpair()
+    
+    handler = threading.Thread(target=_RequestHandler, args=(served, "", server), daemon=True)
+    handler.start()
+    client.sendall(json.dumps({"method": "build", "params": {"request": "site"}}).encode("utf-8") + b"\n")
+    
+    # Lecture ligne par ligne, comme la CLI, jusqu'à l'événement final
+    messages = []
+    with client.makefile("rb") as reader:
+        while not messages or messages[-1]["event"] == "chunk":
+            messages.append(json.loads(reader.readline()))
+    handler.join(10)
+    client.close()
+    served.close()
+    
+    chunks = [message for message in messages if message["event"] == "chunk"]
+    assert messages[-1] == {"event": "result", "data": {"files": 4}}
+    assert len(chunks) == agent.files * agent.chunks
+    for file_index in range(agent.files):
+        file_name = f"file{file_index}.html"
+        numbers = [int(message["data"].split(":")[1]) for message in chunks if message["file"] == file_name]
+        assert numbers == list(range(agent.chunks))
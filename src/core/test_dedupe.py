@@ -0,0 +1,62 @@
+"""
+Tests de la détection et de la fusion des solutions quasi identiques.
+"""
+
+import numpy as np
+import pytest
+
+from src.core.dedupe import cosine_similarities, group_by_similarity, jaccard, merge_solution_records
+
+
+def test_jaccard():
+    assert jaccard({"a", "b"}, {"a", "b"}) == 1.0
+    assert jaccard({"a", "b"}, {"b", "c"}) == pytest.approx(1 / 3)
+    assert jaccard({"a"}, {"b"}) == 0.0
+    assert jaccard(set(), set()) == 1.0
+
+
+def test_cosine_similarities_ignore_norm():
+    similarities = cosine_similarities(np.array([1.0, 0.0]), np.array([[2.0, 0.0], [0.0, 3.0], [0.0, 0.0]]))
+    
+    assert similarities == pytest.approx([1.0, 0.0, 0.0])
+
+
+def vectors_at_angles(degrees):
+    radians = np.radians(degrees)
+    return np.stack([np.cos(radians), np.sin(radians)], axis=1)
+
+
+@pytest.mark.parametrize("block_size", [1, 2, 1024])
+def test_group_by_similarity_threshold(block_size):
+    # cos(10°) ≈ 0.985, cos(20°) ≈ 0.940
+    ids = ["s1", "s2", "s3", "s4"]
+    vectors = vectors_at_angles([0, 10, 20, 90])
+    
+    assert group_by_similarity(ids, vectors, 0.95, block_size) == {"s1": ["s2"]}
+    assert group_by_similarity(ids, vectors, 0.93, block_size) == {"s1": ["s2", "s3"]}
+    assert group_by_similarity(ids, vectors, 0.99, block_size) == {}
+
+
+def test_group_by_similarity_keeps_oldest_and_merges_once():
+    # s2 est proche de s1 et de s3, mais s3 n'est pas assez proche de s1
+    ids = ["s1", "s2", "s3"]
+    vectors = vectors_at_angles([0, 10, 20])
+    
+    assert group_by_similarity(ids, vectors, 0.95) == {"s1": ["s2"]}
+
+
+def test_merge_solution_records():
+    keeper = {"id": "s1", "solution": "garder", "tags": ["db"], "occurrences": 2,
+              "created_at": "2026-01-01T10:00:00"}
+    duplicates = [
+        {"id": "s2", "solution": "autre", "tags": ["db", "postgres"], "created_at": "2026-01-03T10:00:00"},
+        {"id": "s3", "tags": ["timeout"], "occurrences": 3, "last_seen_at": "2026-01-02T10:00:00"},
+    ]
+    
+    merged = merge_solution_records(keeper, duplicates)
+    
+    assert merged["solution"] == "garder"
+    assert merged["occurrences"] == 6
+    assert merged["tags"] == ["db", "postgres", "timeout"]
+    assert merged["last_seen_at"] == "2026-01-03T10:00:00"
+    assert keeper["occurrences"] == 2
@@ -0,0 +1,52 @@
+"""
+Tests de la fonction d'embedding mise en cache.
+"""
+
+from src.core.cache import PersistentLRUCache
+from src.core.embeddings import CachedEmbeddingFunction
+
+
+class FakeModel:
+    """Modèle simulé : un vecteur par texte, chaque appel est compté."""
+    
+    def __init__(self):
+        self.calls = []
+    
+    def __call__(self, input):
+        self.calls.append(list(input))
+        return [[float(len(text)), 1.0] for text in input]
+    
+    def embed_query(self, input):
+        return self(input)
+    
+    @staticmethod
+    def name():
+        return "fake"
+    
+    def get_config(self):
+        return {}
+
+
+def test_cached_texts_are_not_embedded_again():
+    model = FakeModel()
+    function = CachedEmbeddingFunction(model, cache=PersistentLRUCache(None), batch_size=2)
+    
+    first = function(["a", "bb", "a", "ccc"])
+    second = function(["bb", "dddd"])
+    
+    assert model.calls == [["a", "bb"], ["ccc"], ["dddd"]]
+    assert [vector[0] for vector in first] == [1, 2, 1, 3]
+    assert [vector[0] for vector in second] == [2, 4]
+    assert function.stats()["cache_hits"] == 1
+
+
+def test_build_from_config_rebuilds_the_wrapper():
+    original = CachedEmbeddingFunction.build_from_config({})
+    
+    rebuilt = CachedEmbeddingFunction.build_from_config(original.get_config())
+    
+    assert isinstance(rebuilt, CachedEmbeddingFunction)
+    assert rebuilt.name() == original.name() == "default"
+    assert rebuilt.get_config() == original.get_config()
+    assert rebuilt.cache is not None
+    assert not rebuilt.is_legacy()
@@ -0,0 +1,66 @@
+"""
+Tests des identifiants ULID de la base de connaissances.
+"""
+
+from datetime import datetime
+
+from src.core.ids import ULID_LENGTH, make_id, new_ulid, split_id, ulid_datetime
+
+
+def test_ulid_format():
+    ulid = new_ulid()
+    
+    assert len(ulid) == ULID_LENGTH
+    assert split_id(f"solution_{ulid}") == ("solution", ulid)
+
+
+def test_ulids_are_strictly_increasing_within_a_process():
+    ulids = [new_ulid() for _ in range(5000)]
+    
+    assert ulids == sorted(ulids)
+    assert len(set(ulids)) == len(ulids)
+
+
+def test_ulids_sort_by_timestamp():
+    older = new_ulid(timestamp=1_700_000_000.0)
+    newer = new_ulid(timestamp=1_700_000_000.001)
+    
+    assert older < newer
+    assert new_ulid(timestamp=1_600_000_000.0) < older
+
+
+def test_seeded_ulid_is_deterministic():
+    first = new_ulid(timestamp=1_700_000_000.0, seed="solution_20240101_120000")
+    second = new_ulid(timestamp=1_700_000_000.0, seed="solution_20240101_120000")
+    other = new_ulid(timestamp=1_700_000_000.0, seed="solution_20240101_120001")
+    
+    assert first == second
+    assert first != other
+    # Même date : seul l'aléa (dérivé de la graine) diffère
+    assert first[:10] == other[:10]
+
+
+def test_ulid_datetime_round_trip():
+    created = datetime(2026, 3, 14, 15, 9, 26, 535000)
+    ulid = new_ulid(timestamp=created.timestamp())
+    
+    assert ulid_datetime(ulid) == created
+
+
+def test_make_id_prefix():
+    identifier = make_id("template")
+    
+    prefix, ulid = split_id(identifier)
+    assert prefix == "template"
+    assert identifier == f"template_{ulid}"
+
+
+def test_split_id_rejects_other_formats():
+    # Ancien format daté : conservé tel quel jusqu'à la migration
+    assert split_id("solution_20240101_120000") is None
+    assert split_id("solution") is None
+    assert split_id("01J9Z3QK8M5V6W7X8Y9Z0A1B2C") is None
+    # Caractères exclus du base32 de Crockford (I, L, O, U)
+    assert split_id("solution_01J9Z3QK8M5V6W7X8Y9Z0A1B2I") is None
+    # Premier caractère limité à 7 (48 bits d'horodatage)
+    assert split_id("solution_81J9Z3QK8M5V6W7X8Y9Z0A1B2C") is None
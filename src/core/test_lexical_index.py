@@ -0,0 +1,105 @@
+"""
+Tests de l'index lexical (découpage des termes, classement BM25, écriture différée).
+"""
+
+import json
+import time
+
+from src.core.lexical_index import LexicalIndex, fold, tokenize
+
+
+def test_fold_removes_accents_and_case():
+    assert fold("Élève À l'ÉCOLE, garçon") == "eleve a l'ecole, garcon"
+
+
+def test_tokenize_folds_accents_and_drops_stopwords():
+    assert tokenize("Le serveur a redémarré après la mise à jour") == [
+        "serveur", "redemarre", "apres", "mise", "jour"
+    ]
+
+
+def test_tokenize_splits_compound_identifiers():
+    assert tokenize("numpy.linalg ERR_CONNECTION_REFUSED src/app-main") == [
+        "numpy.linalg", "numpy", "linalg",
+        "err_connection_refused", "err", "connection", "refused",
+        "src/app-main", "src", "app", "main",
+    ]
+
+
+def test_tokenize_keeps_stopwords_out_of_compound_parts():
+    assert tokenize("the_end") == ["the_end", "end"]
+
+
+def test_search_orders_by_bm25(tmp_path):
+    index = LexicalIndex(tmp_path / "index.json")
+    index.add("rare", "ECONNREFUSED postgres port 5432")
+    index.add("frequent", "postgres postgres postgres lent")
+    index.add("other", "certificat nginx expiré")
+    index.add("long", "postgres " + " ".join(f"mot{number}" for number in range(50)))
+    
+    results = index.search("econnrefused postgres")
+    
+    # Le terme rare l'emporte ; à terme égal, le document court passe devant le long
+    assert [doc_id for doc_id, _ in results] == ["rare", "frequent", "long"]
+    assert results[0][1] > results[1][1] > results[2][1] > 0
+
+
+def test_search_matches_accent_insensitively_and_filters(tmp_path):
+    index = LexicalIndex(tmp_path / "index.json")
+    index.add("fr", "Échec de la connexion à la base", meta={"language": "python"})
+    index.add("js", "echec connexion websocket", meta={"language": "javascript"})
+    
+    assert {doc_id for doc_id, _ in index.search("echec connexion")} == {"fr", "js"}
+    assert [doc_id for doc_id, _ in index.search("ÉCHEC", where={"language": "python"})] == ["fr"]
+
+
+def test_replace_and_remove(tmp_path):
+    index = LexicalIndex(tmp_path / "index.json")
+    index.add("doc", "ancien texte")
+    index.add("doc", "nouveau contenu")
+    
+    assert index.search("ancien") == []
+    assert [doc_id for doc_id, _ in index.search("nouveau")] == ["doc"]
+    
+    index.remove("doc")
+    assert len(index) == 0
+
+
+def read_docs(index_path):
+    with open(index_path, encoding="utf-8") as f:
+        return json.load(f)["docs"]
+
+
+def test_immediate_persistence_without_delay(tmp_path):
+    index = LexicalIndex(tmp_path / "index.json")
+    index.add("doc", "texte")
+    
+    assert set(read_docs(tmp_path / "index.json")) == {"doc"}
+
+
+def test_delayed_persistence_batches_writes(tmp_path):
+    index_path = tmp_path / "index.json"
+    index = LexicalIndex(index_path, flush_delay=0.2)
+    
+    for number in range(20):
+        index.add(f"doc{number}", f"texte {number}")
+    
+    # Rien n'est écrit avant le délai, mais l'index en mémoire est à jour
+    assert not index_path.exists()
+    assert len(index) == 20
+    
+    deadline = time.monotonic() + 5
+    while not index_path.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert len(read_docs(index_path)) == 20
+
+
+def test_flush_writes_pending_changes(tmp_path):
+    index_path = tmp_path / "index.json"
+    index = LexicalIndex(index_path, flush_delay=60)
+    index.add("doc", "texte")
+    
+    index.flush()
+    
+    assert set(read_docs(index_path)) == {"doc"}
+    assert [doc_id for doc_id, _ in LexicalIndex(index_path).search("texte")] == ["doc"]
@@ -0,0 +1,64 @@
+"""
+Tests du streaming de LLMClient et de la limite de requêtes simultanées.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.config import Config
+from src.core.llm import LLMClient
+
+
+class FakeStream:
+    """Flux OpenAI simulé : un fragment par élément, fermeture comptée."""
+    
+    def __init__(self, pieces):
+        self.pieces = pieces
+        self.closed = False
+    
+    def __iter__(self):
+        for piece in self.pieces:
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+    
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    config = Config()
+    config.knowledge_base.path = str(tmp_path / "kb")
+    config.llm.max_concurrent_requests = 1
+    llm = LLMClient(config)
+    llm.streams = []
+    
+    def create(**kwargs):
+        stream = FakeStream(["un ", "deux ", "trois"])
+        llm.streams.append(stream)
+        return stream
+    
+    llm.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    return llm
+
+
+def test_stream_read_to_the_end_releases_its_slot(client):
+    assert "".join(client.chat_stream([{"role": "user", "content": "compte"}], use_cache=False)) == "un deux trois"
+    
+    assert client.streams[0].closed
+    assert client._in_flight.acquire(blocking=False)
+    client._in_flight.release()
+
+
+def test_abandoned_stream_releases_its_slot(client):
+    stream = client.chat_stream([{"role": "user", "content": "compte"}], use_cache=False)
+    assert next(stream) == "un "
+    
+    # La seule place est occupée tant que le flux est ouvert
+    assert not client._in_flight.acquire(blocking=False)
+    
+    stream.close()
+    assert client.streams[0].closed
+    assert client._in_flight.acquire(blocking=False)
+    client._in_flight.release()
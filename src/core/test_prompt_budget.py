@@ -0,0 +1,175 @@
+"""
+Tests du budget de tokens des prompts.
+"""
+
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.prompt_budget import MIN_SHARE_TOKENS, TRUNCATION_MARKER, PromptBudget, Tokenizer
+
+
+CODE = "\n".join(
+    f"def function_{number}(value):\n    \"\"\"Calcule la valeur {number}.\"\"\"\n    return value * {number}\n"
+    for number in range(60)
+)
+PROSE = ("Le serveur refuse la connexion au démarrage, puis accepte les requêtes suivantes. " * 40).strip()
+LONG_LINE = "step. " * 800
+
+
+@pytest.fixture
+def tokenizer(monkeypatch):
+    # Sans tiktoken : estimation locale
+    monkeypatch.setitem(sys.modules, "tiktoken", None)
+    return Tokenizer("gpt-4.1-mini")
+
+
+def make_budget(tokenizer, context_window=1000, prompt_budget=500, max_tokens=200, max_output_tokens=400):
+    config = SimpleNamespace(llm=SimpleNamespace(
+        model="gpt-4.1-mini",
+        context_window=context_window,
+        prompt_budget=prompt_budget,
+        max_tokens=max_tokens,
+        max_output_tokens=max_output_tokens
+    ))
+    return PromptBudget(config, tokenizer)
+
+
+def test_fallback_estimate_without_tiktoken(tokenizer):
+    assert not tokenizer.exact
+    assert tokenizer.count("") == 0
+    assert tokenizer.count("hello world") == 2
+    # Les mots longs comptent plusieurs tokens, chaque signe de ponctuation un
+    assert tokenizer.count("anticonstitutionnellement") > 1
+    assert tokenizer.count("a.b(c)") == 6
+    assert tokenizer.count(CODE) > tokenizer.count(CODE[:len(CODE) // 2])
+
+
+def test_count_messages_adds_overhead(tokenizer):
+    messages = [{"role": "system", "content": "hello"}, {"role": "user", "content": "world"}]
+    
+    assert tokenizer.count_messages(messages) > tokenizer.count("hello") + tokenizer.count("world")
+
+
+@pytest.mark.parametrize("text", [CODE, PROSE, LONG_LINE, "court"])
+@pytest.mark.parametrize("max_tokens", [0, 3, 10, 40, 150, 1000])
+def test_truncate_fits_within_max_tokens(tokenizer, text, max_tokens):
+    truncated = tokenizer.truncate(text, max_tokens)
+    
+    assert tokenizer.count(truncated) <= max_tokens
+    if tokenizer.count(text) <= max_tokens:
+        assert truncated == text
+    elif truncated:
+        assert truncated.endswith(TRUNCATION_MARKER)
+        assert text.startswith(truncated[:-len(TRUNCATION_MARKER)])
+
+
+def test_truncate_cuts_code_between_blocks(tokenizer):
+    truncated = tokenizer.truncate(CODE, 100)
+    kept = truncated[:-len(TRUNCATION_MARKER)]
+    
+    # La coupure tombe avant une définition, jamais au milieu d'une fonction
+    assert kept.rstrip().endswith("return value * " + kept.rstrip().rsplit("* ", 1)[1])
+    assert CODE[len(kept):].lstrip("\n").startswith("def ")
+
+
+def test_truncate_cuts_inside_long_line(tokenizer):
+    truncated = tokenizer.truncate("Titre\n" + LONG_LINE, 100)
+    
+    # Une ligne trop longue est coupée plutôt qu'omise entièrement
+    assert tokenizer.count(truncated) > 50
+    assert truncated.startswith("Titre\nstep.")
+
+
+def test_allocate_keeps_short_texts_and_redistributes(tokenizer):
+    budget = make_budget(tokenizer)
+    short, long_a, long_b = "court", PROSE, CODE
+    
+    shares = budget.allocate([short, long_a, long_b], 300)
+    
+    assert shares[0] == tokenizer.count(short)
+    # Le reste est partagé entre les textes longs
+    assert abs(shares[1] - shares[2]) <= 1
+    assert sum(shares) <= 300
+    assert sum(shares) >= 300 - len(shares)
+
+
+def test_allocate_respects_weights(tokenizer):
+    budget = make_budget(tokenizer)
+    
+    shares = budget.allocate([PROSE, CODE], 300, weights=[2, 1])
+    
+    assert shares[0] == pytest.approx(2 * shares[1], abs=1)
+
+
+@pytest.mark.parametrize("total", [0, 1, 17, 300, 100000])
+def test_allocate_bounds(tokenizer, total):
+    budget = make_budget(tokenizer)
+    texts = ["", "court", PROSE, CODE, LONG_LINE]
+    
+    shares = budget.allocate(texts, total, weights=[1, 3, 1, 2, 1])
+    
+    assert sum(shares) <= total
+    for text, share in zip(texts, shares):
+        assert 0 <= share <= tokenizer.count(text)
+    if total >= sum(tokenizer.count(text) for text in texts):
+        assert shares == [tokenizer.count(text) for text in texts]
+
+
+def test_allocate_negative_budget(tokenizer):
+    assert make_budget(tokenizer).allocate([PROSE], -10) == [0]
+
+
+def test_fit_stays_within_budget(tokenizer):
+    budget = make_budget(tokenizer)
+    texts = ["court", PROSE, CODE]
+    
+    fitted = budget.fit(texts, 300)
+    
+    assert fitted[0] == "court"
+    assert sum(tokenizer.count(text) for text in fitted) <= 300
+
+
+def test_fit_drops_tiny_shares(tokenizer):
+    fitted = make_budget(tokenizer).fit([PROSE, CODE], MIN_SHARE_TOKENS)
+    
+    assert fitted == ["", ""]
+
+
+def test_remaining(tokenizer):
+    budget = make_budget(tokenizer, prompt_budget=500)
+    messages = [{"role": "user", "content": PROSE}]
+    
+    assert budget.remaining([]) == 500 - tokenizer.count_messages([])
+    assert budget.remaining(messages) == max(0, 500 - tokenizer.count_messages(messages))
+
+
+@pytest.mark.parametrize("expected", [None, 50, 350, 5000])
+@pytest.mark.parametrize("content", ["court", PROSE, CODE])
+def test_output_tokens_never_exceeds_window(tokenizer, expected, content):
+    budget = make_budget(tokenizer, context_window=1200, max_tokens=200, max_output_tokens=400)
+    messages = [{"role": "user", "content": content}]
+    room = 1200 - tokenizer.count_messages(messages)
+    
+    tokens = budget.output_tokens(messages, expected)
+    
+    assert 1 <= tokens <= 400
+    if room >= 1:
+        assert tokens <= room
+    assert tokens == max(1, min(expected if expected is not None else 200, 400, room))
+
+
+def test_output_tokens_when_prompt_fills_window(tokenizer):
+    budget = make_budget(tokenizer, context_window=100)
+    
+    # Le minimum accepté par l'API : la requête échouera de toute façon côté modèle
+    assert budget.output_tokens([{"role": "user", "content": CODE}]) == 1
+
+
+def test_rewrite_tokens_scale_with_code(tokenizer):
+    budget = make_budget(tokenizer, max_tokens=1000)
+    
+    # Jamais moins que max_tokens, et le code entier plus une marge au-delà
+    assert budget.rewrite_tokens("x = 1") == 1000
+    assert budget.rewrite_tokens(CODE) > tokenizer.count(CODE)
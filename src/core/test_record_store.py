@@ -0,0 +1,59 @@
+"""
+Tests du stockage SQLite des enregistrements.
+"""
+
+import json
+import sqlite3
+
+from src.core.record_store import SqliteRecordStore
+
+
+def history(history_id, project_name, created_at):
+    return {"id": history_id, "project_name": project_name, "created_at": created_at, "files": {}}
+
+
+def test_latest_id_per_project(tmp_path):
+    store = SqliteRecordStore(tmp_path / "kb.db")
+    store.put_many("history", [
+        history("a1", "alpha", "2026-01-01T10:00:00"),
+        history("b1", "beta", "2026-01-03T10:00:00"),
+        history("a2", "alpha", "2026-01-02T10:00:00"),
+    ])
+    
+    assert store.latest_id("history", "alpha") == "a2"
+    assert store.latest_id("history", "beta") == "b1"
+    assert store.latest_id("history", "gamma") is None
+
+
+def test_iter_records_filters_by_project(tmp_path):
+    store = SqliteRecordStore(tmp_path / "kb.db")
+    store.put_many("history", [
+        history("a2", "alpha", "2026-01-02T10:00:00"),
+        history("b1", "beta", "2026-01-03T10:00:00"),
+        history("a1", "alpha", "2026-01-01T10:00:00"),
+    ])
+    
+    assert [record["id"] for record in store.iter_records("history", project="alpha")] == ["a1", "a2"]
+    assert len(list(store.iter_records("history"))) == 3
+
+
+def test_existing_database_gets_project_column(tmp_path):
+    db_path = tmp_path / "kb.db"
+    conn = sqlite3.connect(str(db_path))
+    conn.executescript("""
+        CREATE TABLE records (
+            rowid INTEGER PRIMARY KEY, kind TEXT NOT NULL, id TEXT NOT NULL,
+            language TEXT, created_at TEXT, data TEXT NOT NULL, UNIQUE (kind, id)
+        );
+    """)
+    record = history("a1", "alpha", "2026-01-01T10:00:00")
+    conn.execute(
+        "INSERT INTO records (kind, id, created_at, data) VALUES (?, ?, ?, ?)",
+        ("history", "a1", record["created_at"], json.dumps(record))
+    )
+    conn.commit()
+    conn.close()
+    
+    store = SqliteRecordStore(db_path)
+    
+    assert store.latest_id("history", "alpha") == "a1"
@@ -3,10 +3,20 @@ Module Builder - Construction d'outils informatiques.
 """
 
 import os
+import re
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from jinja2 import Environment, FileSystemLoader
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+
+
+# Première ligne d'une réponse sans balise qui est clairement du code (et non une phrase d'introduction)
+_CODE_START = re.compile(
+    r"\s*(?:<[!?/a-zA-Z]|[{\[]|/[/*]|#!|@[a-z-]+\b"
+    r"|(?:import|from|export|const|let|var|function|class|def|async|package|use|require)\b"
+    r"|[^\s:]+(?:\s+[^\s:]+)*\s*\{\s*$)"
+)
 
 
 class Builder:
@@ -31,11 +41,20 @@ class Builder:
         self.templates_dir = Path(__file__).parent.parent / "templates"
         self.templates_dir.mkdir(parents=True, exist_ok=True)
         
-        # Environnement Jinja2
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(str(self.templates_dir)),
-            autoescape=False
-        )
+        # Environnement Jinja2, créé au premier accès
+        self._jinja_env = None
+    
+    @property
+    def jinja_env(self):
+        """Environnement Jinja2 des templates du Builder."""
+        if self._jinja_env is None:
+            from jinja2 import Environment, FileSystemLoader
+            
+            self._jinja_env = Environment(
+                loader=FileSystemLoader(str(self.templates_dir)),
+                autoescape=False
+            )
+        return self._jinja_env
     
     def analyze_request(self, request: str) -> Dict[str, Any]:
         """
@@ -103,7 +122,8 @@ Retourne ta réponse au format JSON avec les clés suivantes :
             }
     
     def build_website_static(self, project_name: str, description: str,
-                           features: List[str], output_dir: str) -> Dict[str, Any]:
+                           features: List[str], output_dir: str,
+                           on_chunk: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
         """
         Construit un site web statique.
         
@@ -112,6 +132,8 @@ Retourne ta réponse au format JSON avec les clés suivantes :
             description: Description du site
             features: Fonctionnalités demandées
             output_dir: Répertoire de sortie
+            on_chunk: Fonction appelée avec (nom de fichier, fragment) pendant la génération,
+                depuis les threads du pool : elle doit être thread-safe
             
         Returns:
             Résultat de la construction
@@ -121,8 +143,7 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         
-        # Générer le HTML
-        self.logger.action("Génération du HTML...")
+        # Préparer les fichiers à générer : leurs prompts sont indépendants
         html_prompt = f"""Crée un site web HTML5 complet et moderne pour :
 
 Nom du projet : {project_name}
@@ -138,20 +159,6 @@ Le site doit :
 
 Retourne uniquement le code HTML complet."""
         
-        html_content = self.llm.generate_code(html_prompt, "html")
-        
-        # Nettoyer le code (enlever les balises markdown si présentes)
-        html_content = self._clean_code(html_content, "html")
-        
-        # Sauvegarder le fichier HTML
-        html_file = output_path / "index.html"
-        with open(html_file, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        
-        self.logger.success(f"HTML généré : {html_file}")
-        
-        # Générer le CSS
-        self.logger.action("Génération du CSS...")
         css_prompt = f"""Crée un fichier CSS moderne pour le site web "{project_name}".
 
 Le design doit :
@@ -163,19 +170,13 @@ Le design doit :
 
 Retourne uniquement le code CSS."""
         
-        css_content = self.llm.generate_code(css_prompt, "css")
-        css_content = self._clean_code(css_content, "css")
-        
-        # Sauvegarder le fichier CSS
-        css_file = output_path / "style.css"
-        with open(css_file, 'w', encoding='utf-8') as f:
-            f.write(css_content)
-        
-        self.logger.success(f"CSS généré : {css_file}")
+        assets = [
+            ("HTML", html_prompt, "html", output_path / "index.html"),
+            ("CSS", css_prompt, "css", output_path / "style.css")
+        ]
         
         # Générer le JavaScript si nécessaire
         if any(keyword in ' '.join(features).lower() for keyword in ['interactif', 'dynamique', 'animation']):
-            self.logger.action("Génération du JavaScript...")
             js_prompt = f"""Crée un fichier JavaScript pour ajouter de l'interactivité au site "{project_name}".
 
 Fonctionnalités : {', '.join(features)}
@@ -188,14 +189,11 @@ Le JavaScript doit :
 
 Retourne uniquement le code JavaScript."""
             
-            js_content = self.llm.generate_code(js_prompt, "javascript")
-            js_content = self._clean_code(js_content, "javascript")
-            
-            js_file = output_path / "script.js"
-            with open(js_file, 'w', encoding='utf-8') as f:
-                f.write(js_content)
-            
-            self.logger.success(f"JavaScript généré : {js_file}")
+            assets.append(("JavaScript", js_prompt, "javascript", output_path / "script.js"))
+        
+        generated = self._generate_files_parallel(assets, on_chunk)
+        html_content = generated["index.html"]
+        css_content = generated["style.css"]
         
         # Créer un README
         readme_content = f"""# {project_name}
@@ -259,7 +257,8 @@ Agent AMIKAL - {self._get_timestamp()}
         }
     
     def build_api_rest(self, project_name: str, description: str,
-                      endpoints: List[Dict[str, str]], output_dir: str) -> Dict[str, Any]:
+                      endpoints: List[Dict[str, str]], output_dir: str,
+                      on_chunk: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
         """
         Construit une API REST avec FastAPI.
         
@@ -268,6 +267,7 @@ Agent AMIKAL - {self._get_timestamp()}
             description: Description de l'API
             endpoints: Liste des endpoints à créer
             output_dir: Répertoire de sortie
+            on_chunk: Fonction appelée avec (nom de fichier, fragment) pendant la génération
             
         Returns:
             Résultat de la construction
@@ -303,13 +303,8 @@ L'API doit :
 
 Retourne uniquement le code Python complet pour main.py."""
         
-        api_content = self.llm.generate_code(api_prompt, "python")
-        api_content = self._clean_code(api_content, "python")
-        
-        # Sauvegarder le fichier principal
         main_file = output_path / "main.py"
-        with open(main_file, 'w', encoding='utf-8') as f:
-            f.write(api_content)
+        api_content = self._generate_file(api_prompt, "python", main_file, on_chunk)
         
         self.logger.success(f"API générée : {main_file}")
         
@@ -383,7 +378,8 @@ Agent AMIKAL - {self._get_timestamp()}
         }
     
     def build_cli_tool(self, project_name: str, description: str,
-                      commands: List[Dict[str, str]], output_dir: str) -> Dict[str, Any]:
+                      commands: List[Dict[str, str]], output_dir: str,
+                      on_chunk: Optional[Callable[[str, str], None]] = None) -> Dict[str, Any]:
         """
         Construit un outil CLI en Python.
         
@@ -392,6 +388,7 @@ Agent AMIKAL - {self._get_timestamp()}
             description: Description de l'outil
             commands: Liste des commandes à créer
             output_dir: Répertoire de sortie
+            on_chunk: Fonction appelée avec (nom de fichier, fragment) pendant la génération
             
         Returns:
             Résultat de la construction
@@ -426,13 +423,8 @@ L'outil doit :
 
 Retourne uniquement le code Python complet."""
         
-        cli_content = self.llm.generate_code(cli_prompt, "python")
-        cli_content = self._clean_code(cli_content, "python")
-        
-        # Sauvegarder le fichier principal
         main_file = output_path / f"{project_name}.py"
-        with open(main_file, 'w', encoding='utf-8') as f:
-            f.write(cli_content)
+        cli_content = self._generate_file(cli_prompt, "python", main_file, on_chunk)
         
         # Rendre le fichier exécutable
         os.chmod(main_file, 0o755)
@@ -502,6 +494,150 @@ Agent AMIKAL - {self._get_timestamp()}
             "files": [f"{project_name}.py", "requirements.txt", "README.md"]
         }
     
+    def _generate_files_parallel(self, assets: List[Tuple[str, str, str, Path]],
+                                 on_chunk: Optional[Callable[[str, str], None]] = None) -> Dict[str, str]:
+        """
+        Génère plusieurs fichiers indépendants en parallèle.
+        
+        Args:
+            assets: Liste de tuples (libellé, prompt, langage, fichier de destination)
+            on_chunk: Fonction appelée avec (nom de fichier, fragment) pendant la génération,
+                simultanément depuis plusieurs threads du pool
+            
+        Returns:
+            Dictionnaire {nom de fichier: contenu généré}
+        """
+        max_workers = max(1, min(self.config.performance.builder_max_workers, len(assets)))
+        
+        for label, _, _, _ in assets:
+            self.logger.action(f"Génération du {label}...")
+        
+        generated = {}
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="builder") as executor:
+            futures = {
+                executor.submit(self._generate_file, prompt, language, file_path, on_chunk): (label, file_path)
+                for label, prompt, language, file_path in assets
+            }
+            
+            for future in as_completed(futures):
+                label, file_path = futures[future]
+                generated[file_path.name] = future.result()
+                self.logger.success(f"{label} généré : {file_path}")
+        
+        return generated
+    
+    def _generate_file(self, prompt: str, language: str, file_path: Path,
+                       on_chunk: Optional[Callable[[str, str], None]] = None) -> str:
+        """
+        Génère un fichier en écrivant le code sur disque au fil du flux LLM.
+        
+        Args:
+            prompt: Prompt de génération
+            language: Langage du code
+            file_path: Fichier de destination
+            on_chunk: Fonction appelée avec (nom de fichier, fragment) à chaque écriture,
+                dans le thread qui génère le fichier (un thread du pool pour le site statique)
+            
+        Returns:
+            Contenu final du fichier
+        """
+        # Fermer le flux si l'écriture échoue : il occupe une place de requête LLM
+        with closing(self.llm.generate_code_stream(prompt, language)) as chunks, \
+                open(file_path, 'w', encoding='utf-8') as f:
+            for piece in self._clean_code_stream(chunks):
+                f.write(piece)
+                f.flush()
+                if on_chunk:
+                    on_chunk(file_path.name, piece)
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    
+    def _clean_code_stream(self, chunks: Iterator[str]) -> Iterator[str]:
+        """
+        Équivalent incrémental de _clean_code : retire le texte qui précède
+        la balise markdown d'ouverture et s'arrête à la balise de fermeture.
+        
+        Le flux est retenu jusqu'à la balise d'ouverture, ou jusqu'à une
+        première ligne qui est clairement du code (réponse sans balise) ;
+        une réponse qui commence par une phrase sans jamais ouvrir de balise
+        n'est écrite qu'à la fin.
+        
+        Args:
+            chunks: Fragments produits par le LLM
+            
+        Yields:
+            Fragments de code nettoyés
+        """
+        buffer = ""
+        opened = False
+        prose = False
+        emitted = False
+        closed = False
+        
+        for chunk in chunks:
+            # Le flux est consommé jusqu'au bout pour que la réponse soit mise en cache
+            if closed:
+                continue
+            
+            buffer += chunk
+            
+            if not opened:
+                fence = buffer.find("```")
+                if fence != -1:
+                    # Le texte avant la balise est abandonné, la ligne de la balise (langage) aussi
+                    rest = buffer[fence + 3:]
+                    if "\n" not in rest:
+                        continue
+                    buffer = rest.split("\n", 1)[1]
+                else:
+                    stripped = buffer.lstrip()
+                    if prose or "\n" not in stripped:
+                        continue
+                    if not _CODE_START.match(stripped.split("\n", 1)[0]):
+                        # Phrase d'introduction : attendre la balise ou la fin de la réponse
+                        prose = True
+                        continue
+                    buffer = stripped
+                opened = True
+            
+            if not emitted:
+                buffer = buffer.lstrip()
+                if not buffer:
+                    continue
+            
+            fence = buffer.find("```")
+            if fence != -1:
+                tail = buffer[:fence].rstrip()
+                if tail:
+                    yield tail
+                buffer = ""
+                closed = True
+                continue
+            
+            # Conserver un éventuel début de balise et les espaces qui le précèdent
+            safe_end = len(buffer)
+            while safe_end > 0 and len(buffer) - safe_end < 2 and buffer[safe_end - 1] == "`":
+                safe_end -= 1
+            safe_end = len(buffer[:safe_end].rstrip())
+            if safe_end > 0:
+                yield buffer[:safe_end]
+                buffer = buffer[safe_end:]
+                emitted = True
+        
+        if not opened:
+            # Balise sans saut de ligne, ou réponse retenue jusqu'au bout
+            fence = buffer.find("```")
+            if fence != -1:
+                rest = buffer[fence + 3:]
+                buffer = rest.split("\n", 1)[1] if "\n" in rest else rest
+                buffer = buffer.split("```")[0]
+        
+        if not closed:
+            tail = buffer.strip() if not emitted else buffer.rstrip()
+            if tail:
+                yield tail
+    
     def _clean_code(self, code: str, language: str) -> str:
         """
         Nettoie le code généré (enlève les balises markdown).
@@ -5,9 +5,26 @@ Module Fixer - Intervention sur l'environnement local pour réparer et maintenir
 import os
 import shutil
 import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from itertools import islice
+
+from ..core import prompts
+from ..core.context_ranking import ContextRanker
+from ..core.project_index import ProjectIndex
+from ..core.symbol_index import SymbolIndex
+from ..utils.walker import IGNORED_DIRS, LANGUAGES, detect_language, walk
+
+
+# Langages des fichiers candidats au contexte d'un diagnostic
+SOURCE_LANGUAGES = sorted(set(LANGUAGES.values()))
+
+# Fichiers marquant la racine d'un projet (refactoring d'un fichier isolé)
+PROJECT_MARKERS = ('.git', 'pyproject.toml', 'setup.py', 'requirements.txt', 'package.json')
 
 
 class Fixer:
@@ -27,6 +44,11 @@ class Fixer:
         self.llm = llm_client
         self.kb = knowledge_base
         self.logger = logger
+        
+        # Index des fichiers par projet, gardés ouverts (et surveillés) tant que l'agent vit
+        self._project_indexes: Dict[Path, ProjectIndex] = {}
+        self._symbol_indexes: Dict[Path, SymbolIndex] = {}
+        self._indexes_lock = threading.Lock()
     
     def analyze_project(self, project_path: str) -> Dict[str, Any]:
         """
@@ -86,33 +108,17 @@ class Fixer:
         if not analysis.get("success"):
             return analysis
         
-        # Lire les fichiers pertinents
-        relevant_files = self._get_relevant_files(project_path, issue_description)
-        
-        files_content = {}
-        for file_path in relevant_files[:5]:  # Limiter à 5 fichiers
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if len(content) < 10000:  # Limiter la taille
-                        files_content[str(file_path.relative_to(project_path))] = content
-            except Exception as e:
-                self.logger.warning(f"Impossible de lire {file_path}: {e}")
-        
-        # Utiliser le LLM pour diagnostiquer
-        self.logger.action("Analyse du problème avec l'IA...")
-        
-        files_summary = "\n\n".join([
-            f"Fichier: {path}\n```\n{content[:2000]}...\n```"
-            for path, content in files_content.items()
-        ])
+        # Une description démesurée (journal collé en entier) ne prend pas plus de la moitié du prompt
+        budget = self.llm.budget
+        described_issue = budget.tokenizer.truncate(issue_description, budget.prompt_budget // 2)
         
-        diagnostic_prompt = f"""Diagnostique le problème suivant dans ce projet {analysis['project_type']} :
+        prompt_head = f"""Diagnostique le problème suivant dans ce projet {analysis['project_type']} :
 
-Problème décrit : {issue_description}
+Problème décrit : {described_issue}
 
 Fichiers du projet :
-{files_summary}
+"""
+        prompt_tail = """
 
 Identifie :
 1. La cause probable du problème
@@ -129,7 +135,28 @@ Retourne ta réponse au format JSON avec les clés suivantes :
 - risks: risques potentiels
 - confidence: niveau de confiance (low, medium, high)"""
         
-        response = self.llm.answer_question(diagnostic_prompt)
+        # Sélectionner les extraits de code les plus pertinents, dans la place laissée par le reste du prompt
+        files_budget = min(self.config.context.token_budget,
+                           budget.remaining(prompts.answer_question_messages(prompt_head + prompt_tail, None)))
+        excerpts = self._get_relevant_excerpts(project_path, issue_description, files_budget)
+        
+        # Utiliser le LLM pour diagnostiquer
+        self.logger.action("Analyse du problème avec l'IA...")
+        
+        def summarize(selected):
+            return "\n\n".join([
+                f"Fichier: {excerpt['path']} (lignes {excerpt['start_line']}-{excerpt['end_line']})\n"
+                f"```\n{excerpt['content']}\n```"
+                for excerpt in selected
+            ])
+        
+        # Les en-têtes des extraits comptent aussi : retirer les moins pertinents en cas de dépassement
+        files_summary = summarize(excerpts)
+        while excerpts and budget.count(files_summary) > files_budget:
+            excerpts.remove(min(excerpts, key=lambda excerpt: excerpt['score']))
+            files_summary = summarize(excerpts)
+        
+        response = self.llm.answer_question(prompt_head + files_summary + prompt_tail)
         
         # Parser la réponse JSON
         import json
@@ -148,7 +175,7 @@ Retourne ta réponse au format JSON avec les clés suivantes :
             return {"success": False, "error": "Erreur de parsing du diagnostic"}
     
     def fix_issue(self, project_path: str, issue_description: str, 
-                  auto_backup: bool = True) -> Dict[str, Any]:
+                  auto_backup: bool = True, parallel: Optional[bool] = None) -> Dict[str, Any]:
         """
         Répare un problème dans un projet.
         
@@ -156,6 +183,7 @@ Retourne ta réponse au format JSON avec les clés suivantes :
             project_path: Chemin vers le projet
             issue_description: Description du problème
             auto_backup: Créer une sauvegarde automatique
+            parallel: Réparer les fichiers en parallèle (par défaut : configuration)
             
         Returns:
             Résultat de la réparation
@@ -163,6 +191,7 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         self.logger.section(f"Réparation du problème")
         
         project_path = Path(project_path).resolve()
+        backup_path = None
         
         # Créer une sauvegarde si demandé
         if auto_backup and self.config.security.backup_before_modification:
@@ -190,8 +219,11 @@ Retourne ta réponse au format JSON avec les clés suivantes :
                 "diagnostic": diagnostic
             }
         
-        # Réparer chaque fichier
-        fixed_files = []
+        # Réparer chaque fichier : les appels LLM d'abord, les écritures ensuite
+        if parallel is None:
+            parallel = self.config.performance.fixer_parallel
+        
+        targets = []
         for file_rel_path in affected_files:
             file_path = project_path / file_rel_path
             
@@ -199,32 +231,10 @@ Retourne ta réponse au format JSON avec les clés suivantes :
                 self.logger.warning(f"Fichier non trouvé : {file_path}")
                 continue
             
-            self.logger.action(f"Réparation de {file_rel_path}...")
-            
-            try:
-                # Lire le contenu actuel
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    original_content = f.read()
-                
-                # Générer le code corrigé
-                fixed_content = self.llm.fix_code(
-                    code=original_content,
-                    error_message=issue_description,
-                    language=self._detect_language(file_path)
-                )
-                
-                # Nettoyer le code
-                fixed_content = self._clean_code(fixed_content)
-                
-                # Écrire le fichier corrigé
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(fixed_content)
-                
-                fixed_files.append(file_rel_path)
-                self.logger.success(f"✓ {file_rel_path} réparé")
-                
-            except Exception as e:
-                self.logger.error(f"Erreur lors de la réparation de {file_rel_path}: {e}")
+            targets.append((file_rel_path, file_path))
+        
+        repairs, timings = self._generate_fixes(targets, issue_description, parallel)
+        fixed_files = self._apply_fixes(repairs)
         
         if not fixed_files:
             self.logger.error("Aucun fichier n'a pu être réparé")
@@ -248,9 +258,114 @@ Retourne ta réponse au format JSON avec les clés suivantes :
             "success": True,
             "fixed_files": fixed_files,
             "diagnostic": diagnostic,
-            "backup_path": backup_path if auto_backup else None
+            "backup_path": backup_path,
+            "timings": timings
         }
     
+    def _generate_fixes(self, targets: List[Tuple[str, Path]], issue_description: str,
+                        parallel: bool) -> Tuple[List[Tuple[str, Path, str, str]], Dict[str, float]]:
+        """
+        Génère les corrections de plusieurs fichiers sans rien écrire sur disque.
+        
+        Args:
+            targets: Liste de tuples (chemin relatif, chemin absolu)
+            issue_description: Description du problème
+            parallel: Lancer les appels LLM en parallèle
+            
+        Returns:
+            Tuple (liste de (chemin relatif, chemin absolu, contenu original, contenu corrigé),
+            durée de réparation en secondes par fichier)
+        """
+        def repair(file_rel_path: str, file_path: Path):
+            self.logger.action(f"Réparation de {file_rel_path}...")
+            started = time.perf_counter()
+            
+            # Lire le contenu actuel
+            with open(file_path, 'r', encoding='utf-8') as f:
+                original_content = f.read()
+            
+            # Générer le code corrigé
+            fixed_content = self.llm.fix_code(
+                code=original_content,
+                error_message=issue_description,
+                language=self._detect_language(file_path)
+            )
+            
+            # Nettoyer le code
+            fixed_content = self._clean_code(fixed_content)
+            
+            return original_content, fixed_content, time.perf_counter() - started
+        
+        def attempt(target: Tuple[str, Path]):
+            file_rel_path, file_path = target
+            try:
+                return file_rel_path, file_path, repair(file_rel_path, file_path)
+            except Exception as e:
+                return file_rel_path, file_path, e
+        
+        if parallel and len(targets) > 1:
+            max_workers = max(1, min(self.config.performance.fixer_max_workers, len(targets)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fixer") as executor:
+                outcomes = list(executor.map(attempt, targets))
+        else:
+            outcomes = [attempt(target) for target in targets]
+        
+        repairs = []
+        timings = {}
+        
+        for file_rel_path, file_path, outcome in outcomes:
+            if isinstance(outcome, Exception):
+                self.logger.error(f"Erreur lors de la réparation de {file_rel_path}: {outcome}")
+                continue
+            
+            original_content, fixed_content, elapsed = outcome
+            repairs.append((file_rel_path, file_path, original_content, fixed_content))
+            timings[file_rel_path] = round(elapsed, 3)
+            self.logger.info(f"Correction de {file_rel_path} générée en {elapsed:.1f}s")
+        
+        return repairs, timings
+    
+    def _apply_fixes(self, repairs: List[Tuple[str, Path, str, str]]) -> List[str]:
+        """
+        Écrit toutes les corrections en une seule étape finale.
+        
+        Chaque fichier est remplacé atomiquement en conservant ses permissions ;
+        si une écriture échoue, le fichier temporaire est supprimé, les fichiers
+        déjà écrits sont restaurés et aucune correction n'est appliquée.
+        
+        Args:
+            repairs: Liste de (chemin relatif, chemin absolu, contenu original, contenu corrigé)
+            
+        Returns:
+            Liste des chemins relatifs des fichiers modifiés
+        """
+        written = []
+        tmp_path = None
+        try:
+            for file_rel_path, file_path, original_content, fixed_content in repairs:
+                tmp_path = file_path.with_name(f".{file_path.name}.jarvis-tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(fixed_content)
+                # Le fichier temporaire est neuf : reprendre le mode du fichier (bit exécutable...)
+                shutil.copymode(file_path, tmp_path)
+                os.replace(tmp_path, file_path)
+                tmp_path = None
+                written.append((file_rel_path, file_path, original_content))
+        except Exception as e:
+            self.logger.error(f"Erreur lors de l'écriture des corrections : {e}")
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            for file_rel_path, file_path, original_content in written:
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    f.write(original_content)
+                self.logger.warning(f"{file_rel_path} restauré")
+            return []
+        
+        for file_rel_path, _, _ in written:
+            self.logger.success(f"✓ {file_rel_path} réparé")
+        
+        return [file_rel_path for file_rel_path, _, _ in written]
+    
     def refactor_code(self, file_path: str, objective: str = "améliorer la qualité") -> Dict[str, Any]:
         """
         Refactorise un fichier de code.
@@ -291,7 +406,8 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         refactored_content = self.llm.refactor_code(
             code=original_content,
             language=language,
-            objective=objective
+            objective=objective,
+            usages=self._describe_usages(file_path)
         )
         
         refactored_content = self._clean_code(refactored_content)
@@ -332,28 +448,88 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         else:
             return "unknown"
     
+    def _project_index(self, project_path: Path) -> Optional[ProjectIndex]:
+        """Retourne l'index à jour des fichiers d'un projet (None si l'index est désactivé)."""
+        if not self.config.performance.project_index_enabled:
+            return None
+        
+        with self._indexes_lock:
+            index = self._project_indexes.get(project_path)
+            if index is None:
+                index = ProjectIndex(project_path, self.config.get_project_index_dir())
+                if self.config.performance.project_index_watch and not index.watch():
+                    self.logger.warning("Surveillance des projets indisponible (watchdog non installé)")
+                self._project_indexes[project_path] = index
+        
+        stats = index.refresh()
+        if stats["dirs_scanned"]:
+            self.logger.info(f"Index du projet mis à jour : {stats['dirs_scanned']} répertoire(s) relu(s), "
+                             f"{stats['files_updated']} fichier(s) modifié(s), {stats['files_removed']} supprimé(s)")
+        return index
+    
+    def _symbol_index(self, project_path: Path, index: ProjectIndex) -> Optional[SymbolIndex]:
+        """Retourne l'index à jour des symboles d'un projet (None si l'index est désactivé)."""
+        if not self.config.performance.symbol_index_enabled:
+            return None
+        
+        with self._indexes_lock:
+            symbols = self._symbol_indexes.get(project_path)
+            if symbols is None:
+                symbols = SymbolIndex(index)
+                self._symbol_indexes[project_path] = symbols
+        
+        stats = symbols.update()
+        if stats["files_parsed"] or stats["files_removed"]:
+            self.logger.info(f"Index des symboles mis à jour : {stats['files_parsed']} fichier(s) analysé(s), "
+                             f"{stats['files_removed']} retiré(s)")
+        return symbols
+    
+    def _describe_usages(self, file_path: Path, max_lines: int = 30) -> Optional[str]:
+        """
+        Décrit où les définitions d'un fichier sont utilisées dans le reste de son projet.
+        
+        Args:
+            file_path: Fichier (chemin absolu)
+            max_lines: Nombre maximum de lignes de description
+            
+        Returns:
+            Une ligne par définition utilisée ailleurs, plus les fichiers qui importent
+            le fichier ; None hors d'un projet ou sans index des symboles
+        """
+        project_path = next((parent for parent in file_path.parents
+                             if any((parent / marker).exists() for marker in PROJECT_MARKERS)), None)
+        if project_path is None or not self._is_directory_safe(project_path):
+            return None
+        
+        index = self._project_index(project_path)
+        symbols = self._symbol_index(project_path, index) if index is not None else None
+        if symbols is None:
+            return None
+        
+        rel_path = file_path.relative_to(project_path).as_posix()
+        lines = []
+        importers = symbols.importers_of(rel_path)
+        if importers:
+            lines.append(f"- importé par : {', '.join(importers[:10])}")
+        
+        for definition in symbols.file_definitions(rel_path):
+            callers = [caller for caller in symbols.callers(definition["name"]) if caller["path"] != rel_path]
+            if not callers:
+                continue
+            described = ", ".join(f"{caller['path']} ({caller['qualname']})" for caller in callers[:5])
+            lines.append(f"- {definition['qualname']} (ligne {definition['line']}) : utilisé dans {described}")
+            if len(lines) >= max_lines:
+                break
+        
+        return "\n".join(lines) or None
+    
     def _list_project_files(self, project_path: Path, max_files: int = 100) -> List[str]:
         """Liste les fichiers d'un projet."""
-        files = []
-        
-        # Extensions à ignorer
-        ignore_extensions = {'.pyc', '.pyo', '.so', '.dll', '.dylib', '.exe', '.o', '.a'}
-        ignore_dirs = {'node_modules', '__pycache__', '.git', '.venv', 'venv', 'dist', 'build'}
-        
-        for file_path in project_path.rglob('*'):
-            if file_path.is_file():
-                # Ignorer certains fichiers
-                if file_path.suffix in ignore_extensions:
-                    continue
-                if any(ignored in file_path.parts for ignored in ignore_dirs):
-                    continue
-                
-                files.append(str(file_path.relative_to(project_path)))
-                
-                if len(files) >= max_files:
-                    break
-        
-        return files
+        index = self._project_index(project_path)
+        if index is not None:
+            return index.paths(limit=max_files)
+        
+        return [walked.rel_path for walked in islice(walk(project_path), max_files)]
     
     def _detect_dependencies(self, project_path: Path) -> Dict[str, List[str]]:
         """Détecte les dépendances d'un projet."""
@@ -381,48 +557,50 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         
         return dependencies
     
-    def _get_relevant_files(self, project_path: Path, issue_description: str) -> List[Path]:
-        """Identifie les fichiers pertinents pour un problème."""
-        # Pour l'instant, retourner les fichiers principaux
-        relevant = []
-        
-        # Fichiers Python
-        for py_file in project_path.rglob('*.py'):
-            if '__pycache__' not in py_file.parts and 'venv' not in py_file.parts:
-                relevant.append(py_file)
-        
-        # Fichiers JavaScript/TypeScript
-        for js_file in project_path.rglob('*.js'):
-            if 'node_modules' not in js_file.parts:
-                relevant.append(js_file)
-        
-        for ts_file in project_path.rglob('*.ts'):
-            if 'node_modules' not in ts_file.parts:
-                relevant.append(ts_file)
-        
-        # Fichiers HTML/CSS
-        for html_file in project_path.rglob('*.html'):
-            relevant.append(html_file)
-        
-        return relevant[:10]  # Limiter à 10 fichiers
+    def _get_relevant_excerpts(self, project_path: Path, issue_description: str,
+                               token_budget: int) -> List[Dict[str, Any]]:
+        """
+        Sélectionne les extraits de code pertinents pour un problème, dans un budget de tokens.
+        
+        Args:
+            project_path: Racine du projet
+            issue_description: Description du problème (trace d'appels incluse le cas échéant)
+            token_budget: Tokens disponibles pour les extraits
+            
+        Returns:
+            Extraits (path, start_line, end_line, content, score, reasons), les plus pertinents en premier
+        """
+        context = self.config.context
+        index = self._project_index(project_path)
+        symbols = self._symbol_index(project_path, index) if index is not None else None
+        
+        ranker = ContextRanker(
+            embedding_function=getattr(self.kb, "embedding_function", None) if context.use_embeddings else None,
+            symbol_lookup=symbols.lookup if symbols is not None else None,
+            tokenizer=self.llm.budget.tokenizer,
+            use_git=context.use_git,
+            max_candidates=context.max_candidates,
+            max_files=context.max_files,
+            chunk_lines=context.chunk_lines,
+            max_file_bytes=context.max_file_bytes
+        )
+        
+        excerpts = ranker.select(project_path, issue_description, self._source_files(project_path, index),
+                                 token_budget)
+        paths = list(dict.fromkeys(excerpt["path"] for excerpt in excerpts))
+        self.logger.info(f"Contexte : {len(excerpts)} extrait(s) de {len(paths)} fichier(s) "
+                         f"({', '.join(paths[:5])}{', ...' if len(paths) > 5 else ''})")
+        return excerpts
+    
+    def _source_files(self, project_path: Path, index: Optional[ProjectIndex]) -> List[Tuple[str, str]]:
+        """Liste les fichiers source d'un projet (par l'index s'il existe) : couples (chemin relatif, langage)."""
+        if index is not None:
+            return [(entry["path"], entry["language"]) for entry in index.entries(languages=SOURCE_LANGUAGES)]
+        return [(walked.rel_path, walked.language) for walked in walk(project_path, languages=SOURCE_LANGUAGES)]
     
     def _detect_language(self, file_path: Path) -> str:
         """Détecte le langage d'un fichier."""
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.html': 'html',
-            '.css': 'css',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php'
-        }
-        return extension_map.get(file_path.suffix, 'text')
+        return detect_language(file_path.name)
     
     def _create_backup(self, project_path: Path) -> str:
         """Crée une sauvegarde d'un projet."""
@@ -430,9 +608,7 @@ Retourne ta réponse au format JSON avec les clés suivantes :
         backup_name = f"{project_path.name}_backup_{timestamp}"
         backup_path = project_path.parent / backup_name
         
-        shutil.copytree(project_path, backup_path, ignore=shutil.ignore_patterns(
-            'node_modules', '__pycache__', '.git', 'venv', '.venv', 'dist', 'build'
-        ))
+        shutil.copytree(project_path, backup_path, ignore=shutil.ignore_patterns(*IGNORED_DIRS))
         
         return str(backup_path)
     
@@ -0,0 +1,59 @@
+"""
+Tests du nettoyage du code généré par le Builder.
+"""
+
+import pytest
+
+from src.modules.builder import Builder
+
+
+RESPONSES = [
+    # Réponse entre balises, avec ou sans langage
+    ("html", "```html\n<html>\n  <body>hi</body>\n</html>\n```"),
+    ("css", "```\nbody {\n  margin: 0;\n}\n```\n"),
+    ("javascript", "  ```javascript\nconst a = `x`;\nconsole.log(a);\n```\nExplication finale."),
+    # Réponse sans balise
+    ("html", "<!DOCTYPE html>\n<html>\n  <body>hi</body>\n</html>\n"),
+    ("css", "body {\n  margin: 0;\n}\n\n.card {\n  padding: 1rem;\n}"),
+    ("javascript", "const total = items.reduce((a, b) => a + b, 0);\n"),
+    # Phrase d'introduction avant la balise
+    ("html", "Voici le code :\n```html\n<html>hi</html>\n```"),
+    ("css", "Voici le fichier CSS demandé.\n\n```css\nbody { color: red; }\n```\nBonne utilisation !"),
+    ("javascript", "Bien sûr ! Voici le script :\n```\nfunction f() {\n  return 1;\n}\n```"),
+    # Phrase seule, ou balise jamais fermée
+    ("html", "Je ne peux pas générer ce fichier."),
+    ("html", "Voici :\n```html\n<p>coupé"),
+]
+
+
+def chunked(text, size):
+    """Découpe une réponse en fragments de taille fixe, comme un flux LLM."""
+    return [text[index:index + size] for index in range(0, len(text), size)]
+
+
+@pytest.fixture
+def builder():
+    return Builder.__new__(Builder)
+
+
+@pytest.mark.parametrize("language,response", RESPONSES)
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_clean_code_stream_matches_clean_code(builder, language, response, size):
+    streamed = "".join(builder._clean_code_stream(iter(chunked(response, size))))
+    
+    assert streamed == builder._clean_code(response, language)
+
+
+def test_clean_code_stream_drops_prose_before_fence(builder):
+    response = "Voici le code :\n```html\n<html>hi</html>\n```"
+    
+    assert "".join(builder._clean_code_stream(iter(chunked(response, 4)))) == "<html>hi</html>"
+
+
+def test_clean_code_stream_streams_unfenced_code(builder):
+    # Le code sans balise est écrit au fil du flux, sans attendre la fin de la réponse
+    chunks = iter(["<html>\n", "<body>hi</body>\n", "</html>\n"])
+    stream = builder._clean_code_stream(chunks)
+    
+    assert next(stream) == "<html>"
+    assert next(chunks) == "<body>hi</body>\n"
@@ -0,0 +1,108 @@
+"""
+Tests des règles .gitignore et du parcours des fichiers d'un projet.
+"""
+
+import pytest
+
+from src.utils.walker import IgnoreRules, walk
+
+
+def make_rules(root, gitignores):
+    """Écrit les fichiers .gitignore {répertoire: lignes} et retourne les règles du projet."""
+    for rel_dir, lines in gitignores.items():
+        directory = root / rel_dir
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / ".gitignore").write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return IgnoreRules(root, ignore_dirs=(), ignore_extensions=())
+
+
+ROOT_RULES = [
+    # Motif sans / : toute profondeur
+    (["*.log"], "app.log", False, True),
+    (["*.log"], "src/deep/app.log", False, True),
+    (["*.log"], "app.log.txt", False, False),
+    # / initial ou interne : ancré à la racine du .gitignore
+    (["/todo.txt"], "todo.txt", False, True),
+    (["/todo.txt"], "src/todo.txt", False, False),
+    (["docs/out"], "docs/out", True, True),
+    (["docs/out"], "src/docs/out", True, False),
+    # **/ en tête : toute profondeur, y compris la racine
+    (["**/cache"], "cache", True, True),
+    (["**/cache"], "a/b/cache", True, True),
+    # /** final : tout le contenu, pas le répertoire lui-même
+    (["logs/**"], "logs/today.txt", False, True),
+    (["logs/**"], "logs/2026/today.txt", False, True),
+    (["logs/**"], "logs", True, False),
+    # /**/ interne : zéro ou plusieurs répertoires
+    (["a/**/z"], "a/z", False, True),
+    (["a/**/z"], "a/b/c/z", False, True),
+    (["a/**/z"], "b/a/z", False, False),
+    # / final : répertoires seulement
+    (["tmp/"], "tmp", True, True),
+    (["tmp/"], "src/tmp", True, True),
+    (["tmp/"], "tmp", False, False),
+    # * et ? ne traversent pas les répertoires
+    (["src/*.py"], "src/app.py", False, True),
+    (["src/*.py"], "src/sub/app.py", False, False),
+    (["file?.txt"], "file1.txt", False, True),
+    (["file?.txt"], "file10.txt", False, False),
+    (["[!a]*.bak"], "b.bak", False, True),
+    (["[!a]*.bak"], "a.bak", False, False),
+    # Négation : la dernière règle qui correspond décide
+    (["*.env", "!example.env"], "prod.env", False, True),
+    (["*.env", "!example.env"], "example.env", False, False),
+    (["!example.env", "*.env"], "example.env", False, True),
+    # Commentaires et échappement
+    (["# commentaire"], "# commentaire", False, False),
+    (["\\#notes"], "#notes", False, True),
+    (["\\!important"], "!important", False, True),
+]
+
+
+@pytest.mark.parametrize("lines,rel_path,is_dir,ignored", ROOT_RULES)
+def test_root_gitignore(tmp_path, lines, rel_path, is_dir, ignored):
+    rules = make_rules(tmp_path, {"": lines})
+    
+    assert rules.is_ignored(rel_path, is_dir) is ignored
+
+
+NESTED_RULES = [
+    # Un .gitignore plus profond l'emporte sur celui de la racine
+    ({"": ["*.secret"], "keep": ["!public.secret"]}, "keep/public.secret", False),
+    ({"": ["*.secret"], "keep": ["!public.secret"]}, "keep/other.secret", True),
+    ({"": ["*.secret"], "keep": ["!public.secret"]}, "public.secret", True),
+    ({"": ["!*.txt"], "sub": ["*.txt"]}, "sub/notes.txt", True),
+    # Les motifs ancrés d'un .gitignore imbriqué sont relatifs à son répertoire
+    ({"sub": ["/local.cfg"]}, "sub/local.cfg", True),
+    ({"sub": ["/local.cfg"]}, "sub/deeper/local.cfg", False),
+    ({"sub": ["/local.cfg"]}, "local.cfg", False),
+    ({"sub": ["out/"]}, "sub/a/out/file.js", True),
+    # Un fichier ne peut pas être réinclus si un de ses répertoires parents est ignoré
+    ({"": ["vendor/", "!vendor/keep.py"]}, "vendor/keep.py", True),
+    ({"": ["vendor/"], "vendor": ["!keep.py"]}, "vendor/keep.py", True),
+]
+
+
+@pytest.mark.parametrize("gitignores,rel_path,ignored", NESTED_RULES)
+def test_nested_gitignore_precedence(tmp_path, gitignores, rel_path, ignored):
+    rules = make_rules(tmp_path, gitignores)
+    
+    assert rules.is_ignored_path(rel_path, False) is ignored
+
+
+def test_walk_prunes_ignored_directories(tmp_path):
+    for rel_path in ["app.py", "build.log", "src/util.py", "src/gen/out.py", "node_modules/lib/index.js",
+                     "docs/readme.txt"]:
+        (tmp_path / rel_path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel_path).write_text("x", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("*.log\nsrc/gen/\n", encoding="utf-8")
+    
+    walked = [(walked.rel_path, walked.language) for walked in walk(tmp_path)]
+    
+    assert walked == [
+        (".gitignore", "text"),
+        ("app.py", "python"),
+        ("docs/readme.txt", "text"),
+        ("src/util.py", "python"),
+    ]
+    assert [walked.rel_path for walked in walk(tmp_path, languages=["python"])] == ["app.py", "src/util.py"]
@@ -0,0 +1,316 @@
+"""
+Module de parcours des fichiers d'un projet.
+
+Un seul parcours os.scandir : les répertoires ignorés (node_modules, venv,
+.git, règles .gitignore) sont écartés avant d'y descendre, chaque fichier
+est classé par langage d'après son extension, et les fichiers sont produits
+au fil du parcours (un appelant peut s'arrêter dès qu'il en a assez).
+"""
+
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+LANGUAGES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.html': 'html',
+    '.css': 'css',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php'
+}
+
+# Répertoires jamais parcourus et extensions jamais retenues par défaut
+IGNORED_DIRS = {'node_modules', '__pycache__', '.git', '.venv', 'venv', 'dist', 'build'}
+IGNORED_EXTENSIONS = {'.pyc', '.pyo', '.so', '.dll', '.dylib', '.exe', '.o', '.a'}
+
+
+@dataclass
+class WalkedFile:
+    """Fichier trouvé par le parcours."""
+    rel_path: str
+    abs_path: str
+    language: str
+    size: Optional[int] = None
+    mtime_ns: Optional[int] = None
+    
+    @property
+    def path(self) -> Path:
+        """Chemin absolu du fichier."""
+        return Path(self.abs_path)
+
+
+def detect_language(file_name: str) -> str:
+    """
+    Détecte le langage d'un fichier d'après son extension.
+    
+    Args:
+        file_name: Nom ou chemin du fichier
+        
+    Returns:
+        Langage (text si l'extension est inconnue)
+    """
+    return LANGUAGES.get(os.path.splitext(file_name)[1], 'text')
+
+
+class IgnoreRules:
+    """Règles d'exclusion d'un projet : répertoires et extensions ignorés, fichiers .gitignore."""
+    
+    def __init__(self, root: Path, ignore_dirs: Iterable[str] = IGNORED_DIRS,
+                 ignore_extensions: Iterable[str] = IGNORED_EXTENSIONS, gitignore: bool = True):
+        """
+        Initialise les règles.
+        
+        Args:
+            root: Racine du projet
+            ignore_dirs: Noms de répertoires ignorés à toute profondeur
+            ignore_extensions: Extensions des fichiers ignorés
+            gitignore: Appliquer les fichiers .gitignore du projet
+        """
+        self.root = Path(root)
+        self.ignore_dirs = set(ignore_dirs)
+        self.ignore_extensions = set(ignore_extensions)
+        self.gitignore = gitignore
+        
+        # Règles .gitignore par répertoire, lues au premier besoin
+        self._patterns: Dict[str, List[Tuple[re.Pattern, bool, bool]]] = {}
+    
+    def is_ignored(self, rel_path: str, is_dir: bool) -> bool:
+        """
+        Indique si une entrée est ignorée (ses répertoires parents ne sont pas vérifiés).
+        
+        Args:
+            rel_path: Chemin relatif à la racine, séparé par des /
+            is_dir: L'entrée est un répertoire
+            
+        Returns:
+            True si l'entrée est ignorée
+        """
+        parent, _, name = rel_path.rpartition("/")
+        if is_dir:
+            if name in self.ignore_dirs:
+                return True
+        elif os.path.splitext(name)[1] in self.ignore_extensions:
+            return True
+        
+        return self.matches_gitignore(rel_path, is_dir, self.gitignore_chain(parent))
+    
+    def gitignore_chain(self, rel_dir: str) -> List[Tuple[int, List[Tuple[re.Pattern, bool, bool]]]]:
+        """
+        Retourne les règles .gitignore applicables aux entrées d'un répertoire.
+        
+        Args:
+            rel_dir: Répertoire relatif à la racine ("" pour la racine)
+            
+        Returns:
+            Couples (longueur du préfixe à retirer des chemins, règles), du
+            répertoire le moins profond au plus profond ; vide sans .gitignore
+        """
+        if not self.gitignore:
+            return []
+        
+        parts = rel_dir.split("/") if rel_dir else []
+        chain = []
+        for base in [""] + ["/".join(parts[:depth]) for depth in range(1, len(parts) + 1)]:
+            rules = self._rules(base)
+            if rules:
+                chain.append((len(base) + 1 if base else 0, rules))
+        return chain
+    
+    @staticmethod
+    def matches_gitignore(rel_path: str, is_dir: bool,
+                          chain: List[Tuple[int, List[Tuple[re.Pattern, bool, bool]]]]) -> bool:
+        """Applique des règles .gitignore (voir gitignore_chain) à une entrée."""
+        # Les règles des répertoires les plus profonds l'emportent, la dernière règle qui correspond décide
+        ignored = False
+        for offset, rules in chain:
+            relative = rel_path[offset:]
+            for pattern, negate, dir_only in rules:
+                if (is_dir or not dir_only) and pattern.fullmatch(relative):
+                    ignored = not negate
+        return ignored
+    
+    def is_ignored_path(self, rel_path: str, is_dir: bool) -> bool:
+        """Indique si une entrée ou l'un de ses répertoires parents est ignoré."""
+        parts = rel_path.split("/")
+        for depth in range(1, len(parts)):
+            if self.is_ignored("/".join(parts[:depth]), True):
+                return True
+        return self.is_ignored(rel_path, is_dir)
+    
+    def reload(self):
+        """Oublie les fichiers .gitignore lus (ils seront relus au prochain besoin)."""
+        self._patterns.clear()
+    
+    def _rules(self, rel_dir: str) -> List[Tuple[re.Pattern, bool, bool]]:
+        """Retourne les règles du .gitignore d'un répertoire."""
+        rules = self._patterns.get(rel_dir)
+        if rules is None:
+            try:
+                lines = (self.root / rel_dir / ".gitignore").read_text(encoding='utf-8', errors='replace').splitlines()
+            except OSError:
+                lines = []
+            rules = [rule for rule in (_parse_gitignore_line(line) for line in lines) if rule]
+            self._patterns[rel_dir] = rules
+        return rules
+
+
+def scan_dir(root: Path, rel_dir: str, rules: IgnoreRules,
+             with_stat: bool = False) -> Tuple[List[str], List[WalkedFile]]:
+    """
+    Lit un répertoire (sans descendre dans ses sous-répertoires).
+    
+    Args:
+        root: Racine du projet
+        rel_dir: Répertoire relatif à la racine ("" pour la racine)
+        rules: Règles d'exclusion
+        with_stat: Renseigner la taille et la date de modification des fichiers
+        
+    Returns:
+        Tuple (sous-répertoires non ignorés, fichiers non ignorés)
+        
+    Raises:
+        OSError: Si le répertoire est illisible
+    """
+    prefix = f"{rel_dir}/" if rel_dir else ""
+    subdirs = []
+    files = []
+    
+    # Les règles .gitignore sont réunies une fois pour tout le répertoire
+    chain = rules.gitignore_chain(rel_dir)
+    
+    with os.scandir(Path(root) / rel_dir) as iterator:
+        for entry in iterator:
+            rel_path = prefix + entry.name
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name in rules.ignore_dirs or (chain and rules.matches_gitignore(rel_path, True, chain)):
+                        continue
+                    subdirs.append(rel_path)
+                elif entry.is_file(follow_symlinks=False):
+                    extension = os.path.splitext(entry.name)[1]
+                    if extension in rules.ignore_extensions:
+                        continue
+                    if chain and rules.matches_gitignore(rel_path, False, chain):
+                        continue
+                    walked = WalkedFile(rel_path, entry.path, LANGUAGES.get(extension, 'text'))
+                    if with_stat:
+                        stat = entry.stat(follow_symlinks=False)
+                        walked.size, walked.mtime_ns = stat.st_size, stat.st_mtime_ns
+                    files.append(walked)
+            except OSError:
+                continue
+    
+    return subdirs, files
+
+
+def walk(root: Path, rules: Optional[IgnoreRules] = None, languages: Optional[Iterable[str]] = None,
+         with_stat: bool = False) -> Iterator[WalkedFile]:
+    """
+    Parcourt les fichiers d'un projet en un seul passage, au fil de l'eau.
+    
+    Les fichiers d'un répertoire sont produits avant ceux de ses
+    sous-répertoires, par ordre de nom.
+    
+    Args:
+        root: Racine du projet
+        rules: Règles d'exclusion (défaut : répertoires et extensions usuels + .gitignore)
+        languages: Ne produire que les fichiers de ces langages (optionnel)
+        with_stat: Renseigner la taille et la date de modification des fichiers
+        
+    Returns:
+        Itérateur sur les fichiers retenus
+    """
+    root = Path(root)
+    rules = rules or IgnoreRules(root)
+    languages = set(languages) if languages is not None else None
+    
+    stack = [""]
+    while stack:
+        try:
+            subdirs, files = scan_dir(root, stack.pop(), rules, with_stat)
+        except OSError:
+            continue
+        
+        for walked in sorted(files, key=lambda walked: walked.rel_path):
+            if languages is None or walked.language in languages:
+                yield walked
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def group_by_language(files: Iterable[WalkedFile]) -> Dict[str, List[WalkedFile]]:
+    """
+    Regroupe des fichiers par langage.
+    
+    Args:
+        files: Fichiers (par exemple produits par walk)
+        
+    Returns:
+        Dictionnaire {langage: fichiers}
+    """
+    groups: Dict[str, List[WalkedFile]] = {}
+    for walked in files:
+        groups.setdefault(walked.language, []).append(walked)
+    return groups
+
+
+def _parse_gitignore_line(line: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+    """Convertit une ligne de .gitignore en règle (expression, négation, répertoires seulement)."""
+    line = line.rstrip()
+    if not line or line.startswith("#"):
+        return None
+    
+    negate = line.startswith("!")
+    if negate:
+        line = line[1:]
+    elif line.startswith("\\"):
+        line = line[1:]
+    
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    
+    # Un motif sans / (hors / final) s'applique à toute profondeur
+    anchored = "/" in line
+    line = line.lstrip("/")
+    
+    regex = ""
+    position = 0
+    while position < len(line):
+        if line.startswith("**/", position):
+            regex += "(?:.*/)?"
+            position += 3
+        elif line.startswith("/**", position) and position + 3 == len(line):
+            regex += "/.*"
+            position += 3
+        elif line.startswith("**", position):
+            regex += ".*"
+            position += 2
+        elif line[position] == "*":
+            regex += "[^/]*"
+            position += 1
+        elif line[position] == "?":
+            regex += "[^/]"
+            position += 1
+        elif line[position] == "[" and "]" in line[position + 1:]:
+            end = line.index("]", position + 1)
+            chars = line[position + 1:end].replace("\\", "\\\\")
+            regex += "[" + ("^" + chars[1:] if chars.startswith("!") else chars) + "]"
+            position = end + 1
+        else:
+            regex += re.escape(line[position])
+            position += 1
+    
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return re.compile(regex), negate, dir_only
@@ -9,7 +9,7 @@ from pathlib import Path
 # Ajouter le répertoire parent au path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.core.agent import AmikalAgent
+from src.core.agent import JarvisAgent
 
 
 def test_initialization():
@@ -19,7 +19,7 @@ def test_initialization():
     print("=" * 60)
     
     try:
-        agent = AmikalAgent()
+        agent = JarvisAgent()
         print("✓ Agent initialisé avec succès")
         print(f"  - Modèle LLM: {agent.config.llm.model}")
         print(f"  - Module Builder: {'Activé' if agent.builder else 'Désactivé'}")
@@ -37,7 +37,7 @@ def test_build_request_analysis():
     print("=" * 60)
     
     try:
-        agent = AmikalAgent()
+        agent = JarvisAgent()
         request = "Crée un site web pour présenter mon portfolio de développeur"
         
         print(f"Demande: {request}")
@@ -63,7 +63,7 @@ def test_ask_question():
     print("=" * 60)
     
     try:
-        agent = AmikalAgent()
+        agent = JarvisAgent()
         question = "Qu'est-ce qu'une API REST ?"
         
         print(f"Question: {question}")
@@ -86,7 +86,7 @@ def test_knowledge_base():
     print("=" * 60)
     
     try:
-        agent = AmikalAgent()
+        agent = JarvisAgent()
         
         # Sauvegarder une solution
         solution_id = agent.kb.save_solution(
@@ -120,7 +120,7 @@ def test_build_simple_website():
     print("=" * 60)
     
     try:
-        agent = AmikalAgent()
+        agent = JarvisAgent()
         
         output_dir = "/home/ubuntu/amikal-agent/test_output/test_site"
         
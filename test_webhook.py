@@ -0,0 +1,248 @@
+"""
+Tests du webhook : voies de la file, planification du polling et exécution unique des commandes.
+
+L'API Remote Control est simulée : une commande reste listée par
+getPendingCommands tant que son statut n'a pas quitté « pending ».
+"""
+
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+import jarvis_webhook
+from jarvis_webhook import CommandQueue, JarvisWebhook, PollScheduler
+
+
+def command(command_id, command_type="ask"):
+    return {"id": command_id, "command": f"q{command_id}", "commandType": command_type}
+
+
+def test_queue_routes_fast_commands_to_fast_lane():
+    queue = CommandQueue()
+    queue.put(command(1, "build"))
+    queue.put(command(2, "ask"))
+    queue.put(command(3, "fix"))
+    queue.put(command(4, "learn"))
+    
+    # Les commandes rapides passent avant les lentes, dans leur ordre d'arrivée
+    assert [queue.get(allow_slow=True)["id"] for _ in range(4)] == [2, 4, 1, 3]
+
+
+def test_fast_worker_never_takes_slow_commands():
+    queue = CommandQueue()
+    queue.put(command(1, "build"))
+    taken = []
+    
+    worker = threading.Thread(target=lambda: taken.append(queue.get(allow_slow=False)))
+    worker.start()
+    worker.join(0.2)
+    assert worker.is_alive()
+    
+    queue.put(command(2, "analyze"))
+    worker.join(2)
+    assert [item["id"] for item in taken] == [2]
+    assert len(queue) == 1
+
+
+def test_queue_close_drops_pending_and_releases_workers():
+    queue = CommandQueue()
+    queue.put(command(1, "build"))
+    queue.put(command(2, "refactor"))
+    
+    assert queue.close() == 2
+    assert queue.get(allow_slow=True) is None
+    assert len(queue) == 0
+
+
+def test_scheduler_polls_immediately_while_work_arrives():
+    scheduler = PollScheduler(min_interval=5, max_interval=60, jitter=0)
+    
+    assert scheduler.record_poll(commands=3, new_work=True) == 0.0
+
+
+def test_scheduler_backs_off_up_to_max_interval():
+    scheduler = PollScheduler(min_interval=1, max_interval=10, backoff_factor=2, jitter=0)
+    
+    delays = [scheduler.record_poll(commands=0, new_work=False) for _ in range(6)]
+    
+    assert delays == [1, 2, 4, 8, 10, 10]
+    # Du travail remet le backoff à zéro
+    scheduler.record_poll(commands=1, new_work=True)
+    assert scheduler.record_poll(commands=0, new_work=False) == 1
+
+
+@pytest.mark.parametrize("jitter", [0.2, 0.5, 1.0])
+def test_scheduler_jitter_bounds(jitter):
+    scheduler = PollScheduler(min_interval=2, max_interval=2, jitter=jitter)
+    
+    delays = [scheduler.record_poll(commands=0, new_work=False) for _ in range(500)]
+    
+    assert all(2 * (1 - jitter) <= delay <= 2 * (1 + jitter) for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_scheduler_clamps_parameters_and_counts():
+    scheduler = PollScheduler(min_interval=-1, max_interval=-5, backoff_factor=0.5, jitter=3)
+    
+    assert scheduler.min_interval == 0
+    assert scheduler.max_interval == 0
+    assert scheduler.backoff_factor == 1
+    assert scheduler.jitter == 1
+    
+    scheduler.record_poll(commands=0, new_work=False)
+    scheduler.record_poll(commands=2, new_work=True)
+    scheduler.record_poll(commands=0, new_work=False, error=True)
+    stats = scheduler.stats()
+    assert (stats["polls"], stats["empty_polls"], stats["commands"], stats["errors"]) == (3, 2, 2, 1)
+    assert stats["empty_ratio"] == pytest.approx(2 / 3)
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None):
+        self.status_code = status_code
+        self._data = data or {}
+    
+    def json(self):
+        return self._data
+
+
+class FakeAPI:
+    """API Remote Control simulée, utilisée à la place de la session HTTP du webhook."""
+    
+    def __init__(self, commands, batch_supported=True):
+        self.statuses = {item["id"]: "pending" for item in commands}
+        self.commands = {item["id"]: item for item in commands}
+        self.batch_supported = batch_supported
+        self.webhook = None
+        self.idle_polls = 0
+        self.lock = threading.Lock()
+    
+    def post(self, url, json=None, params=None, timeout=None):
+        with self.lock:
+            if url.endswith("jarvis.getPendingCommands"):
+                pending = [dict(self.commands[command_id]) for command_id, status in self.statuses.items()
+                           if status == "pending"]
+                if all(status in ("completed", "failed") for status in self.statuses.values()):
+                    # Arrêter le webhook après quelques pollings sans travail
+                    self.idle_polls += 1
+                    if self.idle_polls >= 3:
+                        self.webhook.stop()
+                return FakeResponse(200, {"result": {"data": pending}})
+            
+            if params and params.get("batch"):
+                if not self.batch_supported:
+                    return FakeResponse(404)
+                payloads = list(json.values())
+            else:
+                payloads = [json]
+            for payload in payloads:
+                self.statuses[payload["commandId"]] = payload["status"]
+            return FakeResponse(200)
+    
+    def close(self):
+        pass
+
+
+class FakeAgent:
+    """Agent simulé qui compte les exécutions et laisse le temps aux pollings de se croiser."""
+    
+    def __init__(self, api, duration=0.02):
+        self.api = api
+        self.duration = duration
+        self.executions = Counter()
+        self.statuses_seen = []
+        self.lock = threading.Lock()
+    
+    def _run(self, text):
+        command_id = int(text[1:])
+        with self.lock:
+            self.executions[command_id] += 1
+            self.statuses_seen.append(self.api.statuses[command_id])
+        time.sleep(self.duration)
+        return "ok"
+    
+    ask = learn = analyze = build = fix = refactor = _run
+
+
+class NullLogger:
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture
+def make_webhook(monkeypatch):
+    monkeypatch.setattr(jarvis_webhook, "get_config", lambda: None)
+    monkeypatch.setattr(jarvis_webhook, "init_logger_from_config", lambda config: NullLogger())
+    monkeypatch.setattr(jarvis_webhook, "JarvisAgent", lambda: None)
+    
+    def make(api, **kwargs):
+        webhook = JarvisWebhook("http://api.test", "cookie", poll_interval=0.01, max_interval=0.05,
+                                metrics_interval=0, **kwargs)
+        webhook.session = api
+        webhook.agent = FakeAgent(api)
+        api.webhook = webhook
+        return webhook
+    
+    return make
+
+
+def run_with_timeout(webhook, timeout=10):
+    thread = threading.Thread(target=webhook.run)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        webhook.stop()
+        thread.join(timeout)
+        pytest.fail("le webhook ne s'est pas arrêté")
+
+
+MODES = [
+    pytest.param({}, id="sequential"),
+    pytest.param({"batch_status": True}, id="sequential-batch"),
+    pytest.param({"batch_status": True, "batch_interval": 0.3}, id="sequential-slow-batch"),
+    pytest.param({"workers": 3}, id="workers"),
+    pytest.param({"workers": 3, "batch_status": True}, id="workers-batch"),
+    pytest.param({"workers": 3, "fast_workers": 1, "batch_status": True, "batch_interval": 0.3},
+                 id="workers-slow-batch"),
+    pytest.param({"workers": 2, "max_in_flight": 1, "batch_status": True}, id="workers-one-in-flight"),
+]
+
+
+@pytest.mark.parametrize("options", MODES)
+def test_no_command_executes_twice(make_webhook, options):
+    commands = [command(number, "build" if number % 3 == 0 else "ask") for number in range(1, 9)]
+    api = FakeAPI(commands)
+    webhook = make_webhook(api, **options)
+    
+    run_with_timeout(webhook)
+    
+    assert webhook.agent.executions == Counter({item["id"]: 1 for item in commands})
+    assert set(api.statuses.values()) == {"completed"}
+
+
+@pytest.mark.parametrize("options", [
+    pytest.param({"batch_status": True}, id="sequential-batch"),
+    pytest.param({"workers": 2, "batch_status": True}, id="workers-batch"),
+])
+def test_processing_status_is_sent_before_execution(make_webhook, options):
+    api = FakeAPI([command(1), command(2, "build")])
+    webhook = make_webhook(api, **options)
+    
+    run_with_timeout(webhook)
+    
+    # La commande est réservée auprès de l'API avant de s'exécuter
+    assert webhook.agent.statuses_seen == ["processing", "processing"]
+
+
+def test_batch_falls_back_to_individual_requests(make_webhook):
+    commands = [command(number) for number in range(1, 5)]
+    api = FakeAPI(commands, batch_supported=False)
+    webhook = make_webhook(api, workers=2, batch_status=True, batch_interval=0.2)
+    
+    run_with_timeout(webhook)
+    
+    assert not webhook._batch_supported
+    assert set(api.statuses.values()) == {"completed"}
+    assert webhook.agent.executions == Counter({item["id"]: 1 for item in commands})